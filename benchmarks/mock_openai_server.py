@@ -0,0 +1,372 @@
+"""
+Local stand-in for the OpenAI endpoints used by NoteTaker.
+
+Serves the assistants, threads, messages and runs endpoints (with polling and streaming runs) and
+chat completions from memory, with configurable latency, generation speed, failure rate and
+request/token per minute limits. Point the OpenAI client at it with the OPENAI_BASE_URL
+environment variable. GET /stats returns the request counters.
+
+Usage:
+    python -m benchmarks.mock_openai_server --port 8765 --latency 0.05 --tokens-per-second 200
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Number of words of the generated notes per requested length
+NOTES_WORDS = {"SHORT": 80, "MEDIUM": 200, "LONG": 450}
+WORDS = ("meeting", "team", "decided", "action", "item", "deadline", "review", "budget", "release",
+         "customer", "feedback", "follow", "up", "owner", "plan", "risk", "next", "week", "agreed", "notes")
+
+
+class MockState:
+    """
+    In-memory objects and limits of the mock server, shared by the request handler threads.
+    """
+
+    def __init__(self, latency=0.05, tokens_per_second=200.0, failure_rate=0.0, requests_per_minute=0,
+                 tokens_per_minute=0, seed=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.assistants = {}
+        self.threads = {}
+        self.runs = {}
+        self.window = deque()  # (time, tokens) of the requests of the last minute
+        self.stats = Counter()
+
+    def new_id(self, prefix):
+        with self.lock:
+            return f"{prefix}_{next(self.ids):08d}"
+
+    def admit(self, tokens):
+        """
+        Applies the failure rate and the throughput limits to a request.
+
+        :returns: None if the request is accepted, otherwise (status, message, retry_after).
+        """
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            while self.window and now - self.window[0][0] >= 60:
+                self.window.popleft()
+            if self.failure_rate and self.random.random() < self.failure_rate:
+                self.stats["injected_errors"] += 1
+                return 500, "Injected server error", None
+            used_tokens = sum(t for _, t in self.window)
+            if (self.requests_per_minute and len(self.window) >= self.requests_per_minute) or \
+                    (self.tokens_per_minute and self.window and used_tokens + tokens > self.tokens_per_minute):
+                self.stats["rate_limited"] += 1
+                retry_after = max(0.1, 60 - (now - self.window[0][0]))
+                return 429, "Rate limit reached", retry_after
+            self.window.append((now, tokens))
+            self.stats["tokens"] += tokens
+        return None
+
+    def generation_time(self, words):
+        """Returns the time needed to generate a text of ``words`` words (about 4/3 tokens per word)."""
+        return words * 4 / 3 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def notes_for(self, thread_id):
+        """Builds the reply to the last request posted in a thread."""
+        messages = self.threads[thread_id]["messages"]
+        prompt = next((m["content"][0]["text"]["value"] for m in reversed(messages) if m["role"] == "user"), "")
+        length = next((name for name in NOTES_WORDS if name in prompt), "SHORT")
+        words = [self.random.choice(WORDS) for _ in range(NOTES_WORDS[length])]
+        return f"# {length.title()} notes\n\n" + " ".join(words)
+
+
+def estimate_tokens(payload):
+    """Estimates the tokens of a request body (4 characters per token)."""
+    return len(json.dumps(payload)) // 4
+
+
+def message_object(message_id, thread_id, role, text, run_id=None, assistant_id=None):
+    return {
+        "id": message_id, "object": "thread.message", "created_at": int(time.time()),
+        "thread_id": thread_id, "role": role, "status": "completed", "run_id": run_id,
+        "assistant_id": assistant_id, "attachments": [], "metadata": {},
+        "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+    }
+
+
+def list_object(data):
+    return {"object": "list", "data": data, "first_id": data[0]["id"] if data else None,
+            "last_id": data[-1]["id"] if data else None, "has_more": False}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    Request handler routing the OpenAI endpoints to the shared MockState.
+    """
+    protocol_version = "HTTP/1.1"
+    state = None  # set by make_server
+
+    routes = [
+        ("GET", r"/v1/assistants", "list_assistants"),
+        ("POST", r"/v1/assistants", "create_assistant"),
+        ("GET", r"/v1/assistants/(?P<assistant_id>[^/]+)", "retrieve_assistant"),
+        ("POST", r"/v1/threads", "create_thread"),
+        ("POST", r"/v1/threads/(?P<thread_id>[^/]+)/messages", "create_message"),
+        ("GET", r"/v1/threads/(?P<thread_id>[^/]+)/messages", "list_messages"),
+        ("POST", r"/v1/threads/(?P<thread_id>[^/]+)/runs", "create_run"),
+        ("GET", r"/v1/threads/(?P<thread_id>[^/]+)/runs", "list_runs"),
+        ("GET", r"/v1/threads/(?P<thread_id>[^/]+)/runs/(?P<run_id>[^/]+)", "retrieve_run"),
+        ("POST", r"/v1/threads/(?P<thread_id>[^/]+)/runs/(?P<run_id>[^/]+)/cancel", "cancel_run"),
+        ("POST", r"/v1/chat/completions", "chat_completion"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if method == "GET" and url.path == "/stats":
+            with self.state.lock:
+                return self._send_json(200, dict(self.state.stats))
+
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, url.path)
+            if route_method == method and match:
+                break
+        else:
+            return self._send_error(404, f"Unknown endpoint {method} {url.path}")
+
+        rejection = self.state.admit(estimate_tokens(body))
+        if rejection:
+            status, message, retry_after = rejection
+            return self._send_error(status, message, retry_after)
+
+        time.sleep(self.state.latency)
+        try:
+            getattr(self, handler)(body, query, **match.groupdict())
+        except KeyError as e:
+            self._send_error(404, f"No such object: {e}")
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message, retry_after=None):
+        headers = {"Retry-After": f"{retry_after:.1f}"} if retry_after else None
+        self._send_json(status, {"error": {"message": message, "type": "mock_error", "code": status}}, headers)
+
+    # Assistants
+
+    def list_assistants(self, body, query):
+        self._send_json(200, list_object(list(self.state.assistants.values())))
+
+    def create_assistant(self, body, query):
+        assistant = {"id": self.state.new_id("asst"), "object": "assistant", "created_at": int(time.time()),
+                     "name": body.get("name"), "model": body.get("model"), "instructions": body.get("instructions"),
+                     "tools": [], "metadata": {}}
+        self.state.assistants[assistant["id"]] = assistant
+        self._send_json(200, assistant)
+
+    def retrieve_assistant(self, body, query, assistant_id):
+        self._send_json(200, self.state.assistants[assistant_id])
+
+    # Threads and messages
+
+    def create_thread(self, body, query):
+        thread_id = self.state.new_id("thread")
+        self.state.threads[thread_id] = {"messages": []}
+        for message in body.get("messages", []):
+            self._add_message(thread_id, message.get("role", "user"), message.get("content", ""))
+        self._send_json(200, {"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}})
+
+    def create_message(self, body, query, thread_id):
+        self._send_json(200, self._add_message(thread_id, body.get("role", "user"), body.get("content", "")))
+
+    def list_messages(self, body, query, thread_id):
+        messages = list(self.state.threads[thread_id]["messages"])
+        if query.get("order", "desc") == "desc":
+            messages.reverse()
+        self._send_json(200, list_object(messages[:int(query.get("limit", 20))]))
+
+    def _add_message(self, thread_id, role, content, run_id=None, assistant_id=None):
+        text = content if isinstance(content, str) else " ".join(part.get("text", "") for part in content)
+        message = message_object(self.state.new_id("msg"), thread_id, role, text, run_id, assistant_id)
+        self.state.threads[thread_id]["messages"].append(message)
+        return message
+
+    # Runs
+
+    def create_run(self, body, query, thread_id):
+        if thread_id not in self.state.threads:
+            raise KeyError(thread_id)
+        notes = self.state.notes_for(thread_id)
+        run = {"id": self.state.new_id("run"), "object": "thread.run", "created_at": int(time.time()),
+               "thread_id": thread_id, "assistant_id": body.get("assistant_id"), "status": "queued",
+               "model": "mock", "instructions": "", "tools": [], "metadata": {}}
+        self.state.runs[run["id"]] = {"run": run, "notes": notes,
+                                      "ready_at": time.monotonic() + self.state.generation_time(len(notes.split()))}
+        if body.get("stream"):
+            self._stream_run(run["id"])
+        else:
+            self._send_json(200, run)
+
+    def list_runs(self, body, query, thread_id):
+        if thread_id not in self.state.threads:
+            raise KeyError(thread_id)
+        runs = [self._advance(run_id) for run_id, entry in list(self.state.runs.items())
+                if entry["run"]["thread_id"] == thread_id]
+        if query.get("order", "desc") == "desc":
+            runs.reverse()
+        self._send_json(200, list_object(runs[:int(query.get("limit", 20))]))
+
+    def retrieve_run(self, body, query, thread_id, run_id):
+        self._send_json(200, self._advance(run_id))
+
+    def cancel_run(self, body, query, thread_id, run_id):
+        entry = self.state.runs[run_id]
+        if entry["run"]["status"] in ("queued", "in_progress"):
+            entry["run"]["status"] = "cancelled"
+        self._send_json(200, entry["run"])
+
+    def _advance(self, run_id):
+        """Moves a polled run forward according to the time elapsed since its creation."""
+        entry = self.state.runs[run_id]
+        run = entry["run"]
+        if run["status"] in ("queued", "in_progress"):
+            if time.monotonic() >= entry["ready_at"]:
+                self._add_message(run["thread_id"], "assistant", entry["notes"], run_id, run["assistant_id"])
+                run["status"] = "completed"
+            else:
+                run["status"] = "in_progress"
+        return run
+
+    def _stream_run(self, run_id):
+        """Streams a run as server-sent events, emitting the notes word by word at the generation speed."""
+        entry = self.state.runs[run_id]
+        run = entry["run"]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(event, data):
+            payload = data if isinstance(data, str) else json.dumps(data)
+            self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode())
+            self.wfile.flush()
+
+        send("thread.run.created", run)
+        run["status"] = "in_progress"
+        send("thread.run.in_progress", run)
+        message = message_object(self.state.new_id("msg"), run["thread_id"], "assistant", "", run_id,
+                                 run["assistant_id"])
+        message["content"] = []
+        message["status"] = "in_progress"
+        send("thread.message.created", message)
+
+        words = entry["notes"].split(" ")
+        delay = self.state.generation_time(1)
+        for i, word in enumerate(words):
+            time.sleep(delay)
+            text = word if i == 0 else " " + word
+            send("thread.message.delta", {"id": message["id"], "object": "thread.message.delta",
+                                          "delta": {"content": [{"index": 0, "type": "text",
+                                                                 "text": {"value": text, "annotations": []}}]}})
+
+        message = message_object(message["id"], run["thread_id"], "assistant", entry["notes"], run_id,
+                                 run["assistant_id"])
+        self.state.threads[run["thread_id"]]["messages"].append(message)
+        send("thread.message.completed", message)
+        run["status"] = "completed"
+        send("thread.run.completed", run)
+        send("done", "[DONE]")
+
+    # Chat completions
+
+    def chat_completion(self, body, query):
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        words = min(body.get("max_tokens") or 600, max(20, len(prompt.split()) // 5))
+        text = " ".join(self.state.random.choice(WORDS) for _ in range(words))
+        time.sleep(self.state.generation_time(words))
+        self._send_json(200, {
+            "id": self.state.new_id("chatcmpl"), "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": estimate_tokens(body), "completion_tokens": words,
+                      "total_tokens": estimate_tokens(body) + words},
+        })
+
+
+def make_server(host="127.0.0.1", port=8765, **options):
+    """
+    Creates the mock server; ``options`` are passed to MockState.
+
+    :returns: The server, not yet serving.
+    :rtype: ThreadingHTTPServer
+    """
+    handler = type("BoundMockHandler", (MockHandler,), {"state": MockState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def add_server_arguments(parser):
+    """Adds the mock server options to an argument parser."""
+    parser.add_argument("--latency", type=float, default=0.05, help="Added latency of every request (seconds).")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Generation speed of the notes.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests failing with 500.")
+    parser.add_argument("--server-rpm", type=int, default=0, help="Requests per minute before 429 (0: no limit).")
+    parser.add_argument("--server-tpm", type=int, default=0, help="Tokens per minute before 429 (0: no limit).")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def server_options(args):
+    """Builds the MockState options from parsed arguments."""
+    return {"latency": args.latency, "tokens_per_second": args.tokens_per_second,
+            "failure_rate": args.failure_rate, "requests_per_minute": args.server_rpm,
+            "tokens_per_minute": args.server_tpm, "seed": args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI endpoints used by NoteTaker.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, **server_options(args))
+    print(f"Mock OpenAI server listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Note generation pipeline benchmark.
+
+Starts the mock OpenAI server in a child process, creates synthetic workspaces in a temporary data
+directory and drives NoteManager.generate_notes for all of them concurrently. Writes the wall time,
+per-workspace latency, LLM scheduler metrics and server counters to JSON. The data and cache directories
+(with the session catalog, search index and notes cache) are temporary too, so the application's own
+data is never touched.
+
+Usage:
+    python -m benchmarks.notes_benchmark --workspaces 50 --transcript-words 20000
+    python -m benchmarks.notes_benchmark --failure-rate 0.05 --server-rpm 300 --output results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_openai_server import WORDS, add_server_arguments, make_server, server_options
+
+
+def serve(port, options):
+    """Runs the mock server; meant to run in a child process."""
+    make_server("127.0.0.1", port, **options).serve_forever()
+
+
+def wait_for_server(url, timeout=10.0):
+    """Waits until the mock server answers on its /stats endpoint and returns the counters."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/stats", timeout=1) as response:
+                return json.load(response)
+        except (urllib.error.URLError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Mock server at {url} did not start")
+            time.sleep(0.1)
+
+
+def create_workspace(data_directory, ws_name, words, seed):
+    """
+    Creates a workspace with a synthetic transcription ready for note generation.
+
+    Every transcription is unique, so the notes cache is never hit on the first pass.
+    """
+    rng = random.Random(seed)
+    path = os.path.join(data_directory, ws_name)
+    os.makedirs(path)
+    transcription_path = os.path.join(path, "transcription.txt")
+    lines = [f"{ws_name} {seed}"]
+    for start in range(0, words, 12):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(min(12, words - start))))
+    with open(transcription_path, "w") as f:
+        f.write("\n".join(lines))
+    with open(os.path.join(path, "options.json"), "w") as f:
+        json.dump({"ws_name": ws_name, "transcription": True, "transcription_path": transcription_path,
+                   "can_generate_notes": True}, f, indent=4)
+
+
+def isolate_directories(temp_directory):
+    """
+    Points the data and cache paths of the application at a temporary directory.
+
+    Must run before anything else is imported from ``src``: the managers and caches read the paths
+    when they are imported.
+
+    Returns:
+        str: The temporary data directory.
+    """
+    from src import config
+
+    config.DATA_DIRECTORY = os.path.join(temp_directory, "data")
+    config.CACHE_DIRECTORY = os.path.join(temp_directory, "cache")
+    config.SESSION_CATALOG_FILE = os.path.join(config.DATA_DIRECTORY, ".catalog.sqlite3")
+    config.SEARCH_INDEX_FILE = os.path.join(config.DATA_DIRECTORY, ".search.sqlite3")
+    config.SCREENSHOT_STORE_DIRECTORY = os.path.join(config.DATA_DIRECTORY, ".blobs")
+    config.TRANSCRIPTION_STATS_FILE = os.path.join(config.CACHE_DIRECTORY, "transcription_stats.json")
+    os.makedirs(config.DATA_DIRECTORY)
+    os.makedirs(config.CACHE_DIRECTORY)
+    return config.DATA_DIRECTORY
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NoteManager.generate_notes against a mock OpenAI server.")
+    parser.add_argument("--workspaces", type=int, default=20)
+    parser.add_argument("--transcript-words", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Workspaces processed at the same time (default: all of them).")
+    parser.add_argument("--passes", type=int, default=1, help="Passes over the workspaces; later ones hit the notes cache.")
+    parser.add_argument("--scheduler-concurrency", type=int, default=None)
+    parser.add_argument("--rpm", type=int, default=None, help="Requests per minute budget of the LLM scheduler.")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens per minute budget of the LLM scheduler.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default="notes_benchmark.json")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(args.port, server_options(args)),
+                                                         daemon=True)
+    server.start()
+    wait_for_server(url)
+    os.environ["OPENAI_BASE_URL"] = f"{url}/v1"
+
+    temp_directory = tempfile.mkdtemp()
+    data_directory = isolate_directories(temp_directory)
+    from src.managers.note_manager import NoteManager
+    from src.services.llm_scheduler import llm_scheduler
+
+    if args.scheduler_concurrency:
+        llm_scheduler.max_concurrency = args.scheduler_concurrency
+    if args.rpm:
+        llm_scheduler.requests_per_minute = args.rpm
+    if args.tpm:
+        llm_scheduler.tokens_per_minute = args.tpm
+
+    prefix = f"notes-benchmark-{int(time.time())}"
+    ws_names = [f"{prefix}-{i:04d}" for i in range(args.workspaces)]
+    manager = None
+    passes = []
+    try:
+        for i, ws_name in enumerate(ws_names):
+            create_workspace(data_directory, ws_name, args.transcript_words, seed=i)
+
+        manager = NoteManager()
+        manager.api_key = "mock-key"
+        manager.workspaces.refresh()
+
+        def generate(ws_name):
+            started = time.perf_counter()
+            manager.generate_notes(ws_name)
+            return time.perf_counter() - started
+
+        for number in range(1, args.passes + 1):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency or args.workspaces) as executor:
+                latencies = list(executor.map(generate, ws_names))
+            wall_time = time.perf_counter() - started
+            written = sum(os.path.exists(os.path.join(data_directory, ws_name, f"note_{length}.txt"))
+                          for ws_name in ws_names for length in ("short", "medium", "long"))
+            passes.append({
+                "pass": number,
+                "wall_time_s": round(wall_time, 3),
+                "workspaces_per_minute": round(60 * len(ws_names) / wall_time, 1),
+                "latency_p50_s": round(percentile(latencies, 0.5), 3),
+                "latency_p95_s": round(percentile(latencies, 0.95), 3),
+                "latency_max_s": round(max(latencies), 3),
+                "notes_written": written,
+            })
+            print(f"pass {number}: {wall_time:.1f}s for {len(ws_names)} workspaces, "
+                  f"p50 {passes[-1]['latency_p50_s']}s, p95 {passes[-1]['latency_p95_s']}s, "
+                  f"{written}/{3 * len(ws_names)} notes")
+    finally:
+        if manager is not None:
+            manager.shutdown()
+        shutil.rmtree(temp_directory, ignore_errors=True)
+
+    metrics = llm_scheduler.metrics()
+    server_stats = wait_for_server(url)
+    llm_scheduler.shutdown()
+    server.terminate()
+
+    report = {
+        "config": vars(args),
+        "passes": passes,
+        "scheduler": {
+            "requests": len(metrics),
+            "failed": sum(m["status"] == "failed" for m in metrics),
+            "retries": sum(m["attempts"] - 1 for m in metrics),
+            "mean_queued_s": round(statistics.mean(m["queued"] for m in metrics), 3) if metrics else None,
+            "mean_duration_s": round(statistics.mean(m["duration"] for m in metrics), 3) if metrics else None,
+        },
+        "server": server_stats,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
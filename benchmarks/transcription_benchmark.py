@@ -0,0 +1,177 @@
+"""
+Transcription throughput benchmark.
+
+Runs SpeechToText over audio clips of several lengths for every combination of model size and
+speed profile, and writes load time, real-time factor, peak memory and CPU utilization to JSON.
+Every combination runs in its own process, so peak memory and torch settings do not leak between runs.
+
+Usage:
+    python -m benchmarks.transcription_benchmark --models tiny base small --profiles fast balanced accurate
+    python -m benchmarks.transcription_benchmark --clips meeting.wav --output results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def generate_clip(path, seconds, seed=0):
+    """
+    Writes a synthetic 16 kHz mono WAV clip with speech-like, amplitude-modulated harmonics.
+
+    :param path: The path of the WAV file to create.
+    :type path: str
+    :param seconds: The clip length in seconds.
+    :type seconds: int
+    :param seed: The random seed for the noise and pitch contour.
+    :type seed: int
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 4 * t) > 0).astype(np.float32)
+    signal = 0.3 * voice * syllables + 0.02 * rng.standard_normal(t.size)
+    samples = np.clip(signal / np.max(np.abs(signal)), -1, 1)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+
+def clip_duration(path):
+    """Returns the duration of a WAV clip in seconds."""
+    with wave.open(path, 'rb') as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def peak_memory_mb():
+    """
+    Returns the peak resident memory of the current process in MB, or None if it cannot be measured.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+def run_combination(model_size, profile, clips, queue):
+    """
+    Loads one model with one profile and transcribes every clip; meant to run in a child process.
+
+    :param model_size: The Whisper model size.
+    :type model_size: str
+    :param profile: The speed profile name.
+    :type profile: str
+    :param clips: The paths of the clips to transcribe.
+    :type clips: list of str
+    :param queue: The queue receiving the result dictionary.
+    :type queue: multiprocessing.Queue
+    """
+    result = {"model_size": model_size, "profile": profile, "runs": []}
+    try:
+        from src.services.speech_to_text import SpeechToText
+
+        started = time.perf_counter()
+        # Synthetic clips must not show up as measured real-time factors in the settings view
+        stt = SpeechToText(use_cache=False, profile=profile, model_size=model_size, record_stats=False)
+        result["load_time_s"] = round(time.perf_counter() - started, 3)
+        result["quantized"] = stt.quantized
+
+        for clip in clips:
+            duration = clip_duration(clip)
+            cpu_started = time.process_time()
+            started = time.perf_counter()
+            stt.transcribe_segments(clip)
+            elapsed = time.perf_counter() - started
+            cpu_time = time.process_time() - cpu_started
+            result["runs"].append({
+                "clip": os.path.basename(clip),
+                "audio_duration_s": round(duration, 2),
+                "transcription_time_s": round(elapsed, 3),
+                "real_time_factor": round(elapsed / duration, 4),
+                "cpu_utilization": round(cpu_time / (elapsed * (os.cpu_count() or 1)), 4),
+                "peak_memory_mb": peak_memory_mb(),
+            })
+    except Exception as e:
+        result["error"] = str(e)
+    queue.put(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SpeechToText across model sizes and speed profiles.")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"])
+    parser.add_argument("--profiles", nargs="+", default=["fast", "balanced", "accurate"])
+    parser.add_argument("--lengths", nargs="+", type=int, default=[30, 120, 600],
+                        help="Lengths (in seconds) of the synthetic clips, used when --clips is not given.")
+    parser.add_argument("--clips", nargs="+", help="WAV files to transcribe instead of synthetic clips.")
+    parser.add_argument("--output", default="transcription_benchmark.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        clips = args.clips
+        if not clips:
+            clips = []
+            for length in args.lengths:
+                path = os.path.join(temp_dir, f"synthetic_{length}s.wav")
+                generate_clip(path, length)
+                clips.append(path)
+
+        context = multiprocessing.get_context("spawn")
+        results = []
+        for model_size in args.models:
+            for profile in args.profiles:
+                queue = context.Queue()
+                process = context.Process(target=run_combination, args=(model_size, profile, clips, queue))
+                process.start()
+                while True:
+                    try:
+                        result = queue.get(timeout=1)
+                        break
+                    except queue_module.Empty:
+                        if not process.is_alive():
+                            result = {"model_size": model_size, "profile": profile, "runs": [],
+                                      "error": f"Benchmark process exited with code {process.exitcode}"}
+                            break
+                process.join()
+                results.append(result)
+                summary = result.get("error") or ", ".join(
+                    f"{run['clip']}: RTF {run['real_time_factor']}" for run in result["runs"])
+                print(f"{model_size:>8} / {profile:<8} load {result.get('load_time_s', '-')}s  {summary}")
+
+    report = {
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import sys
 from PySide6.QtWidgets import QApplication
 from src.gui.main_window import MainWindow
+from src.managers.session_archiver import session_archiver
 from src.utils.logger import app_logger
 
 
@@ -9,7 +10,9 @@ def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    session_archiver.start()
     exit_code = app.exec()
+    session_archiver.stop()
     app_logger.info("Application exited with code: %s", exit_code)
     sys.exit(exit_code)
 
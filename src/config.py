@@ -11,15 +11,25 @@ LOG_DIRECTORY = os.path.join(BASE_DIR, 'logs')
 ICON_DIRECTORY = os.path.join(BASE_DIR, 'assets', 'icons')
 SRC_DIR = os.path.join(BASE_DIR, 'src')
 SETTINGS_FILE = os.path.join(SRC_DIR, 'settings.json')
+CACHE_DIRECTORY = os.path.join(BASE_DIR, 'cache')
+TRANSCRIPTION_STATS_FILE = os.path.join(CACHE_DIRECTORY, 'transcription_stats.json')
 
 # Default settings
 DEFAULT_SETTINGS = {
     "data_directory": os.path.join(BASE_DIR, 'data'),
     "calendar_url": "",
     "model_size": "small",
+    "transcription_profile": "balanced",
     "transcription_language": "pl",
     "max_data_size_gb": 5,
-    "open_ai_api_key": ""
+    "storage_policy": "none",
+    "screenshot_dedup_distance": 0,
+    "archive_after_days": 30,
+    "archive_audio_format": "flac",
+    "archive_cache_size_mb": 128,
+    "open_ai_api_key": "",
+    "transcription_cache_size_mb": 256,
+    "notes_cache_size_mb": 64
 }
 
 # Ensure settings file exists with default settings
@@ -33,9 +43,13 @@ with open(SETTINGS_FILE, 'r') as f:
 
 # Paths from settings
 DATA_DIRECTORY = settings.get('data_directory', DEFAULT_SETTINGS['data_directory'])
+SESSION_CATALOG_FILE = os.path.join(DATA_DIRECTORY, '.catalog.sqlite3')
+SEARCH_INDEX_FILE = os.path.join(DATA_DIRECTORY, '.search.sqlite3')
+SCREENSHOT_STORE_DIRECTORY = os.path.join(DATA_DIRECTORY, '.blobs')
 
 # Ensure necessary directories exist
 os.makedirs(LOG_DIRECTORY, exist_ok=True)
+os.makedirs(CACHE_DIRECTORY, exist_ok=True)
 os.makedirs(DATA_DIRECTORY, exist_ok=True)
 
 
@@ -1,7 +1,7 @@
 import os
 
-from PySide6.QtCore import Qt, QUrl
-from PySide6.QtGui import QPixmap, QTextCharFormat, QTextCursor, QBrush, QColor
+from PySide6.QtCore import Qt, QUrl, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap, QTextCharFormat, QTextCursor, QBrush, QColor
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PySide6.QtMultimediaWidgets import QVideoWidget
 from PySide6.QtWidgets import (
@@ -11,7 +11,43 @@ from PySide6.QtWidgets import (
 
 from src.config import DATA_DIRECTORY
 from src.gui.views import notes_view
+from src.managers.screenshot_store import screenshot_store
+from src.managers.session_archive import session_archive
 from src.services.pdf_generator import PDFGenerator
+from src.utils.logger import app_logger
+from src.utils.transcript import TranscriptIndex, load_segments
+
+
+SCREENSHOTS_TAB, TRANSCRIPTION_TAB, SUMMARY_TAB, VIDEO_TAB = range(4)
+
+
+class ContentLoaderSignals(QObject):
+    """Signals of a ContentLoader; QRunnable itself cannot emit signals."""
+    loaded = Signal(object)
+
+
+class ContentLoader(QRunnable):
+    """
+    Runs a function reading content for a NotePanel in a QThreadPool and emits its result.
+    """
+
+    def __init__(self, function, *args):
+        """
+        :param function: Function returning the content; it must not touch any widget.
+        :param args: The arguments of the function.
+        """
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = ContentLoaderSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            app_logger.error(f"NotePanel: Could not load content with {self.function.__name__}: {e}")
+            result = None
+        self.signals.loaded.emit(result)
 
 
 class NotePanel(QWidget):
@@ -20,9 +56,12 @@ class NotePanel(QWidget):
 
     Displays:
     - Screenshots (navigable with left/right arrows)
-    - Transcription text with search functionality
+    - Transcription text with search functionality and jumping from a search hit to the video
     - Summary notes with search functionality
     - Video recording playback
+
+    Each tab is loaded the first time it is shown: files are read in a QThreadPool and their content is
+    handed back to the panel through signals, so the panel opens at once even for long sessions.
     """
 
     def __init__(self, folder_name: str, return_callback):
@@ -35,11 +74,20 @@ class NotePanel(QWidget):
         super().__init__()
         self.folder_name = folder_name
         self.return_callback = return_callback
+        self.folder_path = os.path.join(DATA_DIRECTORY, folder_name)
         self.screenshots = []
         self.current_screenshot_index = 0
+        self.screenshot_pixmap = None
+        self.transcript_index = None
+        self.summary_files = None
+        self.summary_mode = "short"
+        self.pending_video_position = None
+        self.loaded_tabs = set()
+        self.thread_pool = QThreadPool.globalInstance()
         self.ws_name = self.get_workspace_name()
         self._setup_ui()
-        self.load_content()
+        self.content_stack.currentChanged.connect(self.load_tab)
+        self.load_tab(self.content_stack.currentIndex())
 
     def _setup_ui(self):
         """Creates and configures UI components for the panel."""
@@ -73,8 +121,15 @@ class NotePanel(QWidget):
         self.transcription_text = QTextEdit()
         self.transcription_text.setReadOnly(True)
         self.transcription_search.textChanged.connect(self.search_transcription)
+        self.transcription_search.returnPressed.connect(self.find_next_transcription_hit)
+        self.jump_to_video_button = QPushButton("Jump to Video")
+        self.jump_to_video_button.setEnabled(False)
+        self.jump_to_video_button.clicked.connect(self.jump_to_transcription_position)
+        transcription_search_layout = QHBoxLayout()
+        transcription_search_layout.addWidget(self.transcription_search)
+        transcription_search_layout.addWidget(self.jump_to_video_button)
         transcription_layout = QVBoxLayout()
-        transcription_layout.addWidget(self.transcription_search)
+        transcription_layout.addLayout(transcription_search_layout)
         transcription_layout.addWidget(self.transcription_text)
         transcription_widget = QWidget()
         transcription_widget.setLayout(transcription_layout)
@@ -119,6 +174,7 @@ class NotePanel(QWidget):
         self.media_player.setAudioOutput(self.audio_output)
         self.media_player.positionChanged.connect(self.update_position)
         self.media_player.durationChanged.connect(self.update_duration)
+        self.media_player.mediaStatusChanged.connect(self.apply_pending_video_position)
         self.media_player.setVideoOutput(self.video_widget)
         video_layout = QVBoxLayout()
         video_layout.addWidget(self.video_widget)
@@ -144,10 +200,10 @@ class NotePanel(QWidget):
         self.summary_button = QPushButton("Summary")
         self.video_button = QPushButton("Video")
         self.return_button = QPushButton("Back")
-        self.screenshots_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(0))
-        self.transcription_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(1))
-        self.summary_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(2))
-        self.video_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(3))
+        self.screenshots_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(SCREENSHOTS_TAB))
+        self.transcription_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(TRANSCRIPTION_TAB))
+        self.summary_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(SUMMARY_TAB))
+        self.video_button.clicked.connect(lambda: self.content_stack.setCurrentIndex(VIDEO_TAB))
         self.return_button.clicked.connect(self.return_callback)
         nav_layout.addWidget(self.screenshots_button)
         nav_layout.addWidget(self.transcription_button)
@@ -176,38 +232,116 @@ class NotePanel(QWidget):
         """Sets the media player's position."""
         self.media_player.setPosition(position)
 
-    def load_content(self):
-        """Loads content from the selected folder."""
-        folder_path = os.path.join(DATA_DIRECTORY, self.folder_name)
-        screenshots_dir = os.path.join(folder_path, "screenshots")
-        transcription_file = os.path.join(folder_path, "transcription.txt")
-        video_file = os.path.join(folder_path, "video.mp4")
-
-        if os.path.exists(screenshots_dir):
-            self.screenshots = [
-                os.path.join(screenshots_dir, f)
-                for f in os.listdir(screenshots_dir)
-                if f.endswith((".png", ".jpg", ".jpeg"))
-            ]
-            self.show_screenshot()
+    def load_tab(self, tab: int):
+        """
+        Starts loading the content of a tab the first time it is shown.
+
+        :param tab: The index of the tab in the content stack.
+        """
+        if tab in self.loaded_tabs:
+            return
+        self.loaded_tabs.add(tab)
+
+        if tab == SCREENSHOTS_TAB:
+            self._start_loader(self.on_screenshots_loaded, screenshot_store.list_screenshots, self.folder_name)
+        elif tab == TRANSCRIPTION_TAB:
+            self.transcription_text.setPlainText("Loading transcription...")
+            self._start_loader(self.on_transcription_loaded, self.read_transcription, self.folder_path)
+        elif tab == SUMMARY_TAB:
+            self.summary_text.setPlainText("Loading summary...")
+            self._start_loader(self.on_summaries_loaded, self.read_summaries, self.folder_path)
+        elif tab == VIDEO_TAB:
+            # QMediaPlayer opens the file in the background itself
+            video_file = os.path.join(self.folder_path, "video.mp4")
+            if os.path.exists(video_file):
+                self.media_player.setSource(QUrl.fromLocalFile(video_file))
+
+    def _start_loader(self, slot, function, *args):
+        """Runs a content reading function in the thread pool and delivers its result to a slot of the panel."""
+        loader = ContentLoader(function, *args)
+        loader.signals.loaded.connect(slot)
+        self.thread_pool.start(loader)
+
+    def on_screenshots_loaded(self, screenshots):
+        """Shows the first screenshot once the screenshots of the session are listed."""
+        self.screenshots = screenshots or []
+        self.current_screenshot_index = 0
+        self.show_screenshot()
+
+    def on_screenshot_decoded(self, result):
+        """Shows a screenshot decoded in the thread pool, unless the user has moved on to another one."""
+        if not result:
+            return
+        index, image = result
+        if index == self.current_screenshot_index and not image.isNull():
+            self.screenshot_pixmap = QPixmap.fromImage(image)
+            self.adjust_screenshot_size()
+
+    def on_transcription_loaded(self, content):
+        """Shows the transcription read by read_transcription."""
+        if isinstance(content, TranscriptIndex):
+            self.transcript_index = content
+            self.transcription_text.setPlainText(content.text)
+            self.jump_to_video_button.setEnabled(len(content) > 0)
+        else:
+            self.transcription_text.setPlainText(content or "")
+        self.search_transcription(self.transcription_search.text())
 
-        if os.path.exists(transcription_file):
+    def on_summaries_loaded(self, summary_files):
+        """Shows the summary in the selected mode once the notes are read."""
+        self.summary_files = summary_files or {}
+        self.load_summary(self.summary_mode)
+
+    @staticmethod
+    def read_transcription(folder_path: str):
+        """
+        Reads the transcription of a session; runs in the thread pool.
+
+        :param folder_path: The path of the session folder.
+        :return: A TranscriptIndex over the timestamped segments if there are any, else the transcription text or None.
+        """
+        # Files of archived sessions are extracted from the session archive
+        segments_file = session_archive.resolve(os.path.join(folder_path, "transcription.json"))
+        if segments_file:
+            return TranscriptIndex(load_segments(segments_file))
+        transcription_file = session_archive.resolve(os.path.join(folder_path, "transcription.txt"))
+        if transcription_file:
             with open(transcription_file, "r", encoding="utf-8") as file:
-                self.transcription_text.setText(file.read())
+                return file.read()
+        return None
+
+    @staticmethod
+    def decode_screenshot(index: int, path: str):
+        """
+        Decodes a screenshot; runs in the thread pool.
 
-        self.summary_files = {}
+        :param index: The index of the screenshot in the session.
+        :param path: The path of the screenshot.
+        :return: The index and the decoded QImage.
+        """
+        return index, QImage(path)
+
+    @staticmethod
+    def read_summaries(folder_path: str):
+        """
+        Reads the notes of a session in every mode; runs in the thread pool.
+
+        :param folder_path: The path of the session folder.
+        :return: The Markdown text of the notes by mode (short, medium, long).
+        """
+        summary_files = {}
         for mode, filename in (("short", "note_short.txt"), ("medium", "note_medium.txt"), ("long", "note_long.txt")):
-            file_path = os.path.join(folder_path, filename)
-            if os.path.exists(file_path):
+            file_path = session_archive.resolve(os.path.join(folder_path, filename))
+            if file_path:
                 with open(file_path, "r", encoding="utf-8") as file:
-                    self.summary_files[mode] = file.read()
-        self.load_summary("short")
-
-        if os.path.exists(video_file):
-            self.media_player.setSource(QUrl.fromLocalFile(video_file))
+                    summary_files[mode] = file.read()
+        return summary_files
 
     def load_summary(self, mode: str):
         """Loads and displays the summary in the given mode (short, medium, long) with Markdown formatting."""
+        self.summary_mode = mode
+        if self.summary_files is None:
+            return
         if mode in self.summary_files:
             md_text = self.summary_files[mode]
             self.summary_text.setMarkdown(md_text)
@@ -232,9 +366,8 @@ class NotePanel(QWidget):
 
     def adjust_screenshot_size(self):
         """Adjusts the screenshot size to maintain aspect ratio."""
-        if self.screenshots:
-            pixmap = QPixmap(self.screenshots[self.current_screenshot_index])
-            scaled_pixmap = pixmap.scaled(
+        if self.screenshot_pixmap:
+            scaled_pixmap = self.screenshot_pixmap.scaled(
                 self.width() * 0.9,
                 self.height() * 0.9,
                 Qt.KeepAspectRatio,
@@ -243,8 +376,10 @@ class NotePanel(QWidget):
             self.screenshot_label.setPixmap(scaled_pixmap)
 
     def show_screenshot(self):
-        """Displays the current screenshot."""
-        self.adjust_screenshot_size()
+        """Decodes the current screenshot in the thread pool and displays it once it is decoded."""
+        if self.screenshots:
+            self._start_loader(self.on_screenshot_decoded, self.decode_screenshot,
+                               self.current_screenshot_index, self.screenshots[self.current_screenshot_index])
 
     def show_previous_screenshot(self):
         """Navigates to the previous screenshot."""
@@ -292,6 +427,41 @@ class NotePanel(QWidget):
         """Searches and highlights text in the transcription view."""
         self.highlight_search_results(self.transcription_text, text)
 
+    def find_next_transcription_hit(self):
+        """Moves the transcription cursor to the next occurrence of the search term, wrapping around."""
+        query = self.transcription_search.text()
+        if not query:
+            return
+        document = self.transcription_text.document()
+        cursor = document.find(query, self.transcription_text.textCursor())
+        if cursor.isNull():
+            cursor = document.find(query, 0)
+        if not cursor.isNull():
+            self.transcription_text.setTextCursor(cursor)
+
+    def jump_to_transcription_position(self):
+        """Starts the video at the segment containing the current transcription cursor (e.g. a search hit)."""
+        if not self.transcript_index:
+            return
+        offset = self.transcription_text.textCursor().selectionStart()
+        index = self.transcript_index.segment_at_offset(offset)
+        if index is None:
+            return
+        # Showing the video tab sets the media source if it is not loaded yet
+        self.content_stack.setCurrentIndex(VIDEO_TAB)
+        position = int(self.transcript_index.start_of(index) * 1000)
+        if self.media_player.mediaStatus() == QMediaPlayer.LoadingMedia:
+            self.pending_video_position = position
+        else:
+            self.media_player.setPosition(position)
+        self.media_player.play()
+
+    def apply_pending_video_position(self, status):
+        """Seeks to the position requested while the video was still loading."""
+        if status == QMediaPlayer.LoadedMedia and self.pending_video_position is not None:
+            self.media_player.setPosition(self.pending_video_position)
+            self.pending_video_position = None
+
     def search_summary(self, text):
         """Searches and highlights text in the summary view."""
         self.highlight_search_results(self.summary_text, text)
@@ -1,6 +1,9 @@
+import os
+
 from PySide6.QtWidgets import QVBoxLayout, QLabel, QComboBox, QPushButton, QWidget, QMessageBox
 from PySide6.QtCore import Qt, QTimer
 from src.managers.recorder_manager import RecorderManager
+from src.managers.storage_governor import storage_governor, EXPECTED_RECORDING_SECONDS
 from src.utils.visible_windows import get_visible_window_titles
 
 
@@ -35,6 +38,8 @@ class RecordingPanel(QWidget):
         Button to toggle the recording state between "Start Recording" and "Stop Recording".
     timer_label : QLabel
         Label displaying the elapsed recording time.
+    storage_label : QLabel
+        Label warning that the recording is about to exceed the data folder budget.
 
     Methods
     -------
@@ -52,6 +57,10 @@ class RecordingPanel(QWidget):
         Updates the displayed elapsed time during recording.
     monitor_window()
         Monitors if the selected window is still open; stops recording if the window is closed.
+    confirm_storage()
+        Warns before a recording that would exceed the data folder budget.
+    check_storage()
+        Warns when the running recording is about to exceed the data folder budget.
     """
 
     def __init__(self):
@@ -101,6 +110,12 @@ class RecordingPanel(QWidget):
         self.timer_label.hide()
         layout.addWidget(self.timer_label, alignment=Qt.AlignCenter)
 
+        self.storage_label = QLabel()
+        self.storage_label.setAlignment(Qt.AlignCenter)
+        self.storage_label.setStyleSheet("color: #e0a030;")
+        self.storage_label.hide()
+        layout.addWidget(self.storage_label, alignment=Qt.AlignCenter)
+
         self.setLayout(layout)
 
     def get_window_titles(self):
@@ -135,6 +150,8 @@ class RecordingPanel(QWidget):
         """
         selected_window = self.window_selector.currentText()
         if not self.is_recording:
+            if not self.confirm_storage():
+                return
             self.recorder_manager = RecorderManager(selected_window)
             self.recorder_manager.start_recording()
             self.is_recording = True
@@ -156,6 +173,7 @@ class RecordingPanel(QWidget):
         self.is_recording = False
         self.record_button.setText("Start Recording")
         self.timer_label.hide()
+        self.storage_label.hide()
         self.timer.stop()
         self.monitor_timer.stop()
         self.elapsed_time = 0
@@ -171,6 +189,48 @@ class RecordingPanel(QWidget):
         hours, remainder = divmod(self.elapsed_time, 3600)
         minutes, seconds = divmod(remainder, 60)
         self.timer_label.setText(f"{hours:02}:{minutes:02}:{seconds:02}")
+        if self.elapsed_time % 30 == 0:
+            self.check_storage()
+
+    def confirm_storage(self):
+        """
+        Warns before starting a recording that is likely to exceed the data folder budget.
+
+        Returns
+        -------
+        bool
+            True if the recording should start.
+        """
+        headroom = storage_governor.recording_headroom()
+        if headroom >= EXPECTED_RECORDING_SECONDS:
+            return True
+        storage_governor.enforce_async()
+        reply = QMessageBox.question(
+            self, "Data Folder Almost Full",
+            f"Only about {headroom / 60:.0f} minutes of recording fit in the data folder size limit. "
+            "Older sessions will be cleaned up according to the storage policy. Start recording anyway?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        return reply == QMessageBox.Yes
+
+    def check_storage(self):
+        """
+        Shows a warning when the running recording is about to exceed the data folder budget.
+
+        Also frees space from the older sessions once the budget is exceeded.
+        """
+        if not self.recorder_manager or not self.recorder_manager.session_dir:
+            return
+        session_dir = self.recorder_manager.session_dir
+        time_left = storage_governor.recording_time_left(session_dir, self.elapsed_time)
+        if time_left > 5 * 60:
+            self.storage_label.hide()
+            return
+        if time_left == 0:
+            self.storage_label.setText("The data folder size limit has been exceeded.")
+            storage_governor.enforce_async(exclude=[os.path.basename(session_dir)])
+        else:
+            self.storage_label.setText(f"About {time_left / 60:.0f} minutes left before the data folder size limit.")
+        self.storage_label.show()
 
     def monitor_window(self):
         """
@@ -0,0 +1,173 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QObject, QRect, QRunnable, QSize, QThreadPool, Signal
+from PySide6.QtGui import QColor, QImage, QPainter, QPixmap, QPixmapCache
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate
+
+from src.utils.thumbnail_cache import thumbnail_cache, THUMBNAIL_WIDTH
+
+FolderRole = Qt.UserRole
+CoverRole = Qt.UserRole + 1
+
+CARD_WIDTH = 500
+CARD_HEIGHT = 120
+CARD_PADDING = 10
+CARD_SPACING = 20
+THUMBNAIL_HEIGHT = CARD_HEIGHT - 2 * CARD_PADDING
+
+
+class ThumbnailLoaderSignals(QObject):
+    """Signals of a ThumbnailLoader; QRunnable itself cannot emit signals."""
+    loaded = Signal(str, QImage)
+
+
+class ThumbnailLoader(QRunnable):
+    """
+    Decodes the thumbnail of a session cover in a QThreadPool, making the thumbnail first if needed.
+    """
+
+    def __init__(self, cover_path):
+        """
+        :param cover_path: The path of the cover screenshot.
+        """
+        super().__init__()
+        self.cover_path = cover_path
+        self.signals = ThumbnailLoaderSignals()
+
+    def run(self):
+        thumbnail_path = thumbnail_cache.make(self.cover_path)
+        image = QImage(thumbnail_path) if thumbnail_path else QImage()
+        if image.height() > THUMBNAIL_HEIGHT:
+            image = image.scaledToHeight(THUMBNAIL_HEIGHT, Qt.SmoothTransformation)
+        self.signals.loaded.emit(self.cover_path, image)
+
+
+class SessionListModel(QAbstractListModel):
+    """
+    List model of the recorded sessions, newest first.
+
+    Cover thumbnails are loaded only when a view asks for them, i.e. for visible rows, and are kept in
+    QPixmapCache. A cover that fails to load is not retried until `set_sessions` changes its row.
+    `set_sessions` applies a new session list as row insertions, removals and changes, so
+    the view keeps its scroll position and its delegates.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sessions = []
+        self._loading = set()
+        self._failed = set()
+        self._thread_pool = QThreadPool.globalInstance()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.sessions)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.sessions):
+            return None
+        session = self.sessions[index.row()]
+        if role == Qt.DisplayRole:
+            return session["display_name"]
+        if role == FolderRole:
+            return session["folder"]
+        if role == CoverRole:
+            return session["cover_path"]
+        if role == Qt.DecorationRole:
+            return self._thumbnail(session["cover_path"])
+        return None
+
+    def set_sessions(self, sessions):
+        """
+        Updates the model to a new list of sessions with the fewest row changes.
+
+        :param sessions: Dicts with the "folder", "display_name" and "cover_path" of the sessions, in display order.
+        """
+        folders = {session["folder"] for session in sessions}
+        for row in reversed(range(len(self.sessions))):
+            if self.sessions[row]["folder"] not in folders:
+                self._failed.discard(self.sessions[row]["cover_path"])
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.sessions[row]
+                self.endRemoveRows()
+
+        for row, session in enumerate(sessions):
+            current = self.sessions[row] if row < len(self.sessions) else None
+            if current is not None and current["folder"] == session["folder"]:
+                if current != session:
+                    self._failed.discard(current["cover_path"])
+                    self._failed.discard(session["cover_path"])
+                    self.sessions[row] = session
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                continue
+
+            # The session moved down the list or is new
+            for old_row in range(row + 1, len(self.sessions)):
+                if self.sessions[old_row]["folder"] == session["folder"]:
+                    self.beginRemoveRows(QModelIndex(), old_row, old_row)
+                    del self.sessions[old_row]
+                    self.endRemoveRows()
+                    break
+            self._failed.discard(session["cover_path"])
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.sessions.insert(row, session)
+            self.endInsertRows()
+
+    def _thumbnail(self, cover_path):
+        """Returns the cached thumbnail of a cover, or None after starting to load it."""
+        pixmap = QPixmapCache.find(self._pixmap_key(cover_path))
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if cover_path and cover_path not in self._loading and cover_path not in self._failed:
+            self._loading.add(cover_path)
+            loader = ThumbnailLoader(cover_path)
+            loader.signals.loaded.connect(self._thumbnail_loaded)
+            self._thread_pool.start(loader)
+        return None
+
+    def _thumbnail_loaded(self, cover_path, image):
+        """Caches a decoded thumbnail and repaints the rows showing it, or remembers a failed cover."""
+        self._loading.discard(cover_path)
+        if image.isNull():
+            self._failed.add(cover_path)
+            return
+        QPixmapCache.insert(self._pixmap_key(cover_path), QPixmap.fromImage(image))
+        for row, session in enumerate(self.sessions):
+            if session["cover_path"] == cover_path:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    @staticmethod
+    def _pixmap_key(cover_path):
+        return f"session-cover:{cover_path}"
+
+
+class SessionDelegate(QStyledItemDelegate):
+    """
+    Paints a session as a card with its cover thumbnail and its name, centered in the row.
+    """
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT + CARD_SPACING)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        card = QRect(0, 0, CARD_WIDTH, CARD_HEIGHT)
+        card.moveCenter(option.rect.center())
+        hovered = option.state & QStyle.State_MouseOver
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#555" if hovered else "#444"))
+        painter.drawRoundedRect(card, 10, 10)
+
+        content = card.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None:
+            target = QRect(content.left(), content.top(), pixmap.width(), pixmap.height())
+            target.moveTop(content.top() + (content.height() - pixmap.height()) // 2)
+            painter.drawPixmap(target, pixmap)
+
+        text_rect = content.adjusted(THUMBNAIL_WIDTH + CARD_PADDING, 0, 0, 0)
+        painter.setPen(option.palette.text().color())
+        painter.setFont(option.font)
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, index.data(Qt.DisplayRole))
+        painter.restore()
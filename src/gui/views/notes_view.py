@@ -1,21 +1,33 @@
 import json
 import os
-import random
+import re
+import threading
 from datetime import datetime
 
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap
-from PySide6.QtWidgets import QLabel, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QSizePolicy, QScrollArea
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QVBoxLayout, QSizePolicy, QListView, QLineEdit
 
 from src.config import DATA_DIRECTORY
 from src.gui.views.base_view import BaseView
 from src.gui.components.note_panel import NotePanel
+from src.gui.components.session_list import SessionListModel, SessionDelegate, FolderRole
+from src.managers.search_index import search_index
+from src.managers.session_catalog import session_catalog
+
+# Maximum number of search hits, and of snippet characters shown on a session card
+SEARCH_LIMIT = 200
+SNIPPET_LENGTH = 60
 
 
 def get_workspace_name(folder_path):
     """
-    Reads the ws_name from options.json inside the given folder.
+    Returns the ws_name of the given folder from the session catalog,
+    falling back to options.json for folders that are not cataloged yet.
     """
+    session = session_catalog.get(os.path.basename(os.path.normpath(folder_path)))
+    if session is not None:
+        return session["ws_name"]
+
     options_path = os.path.join(folder_path, "options.json")
     if os.path.exists(options_path):
         try:
@@ -32,6 +44,8 @@ class NotesView(BaseView):
         super().__init__("Notes")
         self._setup_ui()
         self.note_panel = None
+        # Indexes the files written while the app was closed, so the first search does not wait for it
+        threading.Thread(target=search_index.sync, daemon=True).start()
 
     def _setup_ui(self):
         """
@@ -42,18 +56,30 @@ class NotesView(BaseView):
         content_layout.setSpacing(35)
         content_layout.setAlignment(Qt.AlignCenter)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setStyleSheet("border: none;")
-
-        self.notes_container_widget = QWidget()
-        self.notes_container = QVBoxLayout(self.notes_container_widget)
-        self.notes_container.setAlignment(Qt.AlignCenter)
-        self.notes_container.setSpacing(20)
-
-        self.scroll_area.setWidget(self.notes_container_widget)
-        self.scroll_area.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        content_layout.addWidget(self.scroll_area)
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search all transcriptions and notes...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setMaximumWidth(500)
+        # Searches once typing pauses rather than on every key
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self.load_notes)
+        self.search_box.textChanged.connect(self._search_timer.start)
+        content_layout.addWidget(self.search_box, alignment=Qt.AlignHCenter)
+
+        # Only the visible rows are painted, and their cover thumbnails loaded
+        self.session_model = SessionListModel(self)
+        self.session_list = QListView()
+        self.session_list.setModel(self.session_model)
+        self.session_list.setItemDelegate(SessionDelegate(self.session_list))
+        self.session_list.setUniformItemSizes(True)
+        self.session_list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.session_list.setMouseTracking(True)
+        self.session_list.setStyleSheet("border: none; background: transparent;")
+        self.session_list.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.session_list.clicked.connect(lambda index: self.show_note_panel(index.data(FolderRole)))
+        content_layout.addWidget(self.session_list)
 
         main_layout.addLayout(content_layout)
         self.layout.addLayout(main_layout)
@@ -67,26 +93,43 @@ class NotesView(BaseView):
 
     def load_notes(self):
         """
-        Loads and displays notes from the data directory.
+        Updates the list of notes from the session catalog, changing only the rows that changed.
+
+        With a search query, only the sessions with hits are listed, best hit first, each with its best snippet.
         """
         if not os.path.exists(DATA_DIRECTORY):
             return
 
-        for i in reversed(range(self.notes_container.count())):
-            widget = self.notes_container.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
-        folders = [f for f in os.listdir(DATA_DIRECTORY) if os.path.isdir(os.path.join(DATA_DIRECTORY, f))]
-        for folder in sorted(folders, reverse=True):
+        session_catalog.sync()
+        catalog = session_catalog.list_sessions()
+        snippets = None
+        query = self.search_box.text().strip()
+        if query:
+            snippets = {}
+            for hit in search_index.search(query, limit=SEARCH_LIMIT):
+                snippets.setdefault(hit["folder"], hit["snippet"])
+            rank = {folder: i for i, folder in enumerate(snippets)}
+            catalog = sorted((session for session in catalog if session["folder"] in rank),
+                             key=lambda session: rank[session["folder"]])
+
+        sessions = []
+        for session in catalog:
+            if not session["cover_path"]:
+                continue
+            folder = session["folder"]
             formatted_date = self.format_folder_name(folder)
-            screenshot_path = self.get_random_screenshot(os.path.join(DATA_DIRECTORY, folder, "screenshots"))
-            workspace_name = get_workspace_name(os.path.join(DATA_DIRECTORY, folder))
-
-            display_name = f"{workspace_name}\n\n{formatted_date}" if workspace_name else formatted_date
-
-            if screenshot_path:
-                self.add_note_widget(folder, display_name, screenshot_path)
+            workspace_name = session["ws_name"]
+
+            if snippets is not None:
+                snippet = re.sub(r"\s+", " ", snippets[folder])
+                if len(snippet) > SNIPPET_LENGTH:
+                    snippet = snippet[:SNIPPET_LENGTH - 1] + "…"
+                title = f"{workspace_name}\n{formatted_date}" if workspace_name else formatted_date
+                display_name = f"{title}\n{snippet}"
+            else:
+                display_name = f"{workspace_name}\n\n{formatted_date}" if workspace_name else formatted_date
+            sessions.append({"folder": folder, "display_name": display_name, "cover_path": session["cover_path"]})
+        self.session_model.set_sessions(sessions)
 
     def format_folder_name(self, folder_name):
         """
@@ -98,54 +141,6 @@ class NotesView(BaseView):
         except ValueError:
             return folder_name
 
-    def get_random_screenshot(self, screenshots_dir):
-        """
-        Retrieves a random screenshot from the specified directory.
-        """
-        if not os.path.exists(screenshots_dir):
-            return None
-
-        screenshots = [f for f in os.listdir(screenshots_dir) if f.lower().endswith((".png", ".jpg", ".jpeg"))]
-        if not screenshots:
-            return None
-
-        return os.path.join(screenshots_dir, random.choice(screenshots))
-
-    def add_note_widget(self, folder_name, display_name, screenshot_path):
-        """
-        Creates and adds a note widget to the layout.
-        """
-        note_widget = QPushButton()
-        note_widget.setStyleSheet(
-            "border-radius: 10px; "
-            "background-color: #444; "
-            "padding: 10px; "
-            "min-width: 500px; "
-            "max-width: 500px; "
-            "min-height: 120px; "
-        )
-
-        layout = QHBoxLayout()
-
-        pixmap = QPixmap(screenshot_path)
-        pixmap = pixmap.scaledToWidth(200, Qt.SmoothTransformation)
-        image_label = QLabel()
-        image_label.setPixmap(pixmap)
-        image_label.setAlignment(Qt.AlignLeft)
-
-        date_label = QLabel(display_name)
-        date_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        date_label.setFont(self.font())
-
-        layout.addWidget(image_label)
-        layout.addWidget(date_label)
-        layout.addStretch()
-        note_widget.setLayout(layout)
-
-        note_widget.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Preferred)
-        note_widget.clicked.connect(lambda: self.show_note_panel(folder_name))
-        self.notes_container.addWidget(note_widget, alignment=Qt.AlignCenter)
-
     def show_note_panel(self, folder_name):
         """
         Displays the NotePanel for the selected note folder, hiding the list view.
@@ -154,12 +149,17 @@ class NotesView(BaseView):
             self.note_panel.deleteLater()
 
         self.note_panel = NotePanel(folder_name, self.return_to_notes_view)
+        # Highlights the searched words in the opened session
+        self.note_panel.transcription_search.setText(self.search_box.text().strip())
+        self.note_panel.summary_search.setText(self.search_box.text().strip())
         self.layout.addWidget(self.note_panel)
-        self.scroll_area.hide()
+        self.search_box.hide()
+        self.session_list.hide()
 
     def return_to_notes_view(self):
         """Hides the NotePanel and shows the list of notes again."""
         if self.note_panel:
             self.note_panel.deleteLater()
             self.note_panel = None
-        self.scroll_area.show()
+        self.search_box.show()
+        self.session_list.show()
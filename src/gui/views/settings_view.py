@@ -1,13 +1,14 @@
 import re
 import os
 import sys
+import json
 
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (QVBoxLayout, QLabel, QPushButton, QLineEdit,
                                QFileDialog, QComboBox, QSpinBox, QMessageBox, QHBoxLayout, QSpacerItem, QSizePolicy)
 from src.utils.languages import LANGUAGES
 
-from src.config import settings, update_settings
+from src.config import settings, update_settings, TRANSCRIPTION_STATS_FILE
 from src.gui.views.base_view import BaseView
 from src.utils.logger import app_logger
 
@@ -27,10 +28,14 @@ class SettingsView(BaseView):
         Input field for specifying the data directory path.
     max_size_spinbox : QSpinBox
         Spin box for selecting the maximum size of the data directory (in GB).
+    storage_policy_combo : QComboBox
+        Dropdown for selecting what is done when the data directory exceeds its maximum size.
     calendar_url_input : QLineEdit
         Input field for specifying the Google Calendar URL.
     model_combo : QComboBox
         Dropdown for selecting the speech-to-text model size.
+    profile_combo : QComboBox
+        Dropdown for selecting the speech-to-text speed profile.
     language_combo : QComboBox
         Dropdown for selecting the transcription language.
 
@@ -102,6 +107,23 @@ class SettingsView(BaseView):
         max_size_layout.addWidget(self.max_size_spinbox)
         content_layout.addLayout(max_size_layout)
 
+        # Storage Policy
+        storage_policy_layout = QVBoxLayout()
+        storage_policy_layout.setSpacing(10)
+        storage_policy_label = QLabel("When the data folder is full (oldest sessions first):")
+        self.storage_policy_combo = QComboBox()
+        for policy, label in [("none", "Only warn"),
+                              ("drop_raw_audio", "Delete transcribed raw audio merged into the video"),
+                              ("compress", "Delete raw audio, then compress videos"),
+                              ("delete_oldest", "Delete raw audio, compress videos, then delete sessions")]:
+            self.storage_policy_combo.addItem(label, policy)
+        self.storage_policy_combo.setCurrentIndex(
+            max(self.storage_policy_combo.findData(settings.get("storage_policy", "none")), 0))
+        self.storage_policy_combo.setFixedWidth(input_width)
+        storage_policy_layout.addWidget(storage_policy_label)
+        storage_policy_layout.addWidget(self.storage_policy_combo)
+        content_layout.addLayout(storage_policy_layout)
+
         # Calendar URL
         calendar_url_layout = QVBoxLayout()
         calendar_url_layout.setSpacing(10)
@@ -124,6 +146,23 @@ class SettingsView(BaseView):
         model_layout.addWidget(self.model_combo)
         content_layout.addLayout(model_layout)
 
+        # Transcription Speed Profile
+        profile_layout = QVBoxLayout()
+        profile_layout.setSpacing(10)
+        profile_label = QLabel("Transcription Speed Profile (RTF = processing time / audio length, lower is faster):")
+        self.profile_combo = QComboBox()
+        real_time_factors = self._load_real_time_factors()
+        for profile in ["fast", "balanced", "accurate"]:
+            rtf = real_time_factors.get(profile, {}).get(self.model_combo.currentText())
+            label = f"{profile} (last RTF {rtf:.2f})" if rtf is not None else profile
+            self.profile_combo.addItem(label, profile)
+        self.profile_combo.setCurrentIndex(
+            max(self.profile_combo.findData(settings.get("transcription_profile", "balanced")), 0))
+        self.profile_combo.setFixedWidth(input_width)
+        profile_layout.addWidget(profile_label)
+        profile_layout.addWidget(self.profile_combo)
+        content_layout.addLayout(profile_layout)
+
         # Transcription Language
         language_layout = QVBoxLayout()
         language_layout.setSpacing(10)
@@ -162,6 +201,20 @@ class SettingsView(BaseView):
 
         self.layout.addLayout(main_layout)
 
+    @staticmethod
+    def _load_real_time_factors():
+        """
+        Loads the real-time factors measured by SpeechToText for each profile and model size.
+
+        :return: A mapping of profile name to a mapping of model size to real-time factor.
+        :rtype: dict
+        """
+        try:
+            with open(TRANSCRIPTION_STATS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
     def _browse_data_directory(self):
         """
         Opens a file dialog to select a data directory.
@@ -210,7 +263,9 @@ class SettingsView(BaseView):
         new_settings = {
             "data_directory": self.data_dir_input.text(),
             "max_data_size_gb": self.max_size_spinbox.value(),
+            "storage_policy": self.storage_policy_combo.currentData(),
             "model_size": self.model_combo.currentText(),
+            "transcription_profile": self.profile_combo.currentData(),
             "transcription_language": self.language_combo.currentData(),
             "calendar_url": self.calendar_url_input.text(),
             "open_ai_api_key": self.api_key_input.text().strip(),
@@ -1,96 +1,126 @@
 from src.services.note_taker import NoteTaker
-import json
-from src.config import SETTINGS_FILE, DATA_DIRECTORY
-import time
+from src.config import DATA_DIRECTORY, CACHE_DIRECTORY
 from src.utils.logger import app_logger
 from src.services.note_taker import NoteTaker
+from src.services.settings_watcher import settings_watcher
+from src.services.llm_scheduler import llm_scheduler
+from src.services.extractive_summarizer import ExtractiveSummarizer, NOTE_SENTENCES
+from src.utils.text_chunker import count_tokens
+from src.utils.disk_cache import DiskCache
+from src.managers.workspace_index import WorkspaceIndex
+from src.managers.options_store import options_store
+from src.managers.session_catalog import session_catalog
+from src.managers.search_index import search_index
+from src.managers.screenshot_store import screenshot_store
+from src.managers.session_archive import session_archive
 import multiprocessing
 import os
+import queue
 import threading
+import time
+from concurrent.futures import as_completed
 from functools import partial
 
+NOTE_LENGTHS = ('short', 'medium', 'long')
+
+# Tokens reserved for the generated notes when estimating the cost of a request
+NOTES_COMPLETION_TOKENS = 1500
+
 class NoteManager:
     """
     NoteManager class that handles API key updates, workspace scanning, and note generation.
 
     Attributes:
         api_key (str): The API key for accessing the note-taking service.
-        ws_json_list (list): A list of workspace JSON objects.
-        api_key_queue (multiprocessing.Queue): Queue to send API key updates.
-        ws_json_queue (multiprocessing.Queue): Queue to send workspace JSON updates.
+        workspaces (WorkspaceIndex): Incremental index of the workspaces, keyed by workspace name.
+        notes_cache (DiskCache): Generated notes, keyed by transcription, prompts, length, model and format.
+        event_queue (queue.Queue): Queue merging the ('api_key', key) events from the settings watcher
+            and the ('ws_delta', delta) events from the scanning thread; None is the shutdown sentinel.
         generate_notes_queue (multiprocessing.Queue): Queue to send note generation tasks.
-        __update_api_key_proc (multiprocessing.Process): Process to handle API key updates.
-        __scan_data_workspaces_proc (multiprocessing.Process): Process to handle workspace scanning.
-        listener_thread (threading.Thread): Thread to listen for updates from processes.
+        stop_event (threading.Event): Event telling the scanning thread to stop.
+        scan_thread (threading.Thread): Thread refreshing the workspace index.
+        listener_thread (threading.Thread): Thread to listen for updates from the watcher and the scanning thread.
 
     Methods:
         __init__(): Initializes the NoteManager class.
-        __listen_for_updates(): Listens for updates from processes and handles them.
-        get_api_key_from_settings_worker(queue): Worker function to retrieve API key from settings file.
+        __listen_for_updates(): Listens for updates from the watcher and the scanning thread and handles them.
+        shutdown(): Stops the scanning and listener threads.
+        cb_settings_changed(changed): Callback of the settings watcher forwarding API key changes to the listener.
         cb_get_api_key_from_settings(api_key): Callback function to handle API key updates.
-        scan_data_workspaces_worker(queue): Worker function to scan data workspaces.
-        cb_scan_data_workspaces(json): Callback function to handle workspace JSON updates.
-        generate_notes(ws_name): Generates notes for a specific workspace.
+        scan_data_workspaces_worker(): Worker thread refreshing the workspace index.
+        cb_scan_data_workspaces(delta): Callback function to handle workspace index changes.
+        generate_notes(ws_name, on_partial=None): Generates notes for a specific workspace through the LLM scheduler.
+        generate_local_notes(ws_name, transcription_txt, lengths): Generates extractive notes locally.
+        cb_notes_done(ws_name, note_type, future): Saves the notes of a finished scheduler request.
+        workspace_created(ws_name): Returns the creation time of a workspace folder.
         cb_save_notes(ws_name, note_type, notes): Callback function to save generated notes to a specific file.
-        compare_options(option1, option2): Compares two options dictionaries.
-        update_options(ws_name, key, value): Updates a specific key in the options.json file for a given workspace.
+        update_options(ws_name, key, value): Updates a specific key in the options.json file for a given workspace
+            through the options store.
     """
     def __init__(self):
-        self.api_key = None
-        self.ws_json_list = []
-        self.api_key_queue = multiprocessing.Queue()  # Queue to send API key updates
-        self.ws_json_queue = multiprocessing.Queue()  # Queue to send workspace JSON updates
+        self.api_key = settings_watcher.get('open_ai_api_key')
+        self.workspaces = WorkspaceIndex()
+        self.notes_cache = DiskCache(os.path.join(CACHE_DIRECTORY, 'notes'),
+                                     settings_watcher.get('notes_cache_size_mb', 64) * 1024 * 1024)
+        self.event_queue = queue.Queue()  # Queue to send API key and workspace index updates
         self.generate_notes_queue = multiprocessing.Queue()
+        self.stop_event = threading.Event()
 
 
-        # Process to handle API key updates
-        self.__update_api_key_proc = multiprocessing.Process(
-            target=self.get_api_key_from_settings_worker,
-            args=(self.api_key_queue,)
-        )
-        self.__update_api_key_proc.start()
+        # API key updates are published by the settings watcher when settings.json changes
+        settings_watcher.subscribe(self.cb_settings_changed, keys=['open_ai_api_key'])
 
-        # Process to handle workspace scanning
-        self.__scan_data_workspaces_proc = multiprocessing.Process(
-            target=self.scan_data_workspaces_worker,
-            args=(self.ws_json_queue,)
-        )
-        self.__scan_data_workspaces_proc.start()
+        # Thread to keep the workspace index up to date
+        self.scan_thread = threading.Thread(target=self.scan_data_workspaces_worker, daemon=True)
+        self.scan_thread.start()
 
-        # Main loop to listen for updates from processes
+        # Main loop to listen for updates from the watcher and the scanning thread
         self.listener_thread = threading.Thread(target=self.__listen_for_updates, daemon=True)
         self.listener_thread.start()
 
     def __listen_for_updates(self):
         """
-        Listens for updates from processes and handles them.
+        Listens for updates from the watcher and the scanning thread and handles them.
+
+        Blocks on the event queue, so the thread only wakes up when an event arrives,
+        and exits when the shutdown sentinel (None) is received.
         """
+        callbacks = {
+            'api_key': self.cb_get_api_key_from_settings,
+            'ws_delta': self.cb_scan_data_workspaces,
+        }
         while True:
-            if not self.api_key_queue.empty():
-                api_key = self.api_key_queue.get()
-                self.cb_get_api_key_from_settings(api_key)
-            
-            if not self.ws_json_queue.empty():
-                ws_json = self.ws_json_queue.get()
-                self.cb_scan_data_workspaces(ws_json)
+            event = self.event_queue.get()
+            if event is None:
+                break
 
-    @staticmethod
-    def get_api_key_from_settings_worker(queue):
+            event_type, payload = event
+            try:
+                callbacks[event_type](payload)
+            except Exception as e:
+                app_logger.error(f"NoteManager: Could not handle {event_type} event: {e}")
+
+    def shutdown(self):
+        """
+        Stops the scanning and listener threads.
         """
-        Worker function to retrieve API key from settings file.
+        settings_watcher.unsubscribe(self.cb_settings_changed)
+        self.stop_event.set()
+        self.scan_thread.join()
+
+        self.event_queue.put(None)
+        self.listener_thread.join()
+        options_store.flush()
+        app_logger.info("NoteManager: Shut down")
+
+    def cb_settings_changed(self, changed):
+        """
+        Callback of the settings watcher forwarding API key changes to the listener thread.
 
         Args:
-            queue (multiprocessing.Queue): Queue to send API key updates.
+            changed (dict): The changed settings.
         """
-        while True:
-            try:
-                with open(SETTINGS_FILE, 'r') as file:
-                    settings = json.load(file)
-                    queue.put(settings['open_ai_api_key'])  # Send API key back to main process
-            except Exception as e:
-                app_logger.error(f'NoteManager: Could not update OpenAi Api Key')
-            finally:
-                time.sleep(2)
+        self.event_queue.put(('api_key', changed['open_ai_api_key']))
 
     def cb_get_api_key_from_settings(self, api_key: str):
         """
@@ -104,122 +134,184 @@ class NoteManager:
         self.api_key = api_key
         app_logger.info(f'NoteManager: Api key changed: {self.api_key}')
 
-    @staticmethod
-    def scan_data_workspaces_worker(queue):
+    def scan_data_workspaces_worker(self):
         """
-        Worker function to scan data workspaces.
-
-        Args:
-            queue (multiprocessing.Queue): Queue to send workspace JSON updates.
+        Worker thread refreshing the workspace index and forwarding its deltas to the listener thread.
         """
-        while True:
+        while not self.stop_event.is_set():
             try:
-                dir_list = os.listdir(DATA_DIRECTORY)
-                default_json = '''{
-                        "ws_name":"", "transcription":false, "transcription_path":"",
-                        "can_generate_notes":false, "note_short_path":"", "note_medium_path":"",
-                        "note_long_path":"", "thread_id":"", "assistant_name":""
-                    }'''
-
-                for ws in dir_list:
-                    try:
-                        ws_json = json.loads(default_json)
-                        ws_json['ws_name'] = ws
-                        option_path = os.path.join(DATA_DIRECTORY, ws, 'options.json')
-
-                        if not os.path.exists(option_path):
-                            with open(option_path, 'w') as f:
-                                json.dump(ws_json, f, indent=4)
-                                app_logger.info(f'NoteManager: Options file in {ws} meeting not found. Creating one...')
-                            
-                            queue.put(ws_json)  # Send the workspace JSON back to main process
-                            break
-                        
-                        with open(option_path, 'r') as f:
-                            option_json = json.load(f)
-
-                        ws_json.update(option_json)
-                        queue.put(ws_json)  # Send the workspace JSON back to main process
-                    except Exception as e:
-                        app_logger.error(f"NoteManager: Could not scan {ws}: {e}")
-
+                for delta in self.workspaces.refresh():
+                    self.event_queue.put(('ws_delta', delta))
             except Exception as e:
                 app_logger.error(f"NoteManager: Could not scan data: {e}")
             finally:
-                time.sleep(2)
+                self.stop_event.wait(2)
 
-    def cb_scan_data_workspaces(self, json):
+    def cb_scan_data_workspaces(self, delta):
         """
-        Callback function to handle workspace JSON updates.
+        Callback function to handle workspace index changes, forwarding them to the session catalog.
 
         Args:
-            json (dict): The updated workspace JSON object.
+            delta (tuple): The (kind, ws_name, options) change reported by the workspace index.
         """
+        kind, ws_name, options = delta
+        if kind == WorkspaceIndex.ADDED:
+            app_logger.info(f"NoteManager: New ws added: {ws_name}")
+            if session_catalog.get(ws_name) is None:
+                session_catalog.scan_session(ws_name)
+            else:
+                session_catalog.update_from_options(ws_name, options)
+        elif kind == WorkspaceIndex.UPDATED:
+            app_logger.info(f"NoteManager: Difference detected: {ws_name}")
+            session_catalog.update_from_options(ws_name, options)
+        else:
+            app_logger.info(f"NoteManager: ws removed: {ws_name}")
+            session_catalog.remove(ws_name)
+            search_index.remove_session(ws_name)
+            screenshot_store.release_session(ws_name)
+
+    def generate_notes(self, ws_name, on_partial=None):
+        """
+        Generates notes for a specific workspace.
 
-        try:
-            for i, ws in enumerate(self.ws_json_list):
-                if ws['ws_name'] != json['ws_name']:
-                    continue
+        Notes already in the notes cache for the same transcription, prompts, length, model and format
+        are saved immediately; only the missing lengths are requested. Until they arrive, or if there is
+        no API key, the workspace gets extractive notes computed locally.
 
-                if not self.compare_options(ws, json):
-                    self.ws_json_list[i] = json
-                    app_logger.info(f"NoteManager: Difference detected: {ws['ws_name']}")
-                    return
-                return
+        Args:
+            ws_name (str): The name of the workspace.
+            on_partial (function, optional): Function called with (note_type, notes so far) while the notes are streamed.
+        """
+        ws = self.workspaces.get(ws_name)
+        if ws is None:
+            app_logger.error(f"NoteManager: Could not generate notes: Unknown workspace {ws_name}")
+            return
 
-            self.ws_json_list.append(json)
-            app_logger.info(f"NoteManager: New ws added: {json['ws_name']}")
+        if not ws['transcription'] or ws['transcription_path'] == "" or not ws['can_generate_notes']:
+            app_logger.error(f"NoteManager: Could not generate notes: No transcription found")
+            return
+        
+        transcription_path = ws['transcription_path']
+        transcription_txt = None
+
+        with open(session_archive.resolve(transcription_path) or transcription_path, 'r') as f:
+            transcription_txt = ''.join(f.readlines())
+        
+        if not self.api_key:
+            app_logger.warning(f"NoteManager: No API key, generating local notes for {ws_name}")
+            self.generate_local_notes(ws_name, transcription_txt)
+            return
+
+        noteTaker = NoteTaker(self.api_key, 'MD')
+
+        assistant_id = noteTaker.create_assistant()
+
+        # Identical requests are served from the notes cache without calling OpenAI
+        cache_keys = {length: noteTaker.notes_cache_key(transcription_txt, length.upper()) for length in NOTE_LENGTHS}
+        lengths = []
+        for length in NOTE_LENGTHS:
+            cached = self.notes_cache.get(cache_keys[length])
+            if cached is None:
+                lengths.append(length)
+            else:
+                self.cb_save_notes(ws_name, length, cached['notes'])
+        if not lengths:
+            app_logger.info(f"NoteManager: Notes for {ws_name} served from cache")
+            return
+
+        # Local notes are shown right away and replaced when the LLM notes arrive
+        missing = [length for length in lengths if not ws.get(f'note_{length}_path')]
+        if missing:
+            self.generate_local_notes(ws_name, transcription_txt, missing)
 
+        # The most recent sessions go first: they are the ones the user is waiting for
+        priority = -self.workspace_created(ws_name)
+
+        # Long meetings do not fit in the model's context, so they are summarized in chunks first
+        try:
+            transcription_txt = noteTaker.condense_transcription(transcription_txt, scheduler=llm_scheduler,
+                                                                 priority=priority)
         except Exception as e:
-            app_logger.error(f"NoteManager: Could not update ws list: {e}")
+            app_logger.error(f"NoteManager: Could not condense transcription of {ws_name}: {e}")
+            return
+
+        # An Assistants thread runs one request at a time, so every length gets its own thread
+        thread_ids = dict(ws.get('thread_ids') or {})
+        if any(not thread_ids.get(length) for length in lengths):
+            for length in NOTE_LENGTHS:
+                thread_ids[length] = thread_ids.get(length) or noteTaker.create_thread()
+            ws['thread_ids'] = thread_ids
+
+            self.update_options(ws['ws_name'], 'thread_ids', thread_ids)
+
+        started = time.time()
+        tokens = count_tokens(transcription_txt) + NOTES_COMPLETION_TOKENS
+        futures = {}
+        for length in lengths:
+            partial_callback = partial(on_partial, length) if on_partial else None
+            job = noteTaker.notes_job(assistant_id=assistant_id, thread_id=thread_ids[length],
+                                      transcription=transcription_txt, notes_length=length.upper(),
+                                      on_partial=partial_callback)
+            future = llm_scheduler.submit(job, priority=priority, tokens=tokens, name=f'{ws_name}/{length}')
+            futures[future] = length
+        for future in as_completed(futures):
+            length = futures[future]
+            if not future.cancelled() and future.exception() is None:
+                try:
+                    self.notes_cache.set(cache_keys[length], {'notes': future.result()})
+                except OSError as e:
+                    app_logger.warning(f"NoteManager: Could not cache {length} notes of {ws_name}: {e}")
+            self.cb_notes_done(ws_name, length, future, started=started)
+
+        app_logger.info(f"NoteManager: Notes for {ws_name} generated in {time.time() - started:.1f}s")
 
-    def generate_notes(self, ws_name):
+    @staticmethod
+    def generate_local_notes(ws_name, transcription_txt, lengths=NOTE_LENGTHS):
         """
-        Generates notes for a specific workspace.
+        Generates extractive notes locally, without calling OpenAI.
 
         Args:
             ws_name (str): The name of the workspace.
+            transcription_txt (str): The transcription text.
+            lengths (iterable): The note types to generate ('short', 'medium', 'long').
         """
-        for i, ws in enumerate(self.ws_json_list):
-            if ws['ws_name'] != ws_name:
-                continue
-
-            if not ws['transcription'] or ws['transcription_path'] == "" or not ws['can_generate_notes']:
-                app_logger.error(f"NoteManager: Could not generate notes: No transcription found")
-                return
-            
-            transcription_path = ws['transcription_path']
-            transcription_txt = None
-
-            with open(transcription_path, 'r') as f:
-                transcription_txt = ''.join(f.readlines())
-            
-            noteTaker = NoteTaker(self.api_key, 'MD')
-
-            assistant_id = noteTaker.create_assistant()
-            thread_id = ws['thread_id']
+        started = time.time()
+        sentences = {length: NOTE_SENTENCES[length] for length in lengths}
+        for length, notes in ExtractiveSummarizer().summarize(transcription_txt, sentences).items():
+            NoteManager.cb_save_notes(ws_name, length, notes, started=started)
 
-            if thread_id == '':
-                thread_id = noteTaker.create_thread()
-                self.ws_json_list[i]['thread_id'] = thread_id
+    @staticmethod
+    def cb_notes_done(ws_name, note_type, future, started=None):
+        """
+        Saves the notes of a finished LLM scheduler request.
 
-                self.update_options(ws['ws_name'], 'thread_id', thread_id)
-            
-            callback = partial(self.cb_save_notes, ws_name, 'short')
+        Args:
+            ws_name (str): The name of the workspace.
+            note_type (str): The type of notes ('short', 'medium', 'long').
+            future (concurrent.futures.Future): The finished request; its error is already logged by the scheduler.
+            started (float, optional): time.time() when the generation started, used to log the latency.
+        """
+        notes = None if future.cancelled() or future.exception() else future.result()
+        NoteManager.cb_save_notes(ws_name, note_type, notes, started=started)
 
-            proc = noteTaker.generate_notes(assistant_id=assistant_id, thread_id=thread_id, transcription=transcription_txt, callback=callback)
-            proc.join()
+    @staticmethod
+    def workspace_created(ws_name):
+        """
+        Returns the creation time of a workspace folder.
 
-            callback1 = partial(self.cb_save_notes, ws_name, 'medium')
-            proc = noteTaker.modify_notes(assistant_id=assistant_id, thread_id=thread_id, notes_length='MEDIUM', callback=callback1)
-            proc.join()
+        Args:
+            ws_name (str): The name of the workspace.
 
-            callback2 = partial(self.cb_save_notes, ws_name, 'long')
-            proc = noteTaker.modify_notes(assistant_id=assistant_id, thread_id=thread_id, notes_length='LONG', callback=callback2)
-            proc.join()
+        Returns:
+            float: The creation time (Unix timestamp), or 0 if the folder is missing.
+        """
+        try:
+            return os.stat(os.path.join(DATA_DIRECTORY, ws_name)).st_ctime
+        except OSError:
+            return 0
 
     @staticmethod
-    def cb_save_notes(ws_name, note_type: str, notes):
+    def cb_save_notes(ws_name, note_type: str, notes, started=None):
         """
         Callback function to save generated notes to a specific file.
 
@@ -227,65 +319,38 @@ class NoteManager:
             ws_name (str): The name of the workspace.
             note_type (str): The type of notes to save ('short', 'medium', 'long').
             notes (str): The generated notes content.
+            started (float, optional): time.time() when the generation started, used to log the latency.
         """
+        if notes is None:
+            app_logger.error(f"NoteManager: No {note_type} notes generated for workspace {ws_name}")
+            return
+
         try:
 
             path = os.path.join(DATA_DIRECTORY, ws_name, f"note_{note_type}.txt")
 
             with open(path, 'w') as file:
                 file.write(notes)
-            app_logger.info(f"NoteManager: {note_type} saved for workspace {ws_name}")
+            session_catalog.record_file(path)
+            search_index.index_file(path)
+            latency = f" after {time.time() - started:.1f}s" if started else ""
+            app_logger.info(f"NoteManager: {note_type} saved for workspace {ws_name}{latency}")
 
             NoteManager.update_options(ws_name=ws_name, key=f'note_{note_type.lower()}_path', value=path)
         except Exception as e:
             app_logger.error(f"NoteManager: Failed to save {note_type} for {ws_name}: {e}")
 
-    @staticmethod
-    def compare_options(option1, option2):
-        """
-        Compares two options dictionaries.
-
-        Args:
-            option1 (dict): The first options dictionary.
-            option2 (dict): The second options dictionary.
-
-        Returns:
-            bool: True if the dictionaries are identical, False otherwise.
-        """
-        for key, value in option2.items():
-            if option1[key] != value:
-                return False
-        return True
-
     @staticmethod
     def update_options(ws_name, key, value):
         """
         Updates a specific key in the options.json file for a given workspace.
 
+        The update goes through the options store, which coalesces the updates made in a row
+        into one atomic write.
+
         Args:
             ws_name (str): The name of the workspace.
             key (str): The key to update in options.json.
             value (str): The new value for the key.
         """
-        option_path = os.path.join(DATA_DIRECTORY, ws_name, 'options.json')
-
-        if not os.path.exists(option_path):
-            app_logger.error(f"NoteManager: options.json not found for workspace '{ws_name}'")
-            return
-
-        try:
-            with open(option_path, 'r') as file:
-                options = json.load(file)
-
-            if key not in options:
-                app_logger.warning(f"NoteManager: Key '{key}' not found in options.json for '{ws_name}', adding it.")
-
-            options[key] = value
-
-            with open(option_path, 'w') as file:
-                json.dump(options, file, indent=4)
-
-            app_logger.info(f"NoteManager: Updated '{key}' in '{ws_name}/options.json' to '{value}'")
-
-        except Exception as e:
-            app_logger.error(f"NoteManager: Failed to update options.json for '{ws_name}': {e}")
+        options_store.update(ws_name, {key: value})
@@ -0,0 +1,234 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+from src.config import DATA_DIRECTORY
+from src.managers.session_catalog import session_catalog
+from src.utils.file_lock import FileLock
+from src.utils.logger import app_logger
+
+LOCK_FILE = '.options.lock'
+
+
+class OptionsStore:
+    """
+    Cached, write-coalescing store of the workspaces' options.json files.
+
+    Options are kept in memory once read. Updates are applied to the cache at once and written by a
+    background thread after ``flush_delay`` seconds, so several keys updated in a row (e.g. the three
+    note paths) cost a single write. A write takes the workspace's lock file, re-reads options.json
+    to keep the keys written by other processes, applies the pending keys and replaces the file
+    atomically (temporary file + rename), so readers never see a torn file and no update is lost.
+
+    Attributes:
+        data_directory (str): The directory containing the workspaces.
+        flush_delay (float): The time (in seconds) updates are collected before being written.
+
+    Methods:
+        get(ws_name): Returns the options of a workspace.
+        update(ws_name, values): Updates keys of a workspace's options.
+        create(ws_name, options): Writes a workspace's options.json if it does not exist.
+        flush(): Writes the pending updates now.
+        close(): Writes the pending updates and stops the writer thread.
+    """
+
+    def __init__(self, data_directory=DATA_DIRECTORY, flush_delay=0.2):
+        self.data_directory = data_directory
+        self.flush_delay = flush_delay
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._options = {}
+        self._signatures = {}
+        self._pending = {}
+        self._dirty = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _path(self, ws_name):
+        return os.path.join(self.data_directory, ws_name, 'options.json')
+
+    def get(self, ws_name):
+        """
+        Returns the options of a workspace, including its pending updates.
+
+        The file is only read again when its modification time or size changed.
+
+        Args:
+            ws_name (str): The name of the workspace.
+
+        Returns:
+            dict or None: A copy of the options, or None if the workspace has no options.json.
+        """
+        try:
+            stat = os.stat(self._path(ws_name))
+        except OSError:
+            stat = None
+
+        with self._lock:
+            cached = self._options.get(ws_name)
+            if cached is not None and (stat is None or self._signatures.get(ws_name) == (stat.st_mtime_ns, stat.st_size)):
+                return dict(cached)
+        if stat is None:
+            return None
+
+        options = self._read(ws_name)
+        if options is None:
+            return None
+        with self._lock:
+            options.update(self._pending.get(ws_name, {}))
+            self._options[ws_name] = options
+            self._signatures[ws_name] = (stat.st_mtime_ns, stat.st_size)
+            return dict(options)
+
+    def update(self, ws_name, values):
+        """
+        Updates keys of a workspace's options. The write happens in the background.
+
+        Args:
+            ws_name (str): The name of the workspace.
+            values (dict): The keys and their new values.
+
+        Returns:
+            bool: False if the workspace has no options.json.
+        """
+        if self.get(ws_name) is None:
+            app_logger.error(f"OptionsStore: options.json not found for workspace '{ws_name}'")
+            return False
+
+        with self._lock:
+            self._options[ws_name].update(values)
+            self._pending.setdefault(ws_name, {}).update(values)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_worker, daemon=True)
+                self._thread.start()
+        self._dirty.set()
+        return True
+
+    def create(self, ws_name, options):
+        """
+        Writes a workspace's options.json if it does not exist yet, under its lock file.
+
+        Args:
+            ws_name (str): The name of the workspace.
+            options (dict): The initial options.
+
+        Returns:
+            bool: True if the file was created, False if it already existed.
+        """
+        with FileLock(os.path.join(self.data_directory, ws_name, LOCK_FILE)):
+            if os.path.exists(self._path(ws_name)):
+                return False
+            self._replace(ws_name, options)
+        session_catalog.record_file(self._path(ws_name))
+        return True
+
+    def flush(self):
+        """
+        Writes the pending updates of every workspace now.
+
+        Updates that could not be written (e.g. locked file, full disk) are kept pending, under any newer
+        updates of the same keys, and retried by the next flush. Updates of deleted workspaces are dropped.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for ws_name, values in pending.items():
+                try:
+                    self._write(ws_name, values)
+                except Exception as e:
+                    app_logger.error(f"OptionsStore: Failed to update options.json for '{ws_name}': {e}")
+                    if not os.path.isdir(os.path.join(self.data_directory, ws_name)):
+                        continue
+                    with self._lock:
+                        values = dict(values)
+                        values.update(self._pending.get(ws_name, {}))
+                        self._pending[ws_name] = values
+
+    def close(self):
+        """
+        Writes the pending updates and stops the writer thread.
+        """
+        self._stop_event.set()
+        self._dirty.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _flush_worker(self):
+        """
+        Writer thread: waits for updates, lets more of them arrive for ``flush_delay``, then writes them.
+        """
+        while not self._stop_event.is_set():
+            self._dirty.wait()
+            self._stop_event.wait(self.flush_delay)
+            self._dirty.clear()
+            self.flush()
+
+    def _read(self, ws_name):
+        """
+        Reads a workspace's options.json.
+
+        Returns:
+            dict or None: The options, or None if the file is missing or unreadable.
+        """
+        try:
+            with open(self._path(ws_name), 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            app_logger.warning(f"OptionsStore: Could not read options.json of '{ws_name}': {e}")
+            return None
+
+    def _write(self, ws_name, values):
+        """
+        Merges updates into a workspace's options.json under its lock file and replaces the file atomically.
+
+        Args:
+            ws_name (str): The name of the workspace.
+            values (dict): The keys and their new values.
+        """
+        path = self._path(ws_name)
+        with FileLock(os.path.join(self.data_directory, ws_name, LOCK_FILE)):
+            options = self._read(ws_name)
+            if options is None:
+                with self._lock:
+                    options = dict(self._options.get(ws_name, {}))
+            options.update(values)
+            stat = self._replace(ws_name, options)
+
+        with self._lock:
+            # Keep the updates that arrived while writing on top of what is now on disk
+            options.update(self._pending.get(ws_name, {}))
+            self._options[ws_name] = options
+            self._signatures[ws_name] = (stat.st_mtime_ns, stat.st_size)
+        session_catalog.record_file(path)
+        session_catalog.update_from_options(ws_name, options)
+        app_logger.info(f"OptionsStore: Updated {sorted(values)} in '{ws_name}/options.json'")
+
+    def _replace(self, ws_name, options):
+        """
+        Replaces a workspace's options.json atomically (temporary file + rename); the caller holds the lock file.
+
+        Returns:
+            os.stat_result: The status of the new file.
+        """
+        path = self._path(ws_name)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(options, file, indent=4)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return os.stat(path)
+
+
+# Shared store of the workspace options
+options_store = OptionsStore()
+atexit.register(options_store.close)
@@ -6,11 +6,14 @@ from datetime import datetime
 from pygetwindow import getWindowsWithTitle
 
 from src.config import DATA_DIRECTORY
+from src.managers.session_catalog import session_catalog
+from src.managers.storage_governor import storage_governor
 from src.services.audio_recorder import AudioRecorder
 from src.services.merge_media import MergeMedia
 from src.services.screenshot_taker import ScreenshotTaker
 from src.services.video_recorder import VideoRecorder
 from src.utils.logger import app_logger
+from src.utils.thumbnail_cache import thumbnail_cache
 
 
 class RecorderManager:
@@ -38,6 +41,8 @@ class RecorderManager:
 
     Methods
     -------
+    recording_sessions()
+        Returns the session folders being recorded by any RecorderManager in this process.
     start_recording()
         Starts audio, video, and screenshot recording for the target window.
     stop_recording()
@@ -46,6 +51,10 @@ class RecorderManager:
         Monitors the target window and stops recording if the window is closed.
     """
 
+    # Session folders being recorded, shared by every instance
+    _recording_sessions = set()
+    _recording_sessions_lock = threading.Lock()
+
     def __init__(self, window_title):
         """
         Initializes the RecorderManager class.
@@ -60,6 +69,19 @@ class RecorderManager:
         self.video_recorder = None
         self.screenshot_taker = None
 
+    @classmethod
+    def recording_sessions(cls):
+        """
+        Returns the session folders being recorded by any RecorderManager in this process.
+
+        Unlike the ``is_recording`` column of the session catalog, this cannot be left set by a crash.
+
+        :returns: The folder names.
+        :rtype: set
+        """
+        with cls._recording_sessions_lock:
+            return set(cls._recording_sessions)
+
     def _create_session_directory(self):
         """
         Creates a session directory to store the recorded data.
@@ -72,6 +94,7 @@ class RecorderManager:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.session_dir = os.path.join(DATA_DIRECTORY, timestamp)
         os.makedirs(self.session_dir, exist_ok=True)
+        session_catalog.update(timestamp, created_at=time.time(), is_recording=1)
         app_logger.info(f"Session directory created at {self.session_dir}.")
 
     def start_recording(self):
@@ -94,6 +117,8 @@ class RecorderManager:
             self.screenshot_taker = ScreenshotTaker(self.session_dir, self.window_title)
 
             self.is_recording = True
+            with self._recording_sessions_lock:
+                self._recording_sessions.add(os.path.basename(self.session_dir))
 
             self.audio_thread = threading.Thread(target=self.audio_recorder.start_recording)
             self.video_thread = threading.Thread(target=self.video_recorder.start_recording)
@@ -137,6 +162,17 @@ class RecorderManager:
         merger = MergeMedia(self.session_dir)
         merger.merge_audio_video()
 
+        folder = os.path.basename(self.session_dir)
+        session_catalog.scan_session(folder)
+        session_catalog.update(folder, is_recording=0)
+        with self._recording_sessions_lock:
+            self._recording_sessions.discard(folder)
+        session = session_catalog.get(folder)
+        if session and session['cover_path']:
+            # Makes the cover thumbnail now, so the Notes view does not have to
+            thumbnail_cache.request(session['cover_path'])
+        storage_governor.enforce_async()
+
         app_logger.info("Recording stopped.")
 
     def monitor_window(self):
@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+import imagehash
+from PIL import Image
+
+from src.config import DATA_DIRECTORY, SCREENSHOT_STORE_DIRECTORY
+from src.services.settings_watcher import settings_watcher
+from src.utils.logger import app_logger
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+MANIFEST_FILE = 'manifest.jsonl'
+# Whole-file manifest written before manifests became append-only; still read
+LEGACY_MANIFEST_FILE = 'manifest.json'
+
+
+class ScreenshotStore:
+    """
+    Content-addressed store of the screenshots of every session.
+
+    Each distinct screenshot is saved once as ``<directory>/<hash[:2]>/<hash>.png``, keyed by the SHA-256
+    of its pixels, so a slide or dashboard shown in many meetings costs one file and a capture that is
+    already stored is not even encoded. With ``phash_distance`` above 0, a capture whose perceptual hash
+    is that close to a stored one reuses it too.
+
+    Every session keeps an append-only manifest (``screenshots/manifest.jsonl``) with one line per stored
+    screenshot, naming the blob it references; a later line for the same name replaces the earlier one.
+    The store's SQLite index counts the references to every blob, and a blob is deleted when the last
+    session referencing it is released. A reference is counted before its blob is written, and blobs are
+    deleted under the same lock, so a blob being added is never deleted by a concurrent release. Sessions recorded
+    before the store existed keep their image files in ``screenshots/`` until `import_session` moves
+    them into the store.
+
+    Attributes:
+        directory (str): The directory holding the blobs and their index.
+        data_directory (str): The directory containing the session folders.
+        phash_distance (int): The maximum perceptual hash distance (in bits, out of 64) for two captures
+            to share a blob, 0 to only share identical captures.
+
+    Methods:
+        add(folder, name, image, phash=None): Stores a screenshot of a session.
+        import_session(folder): Moves the image files of a session into the store.
+        optimize_session(folder): Recompresses the blobs of a session with the slowest PNG settings.
+        list_screenshots(folder): Returns the paths of a session's screenshots in capture order.
+        release_session(folder): Drops a session's references and deletes the blobs nobody references.
+        collect_garbage(): Releases the sessions whose folder was deleted.
+        total_size(): Returns the size of the stored blobs.
+    """
+
+    def __init__(self, directory=SCREENSHOT_STORE_DIRECTORY, data_directory=DATA_DIRECTORY, phash_distance=0):
+        self.directory = directory
+        self.data_directory = data_directory
+        self.phash_distance = phash_distance
+        self._lock = threading.Lock()
+        self._phashes = None
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(os.path.join(directory, 'index.sqlite3'),
+                                           check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, phash INTEGER, size INTEGER, refcount INTEGER, '
+                'optimized INTEGER DEFAULT 0)')
+            if 'optimized' not in {row[1] for row in self._connection.execute('PRAGMA table_info(blobs)')}:
+                self._connection.execute('ALTER TABLE blobs ADD COLUMN optimized INTEGER DEFAULT 0')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS refs (folder TEXT, name TEXT, hash TEXT, PRIMARY KEY (folder, name))')
+
+    def blob_path(self, digest):
+        """Returns the path of a blob."""
+        return os.path.join(self.directory, digest[:2], f'{digest}.png')
+
+    def add(self, folder, name, image, phash=None):
+        """
+        Stores a screenshot of a session, writing it only if no identical (or close enough) blob exists.
+
+        Args:
+            folder (str): The session folder name.
+            name (str): The screenshot's name in the session (e.g. 'screenshot_<timestamp>.png').
+            image (PIL.Image.Image): The screenshot.
+            phash (imagehash.ImageHash, optional): The perceptual hash of the image, if already computed.
+
+        Returns:
+            str: The path of the blob holding the screenshot.
+        """
+        digest = hashlib.sha256(f'{image.mode}{image.size}'.encode() + image.tobytes()).hexdigest()
+        if phash is None and self.phash_distance:
+            phash = imagehash.phash(image)
+        phash_value = int(str(phash), 16) if phash is not None else None
+
+        with self._lock:
+            known = self._connection.execute('SELECT 1 FROM blobs WHERE hash = ?', (digest,)).fetchone()
+            if not known and phash_value is not None and self.phash_distance:
+                digest = self._find_similar(phash_value) or digest
+            # The reference keeps the blob from being deleted by a release while it is written
+            self._add_reference(folder, name, digest, phash_value)
+            path = self.blob_path(digest)
+            stored = os.path.exists(path)
+
+        if not stored:
+            try:
+                self._write_blob(path, image)
+            except Exception:
+                self._drop_reference(folder, name, digest)
+                raise
+            with self._lock:
+                self._connection.execute('UPDATE blobs SET size = ? WHERE hash = ?', (os.path.getsize(path), digest))
+        self._append_manifest(folder, name, digest)
+        return path
+
+    def import_session(self, folder):
+        """
+        Moves the image files of a session's ``screenshots`` folder into the store.
+
+        Args:
+            folder (str): The session folder name.
+
+        Returns:
+            int: The number of bytes freed in the session folder.
+        """
+        freed = 0
+        for path in self._loose_files(folder):
+            try:
+                with Image.open(path) as image:
+                    image.load()
+                    size = os.path.getsize(path)
+                    self.add(folder, os.path.splitext(os.path.basename(path))[0] + '.png', image)
+                os.remove(path)
+                freed += size
+            except OSError as e:
+                app_logger.warning(f"ScreenshotStore: Could not import {path}: {e}")
+        if freed:
+            app_logger.info(f"ScreenshotStore: Imported screenshots of {folder} ({freed / 1024 ** 2:.1f} MB)")
+        return freed
+
+    def optimize_session(self, folder):
+        """
+        Recompresses the blobs referenced by a session with the slowest lossless PNG settings.
+
+        The pixels do not change, so the blobs keep their hash. Each blob is only optimized once.
+
+        Args:
+            folder (str): The session folder name.
+
+        Returns:
+            int: The number of bytes freed in the store.
+        """
+        with self._lock:
+            blobs = self._connection.execute(
+                'SELECT blobs.hash, blobs.size FROM refs JOIN blobs ON blobs.hash = refs.hash '
+                'WHERE refs.folder = ? AND NOT blobs.optimized', (folder,)).fetchall()
+        freed = 0
+        for digest, size in set(blobs):
+            path = self.blob_path(digest)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file, Image.open(path) as image:
+                    image.save(file, format='PNG', optimize=True)
+                new_size = os.path.getsize(temp_path)
+                if new_size < size:
+                    os.replace(temp_path, path)
+                    freed += size - new_size
+                else:
+                    new_size = size
+            except OSError as e:
+                app_logger.warning(f"ScreenshotStore: Could not optimize blob {digest}: {e}")
+                continue
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            with self._lock:
+                self._connection.execute('UPDATE blobs SET size = ?, optimized = 1 WHERE hash = ?', (new_size, digest))
+        return freed
+
+    def list_screenshots(self, folder):
+        """
+        Returns the paths of a session's screenshots: its stored blobs and any image files not imported yet.
+
+        Args:
+            folder (str): The session folder name.
+
+        Returns:
+            list: The paths, in capture order.
+        """
+        entries = {entry['name']: self.blob_path(entry['blob']) for entry in self._read_manifest(folder)}
+        for path in self._loose_files(folder):
+            entries.setdefault(os.path.basename(path), path)
+        return [entries[name] for name in sorted(entries)]
+
+    def release_session(self, folder):
+        """
+        Drops the references of a session and deletes the blobs no other session references.
+
+        Args:
+            folder (str): The session folder name.
+
+        Returns:
+            int: The number of bytes freed in the store.
+        """
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                digests = [row[0] for row in self._connection.execute('SELECT hash FROM refs WHERE folder = ?', (folder,))]
+                self._connection.execute('DELETE FROM refs WHERE folder = ?', (folder,))
+                self._connection.executemany('UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?',
+                                             [(digest,) for digest in digests])
+                unreferenced = self._connection.execute('SELECT hash, size FROM blobs WHERE refcount <= 0').fetchall()
+                self._connection.execute('DELETE FROM blobs WHERE refcount <= 0')
+            self._phashes = None
+
+            # Deleted under the lock, so an `add` cannot find the blob on disk and then lose it
+            freed = 0
+            for digest, size in unreferenced:
+                try:
+                    os.remove(self.blob_path(digest))
+                    freed += size
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    app_logger.warning(f"ScreenshotStore: Could not delete blob {digest}: {e}")
+        return freed
+
+    def collect_garbage(self):
+        """
+        Releases the sessions whose folder no longer exists.
+
+        Returns:
+            int: The number of bytes freed in the store.
+        """
+        with self._lock:
+            folders = [row[0] for row in self._connection.execute('SELECT DISTINCT folder FROM refs')]
+        return sum(self.release_session(folder) for folder in folders
+                   if not os.path.isdir(os.path.join(self.data_directory, folder)))
+
+    def total_size(self):
+        """
+        Returns the size of the stored blobs.
+
+        Returns:
+            int: The size in bytes.
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def _add_reference(self, folder, name, digest, phash_value):
+        """Records a session's reference to a blob in the index; the caller holds the lock."""
+        # SQLite integers are signed 64-bit, so the hash is stored in two's complement
+        stored_phash = phash_value - 2 ** 64 if phash_value is not None and phash_value >= 2 ** 63 else phash_value
+        with self._connection:
+            self._connection.execute('BEGIN')
+            previous = self._connection.execute(
+                'SELECT hash FROM refs WHERE folder = ? AND name = ?', (folder, name)).fetchone()
+            if previous:
+                self._connection.execute('UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?', previous)
+            self._connection.execute('INSERT OR REPLACE INTO refs (folder, name, hash) VALUES (?, ?, ?)',
+                                     (folder, name, digest))
+            # The size of a new blob is filled in once it is written
+            self._connection.execute(
+                'INSERT INTO blobs (hash, phash, size, refcount) VALUES (?, ?, 0, 1) '
+                'ON CONFLICT(hash) DO UPDATE SET refcount = refcount + 1', (digest, stored_phash))
+        if self._phashes is not None and phash_value is not None:
+            self._phashes.append((phash_value, digest))
+
+    def _drop_reference(self, folder, name, digest):
+        """Undoes `_add_reference` after the blob could not be written."""
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.execute('DELETE FROM refs WHERE folder = ? AND name = ? AND hash = ?',
+                                         (folder, name, digest))
+                self._connection.execute('UPDATE blobs SET refcount = refcount - 1 WHERE hash = ?', (digest,))
+                self._connection.execute('DELETE FROM blobs WHERE hash = ? AND refcount <= 0', (digest,))
+            self._phashes = None
+
+    def _find_similar(self, phash_value):
+        """Returns the stored blob whose perceptual hash is within ``phash_distance``, if any; the caller holds the lock."""
+        if self._phashes is None:
+            self._phashes = [(row[0] & (2 ** 64 - 1), row[1]) for row in
+                             self._connection.execute('SELECT phash, hash FROM blobs WHERE phash IS NOT NULL')]
+        best = min(self._phashes, key=lambda item: bin(item[0] ^ phash_value).count('1'), default=None)
+        if best is not None and bin(best[0] ^ phash_value).count('1') <= self.phash_distance:
+            return best[1]
+        return None
+
+    @staticmethod
+    def _write_blob(path, image):
+        """Saves an image as PNG, atomically."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                image.save(file, format='PNG')
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _manifest_path(self, folder, name=MANIFEST_FILE):
+        return os.path.join(self.data_directory, folder, 'screenshots', name)
+
+    def _read_manifest(self, folder):
+        """Returns the entries of a session's manifests, the legacy one first; later entries replace earlier ones."""
+        entries = []
+        try:
+            with open(self._manifest_path(folder, LEGACY_MANIFEST_FILE), 'r', encoding='utf-8') as file:
+                entries.extend(json.load(file).get('screenshots', []))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            app_logger.warning(f"ScreenshotStore: Could not read the legacy manifest of {folder}: {e}")
+        try:
+            with open(self._manifest_path(folder), 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash while it was appended
+                        app_logger.warning(f"ScreenshotStore: Skipping a damaged manifest line of {folder}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            app_logger.warning(f"ScreenshotStore: Could not read the manifest of {folder}: {e}")
+        return entries
+
+    def _append_manifest(self, folder, name, digest):
+        """Appends a screenshot to a session's manifest."""
+        path = self._manifest_path(folder)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock, open(path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({'name': name, 'blob': digest}) + '\n')
+
+    def _loose_files(self, folder):
+        """Returns the image files of a session's screenshots folder."""
+        screenshots_dir = os.path.join(self.data_directory, folder, 'screenshots')
+        if not os.path.isdir(screenshots_dir):
+            return []
+        return sorted(os.path.join(screenshots_dir, name) for name in os.listdir(screenshots_dir)
+                      if name.lower().endswith(IMAGE_EXTENSIONS))
+
+
+# Shared store of the session screenshots
+screenshot_store = ScreenshotStore(phash_distance=settings_watcher.get('screenshot_dedup_distance', 0))
@@ -0,0 +1,215 @@
+import os
+import re
+import sqlite3
+import threading
+
+from src.config import DATA_DIRECTORY, SEARCH_INDEX_FILE
+from src.managers.session_archive import session_archive
+from src.utils.logger import app_logger
+from src.utils.transcript import load_segments
+
+# Indexed files of a session and the kind of document they hold
+DOCUMENTS = {
+    'transcription.txt': 'transcription',
+    'note_short.txt': 'note_short',
+    'note_medium.txt': 'note_medium',
+    'note_long.txt': 'note_long',
+}
+
+
+class SearchIndex:
+    """
+    Full-text index (SQLite FTS5) of the transcriptions and notes of every session.
+
+    Transcriptions are indexed one segment per row, with the segment's start and end times when
+    ``transcription.json`` is available, and notes one paragraph per row. A file is only re-indexed
+    when its modification time or size changed, so `index_file` can be called by every writer and
+    `sync` only costs one stat per indexed file.
+
+    Attributes:
+        path (str): The path of the SQLite database.
+        data_directory (str): The directory containing the session folders.
+
+    Methods:
+        search(query, limit=20): Returns ranked hits with snippets and timestamps.
+        index_file(path): Indexes a transcription or note file if it changed.
+        remove_session(folder): Removes the documents of a session.
+        sync(): Indexes the changed files of every session and drops the deleted sessions.
+    """
+
+    def __init__(self, path=SEARCH_INDEX_FILE, data_directory=DATA_DIRECTORY):
+        self.path = path
+        self.data_directory = data_directory
+        self._lock = threading.Lock()
+        self._synced = False
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+                "text, folder UNINDEXED, kind UNINDEXED, start UNINDEXED, end UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2')")
+            # The chunks of a document use a contiguous range of rowids, so they are deleted by rowid
+            # range instead of a scan of the unindexed folder column
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS documents (path TEXT PRIMARY KEY, folder TEXT, kind TEXT, '
+                'mtime_ns INTEGER, size INTEGER, first_rowid INTEGER, last_rowid INTEGER)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS documents_folder ON documents (folder)')
+            # Documents indexed under another spelling of their path are indexed again under the normalized one
+            for (path,) in self._connection.execute('SELECT path FROM documents').fetchall():
+                if path != self._normalize(path):
+                    self._delete_chunks(path)
+                    self._connection.execute('DELETE FROM documents WHERE path = ?', (path,))
+
+    def search(self, query, limit=20):
+        """
+        Searches the transcriptions and notes of every session.
+
+        Every word of the query must match; the last one also matches as a prefix, so results
+        appear while the query is being typed.
+
+        Args:
+            query (str): The words to search for.
+            limit (int): The maximum number of hits.
+
+        Returns:
+            list: Hits, best first, as dictionaries with the session folder, the kind of document
+                ('transcription', 'note_short'...), a snippet with the matches in [brackets], and the
+                start and end times (in seconds) for transcription segments with timestamps, else None.
+        """
+        words = re.findall(r'\w+', query, re.UNICODE)
+        if not words:
+            return []
+        if not self._synced:
+            self.sync()
+
+        match = ' '.join(f'"{word}"' for word in words) + '*'
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT folder, kind, snippet(chunks, 0, '[', ']', '…', 16), start, end "
+                "FROM chunks WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?", (match, limit)).fetchall()
+        return [{'folder': folder, 'kind': kind, 'snippet': snippet, 'start': start, 'end': end}
+                for folder, kind, snippet, start, end in rows]
+
+    def index_file(self, path):
+        """
+        Indexes a transcription or note file if it changed since it was last indexed.
+
+        Args:
+            path (str): The path of the file, inside a session folder.
+        """
+        kind = DOCUMENTS.get(os.path.basename(path))
+        if kind is None:
+            return
+        path = self._normalize(path)
+        folder = os.path.basename(os.path.dirname(path))
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Packed into the session's archive: the indexed content is still valid
+            if not session_archive.is_archived(path):
+                self._remove_document(path)
+            return
+
+        with self._lock:
+            row = self._connection.execute('SELECT mtime_ns, size FROM documents WHERE path = ?', (path,)).fetchone()
+        if row == (stat.st_mtime_ns, stat.st_size):
+            return
+
+        try:
+            chunks = self._read_chunks(path, kind)
+        except (OSError, ValueError) as e:
+            app_logger.warning(f"SearchIndex: Could not index {path}: {e}")
+            return
+
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.execute('BEGIN')
+                    self._delete_chunks(path)
+                    first_rowid = self._connection.execute(
+                        'SELECT COALESCE(MAX(last_rowid), 0) + 1 FROM documents').fetchone()[0]
+                    self._connection.executemany(
+                        'INSERT INTO chunks (rowid, text, folder, kind, start, end) VALUES (?, ?, ?, ?, ?, ?)',
+                        [(first_rowid + i, text, folder, kind, start, end) for i, (start, end, text) in enumerate(chunks)])
+                    self._connection.execute(
+                        'INSERT OR REPLACE INTO documents (path, folder, kind, mtime_ns, size, first_rowid, last_rowid) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (path, folder, kind, stat.st_mtime_ns, stat.st_size, first_rowid, first_rowid + len(chunks) - 1))
+            except sqlite3.Error as e:
+                app_logger.error(f"SearchIndex: Could not index {path}: {e}")
+                return
+        app_logger.info(f"SearchIndex: Indexed {len(chunks)} chunks of {folder}/{os.path.basename(path)}")
+
+    def remove_session(self, folder):
+        """
+        Removes the documents of a session from the index.
+
+        Args:
+            folder (str): The session folder name.
+        """
+        with self._lock:
+            paths = [row[0] for row in self._connection.execute('SELECT path FROM documents WHERE folder = ?', (folder,))]
+            for path in paths:
+                self._delete_chunks(path)
+            self._connection.execute('DELETE FROM documents WHERE folder = ?', (folder,))
+
+    def sync(self):
+        """
+        Indexes the new or changed files of every session and removes the deleted sessions.
+        """
+        self._synced = True
+        try:
+            folders = [entry.name for entry in os.scandir(self.data_directory) if entry.is_dir() and not entry.name.startswith('.')]
+        except OSError as e:
+            app_logger.error(f"SearchIndex: Could not list {self.data_directory}: {e}")
+            return
+
+        with self._lock:
+            known = {row[0] for row in self._connection.execute('SELECT DISTINCT folder FROM documents')}
+        for folder in known - set(folders):
+            self.remove_session(folder)
+        for folder in folders:
+            for name in DOCUMENTS:
+                path = os.path.join(self.data_directory, folder, name)
+                if folder in known or os.path.exists(path):
+                    self.index_file(path)
+
+    def _remove_document(self, path):
+        with self._lock:
+            self._delete_chunks(path)
+            self._connection.execute('DELETE FROM documents WHERE path = ?', (path,))
+
+    @staticmethod
+    def _normalize(path):
+        """Returns the absolute, normalized form of a path, under which its document is stored."""
+        return os.path.abspath(path)
+
+    def _delete_chunks(self, path):
+        """Deletes the chunks of a document; the caller holds the lock."""
+        row = self._connection.execute('SELECT first_rowid, last_rowid FROM documents WHERE path = ?', (path,)).fetchone()
+        if row:
+            self._connection.execute('DELETE FROM chunks WHERE rowid BETWEEN ? AND ?', row)
+
+    @staticmethod
+    def _read_chunks(path, kind):
+        """
+        Splits a file into (start, end, text) chunks.
+
+        Transcriptions use the segments of transcription.json when it exists; notes are split into paragraphs.
+        """
+        if kind == 'transcription':
+            segments_path = os.path.join(os.path.dirname(path), 'transcription.json')
+            if os.path.exists(segments_path):
+                return load_segments(segments_path)
+            with open(path, 'r', encoding='utf-8') as file:
+                return [(None, None, line.strip()) for line in file if line.strip()]
+
+        with open(path, 'r', encoding='utf-8') as file:
+            paragraphs = re.split(r'\n\s*\n', file.read())
+        return [(None, None, paragraph.strip()) for paragraph in paragraphs if paragraph.strip()]
+
+
+# Shared full-text index of the sessions in the data directory
+search_index = SearchIndex()
@@ -0,0 +1,185 @@
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+
+from src.config import DATA_DIRECTORY, CACHE_DIRECTORY
+from src.services.settings_watcher import settings_watcher
+from src.utils.logger import app_logger
+
+ARCHIVE_FILE = 'archive.zip'
+
+# Small session files packed into the archive of an archived session
+PACKED_FILES = (
+    'transcription.txt', 'transcription.json', 'transcription.srt', 'transcription.vtt',
+    'note_short.txt', 'note_medium.txt', 'note_long.txt',
+)
+
+
+class SessionArchive:
+    """
+    Transparent read access to the files of archived sessions.
+
+    An archived session keeps its small files in ``archive.zip`` (see `SessionArchiver`). `resolve` returns
+    a readable path for any session file: the file itself when it exists, otherwise a copy extracted from
+    the session's archive into a size-bounded cache, where the least recently used copies are deleted
+    first. Readers such as NotePanel and PDFGenerator call `resolve` instead of opening session paths.
+
+    Attributes:
+        data_directory (str): The directory containing the session folders.
+        cache_directory (str): The directory holding the extracted copies.
+        max_bytes (int): The maximum total size of the extracted copies.
+
+    Methods:
+        resolve(path): Returns a readable path for a session file, or None.
+        is_archived(path): Returns True if a session file is stored in its session's archive.
+        archive_path(folder): Returns the path of a session's archive.
+        invalidate(folder): Forgets the cached archive listing and copies of a session.
+    """
+
+    def __init__(self, data_directory=DATA_DIRECTORY, cache_directory=os.path.join(CACHE_DIRECTORY, 'archive'),
+                 max_bytes=128 * 1024 * 1024):
+        self.data_directory = data_directory
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._members = {}
+        self._copies = {}
+        os.makedirs(cache_directory, exist_ok=True)
+        for root, _, files in os.walk(cache_directory):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                self._copies[path] = (stat.st_mtime, stat.st_size)
+
+    def archive_path(self, folder):
+        """Returns the path of a session's archive."""
+        return os.path.join(self.data_directory, folder, ARCHIVE_FILE)
+
+    def resolve(self, path):
+        """
+        Returns a readable path for a session file, extracting it from the session's archive if needed.
+
+        Args:
+            path (str): The path of the file in its session folder.
+
+        Returns:
+            str or None: The path itself if the file exists, the path of an extracted copy if it is
+                archived, or None if it is in neither place.
+        """
+        if not path:
+            return None
+        if os.path.exists(path):
+            return path
+        location = self._locate(path)
+        if location is None:
+            return None
+        folder, name = location
+        archive_path = self.archive_path(folder)
+        if name not in self._archive_members(archive_path):
+            return None
+
+        copy_path = os.path.join(self.cache_directory, folder, name)
+        with self._lock:
+            cached = self._copies.get(copy_path)
+            if cached and os.path.exists(copy_path) and os.path.getmtime(archive_path) <= cached[0]:
+                os.utime(copy_path)
+                self._copies[copy_path] = (os.path.getmtime(copy_path), cached[1])
+                return copy_path
+
+            os.makedirs(os.path.dirname(copy_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(copy_path), suffix='.tmp')
+            try:
+                with zipfile.ZipFile(archive_path) as archive, archive.open(name) as source:
+                    with os.fdopen(fd, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                os.replace(temp_path, copy_path)
+            except (OSError, KeyError, zipfile.BadZipFile) as e:
+                app_logger.error(f"SessionArchive: Could not extract {name} of {folder}: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                return None
+            stat = os.stat(copy_path)
+            self._copies[copy_path] = (stat.st_mtime, stat.st_size)
+            self._evict(keep=copy_path)
+        return copy_path
+
+    def is_archived(self, path):
+        """
+        Returns True if a session file is stored in its session's archive.
+
+        Args:
+            path (str): The path of the file in its session folder.
+        """
+        location = self._locate(path)
+        return location is not None and location[1] in self._archive_members(self.archive_path(location[0]))
+
+    def invalidate(self, folder):
+        """
+        Forgets the cached archive listing and the extracted copies of a session, e.g. after re-archiving it.
+
+        Args:
+            folder (str): The session folder name.
+        """
+        with self._lock:
+            self._members.pop(self.archive_path(folder), None)
+            prefix = os.path.join(self.cache_directory, folder) + os.sep
+            for copy_path in [path for path in self._copies if path.startswith(prefix)]:
+                self._remove_copy(copy_path)
+
+    def _locate(self, path):
+        """Returns the (folder, name) of a file directly inside a session folder, or None."""
+        try:
+            relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.data_directory))
+        except ValueError:  # On another drive
+            return None
+        parts = relative.split(os.sep)
+        if len(parts) != 2 or parts[0] in ('', '.', '..'):
+            return None
+        return parts[0], parts[1]
+
+    def _archive_members(self, archive_path):
+        """Returns the member names of an archive, cached until the archive changes."""
+        try:
+            mtime = os.stat(archive_path).st_mtime_ns
+        except OSError:
+            return set()
+        with self._lock:
+            cached = self._members.get(archive_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                members = set(archive.namelist())
+        except (OSError, zipfile.BadZipFile) as e:
+            app_logger.error(f"SessionArchive: Could not read {archive_path}: {e}")
+            return set()
+        with self._lock:
+            self._members[archive_path] = (mtime, members)
+        return members
+
+    def _evict(self, keep):
+        """Deletes the least recently used copies except ``keep`` until they fit in ``max_bytes``; the caller holds the lock."""
+        total = sum(size for _, size in self._copies.values())
+        for copy_path, (_, size) in sorted(self._copies.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            if copy_path == keep:
+                continue
+            self._remove_copy(copy_path)
+            total -= size
+
+    def _remove_copy(self, copy_path):
+        try:
+            os.remove(copy_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            app_logger.warning(f"SessionArchive: Could not delete {copy_path}: {e}")
+            return
+        self._copies.pop(copy_path, None)
+
+
+# Shared accessor of the archived session files
+session_archive = SessionArchive(max_bytes=settings_watcher.get('archive_cache_size_mb', 128) * 1024 * 1024)
@@ -0,0 +1,247 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+from src.config import DATA_DIRECTORY
+from src.managers.screenshot_store import screenshot_store, MANIFEST_FILE
+from src.managers.search_index import search_index
+from src.managers.session_archive import session_archive, ARCHIVE_FILE, PACKED_FILES
+from src.managers.recorder_manager import RecorderManager
+from src.managers.session_catalog import session_catalog
+from src.services.settings_watcher import settings_watcher
+from src.utils.logger import app_logger
+
+# ffmpeg encoder settings of the archived audio formats
+AUDIO_FORMATS = {
+    'flac': ['-c:a', 'flac', '-compression_level', '8'],
+    # Speech-tuned Opus; about 25 times smaller than 16-bit stereo WAV
+    'opus': ['-c:a', 'libopus', '-b:a', '48k', '-application', 'voip'],
+}
+
+
+class SessionArchiver:
+    """
+    Background worker moving old sessions to a compact cold-storage layout.
+
+    Sessions older than the ``archive_after_days`` setting are archived one at a time, at low CPU and
+    I/O priority and never while a recording is running:
+
+    - audio.wav is transcoded to audio.flac (lossless) or audio.opus, following ``archive_audio_format``,
+      once the session is transcribed;
+    - screenshots left in the session folder are moved to the screenshot store and the session's blobs
+      are recompressed losslessly;
+    - the transcription and note files are packed into a single ``archive.zip``.
+
+    Readers get the packed files back through `SessionArchive.resolve`. A file written again after the
+    session was archived (e.g. regenerated notes) is read from the folder and packed on the next pass.
+    A session is only marked archived when every step succeeded; otherwise the next pass tries again.
+
+    Attributes:
+        data_directory (str): The directory containing the session folders.
+        interval (float): The time (in seconds) between two passes over the sessions.
+
+    Methods:
+        start(): Starts the worker thread.
+        stop(): Stops the worker thread.
+        run_once(): Archives the sessions that are due and returns their folders.
+        archive_session(folder): Archives one session.
+    """
+
+    def __init__(self, data_directory=DATA_DIRECTORY, interval=3600):
+        self.data_directory = data_directory
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the worker thread.
+        """
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the worker thread after the session being archived, if any.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self):
+        """
+        Archives the sessions older than ``archive_after_days`` that have files left to archive.
+
+        Returns:
+            list: The folders of the archived sessions.
+        """
+        cutoff = time.time() - float(settings_watcher.get('archive_after_days', 30)) * 24 * 3600
+        archived = []
+        for session in reversed(session_catalog.list_sessions()):
+            if self._stop_event.is_set():
+                break
+            if self._recording():
+                app_logger.info("SessionArchiver: A recording is running, postponing archiving")
+                break
+            if session['created_at'] and session['created_at'] < cutoff and self._has_work(session['folder']):
+                self.archive_session(session['folder'])
+                archived.append(session['folder'])
+        return archived
+
+    def archive_session(self, folder):
+        """
+        Transcodes the audio, recompresses the screenshots and packs the small files of a session.
+
+        Args:
+            folder (str): The session folder name.
+
+        Returns:
+            bool: True if every step succeeded and the session was marked archived.
+        """
+        session_dir = os.path.join(self.data_directory, folder)
+        app_logger.info(f"SessionArchiver: Archiving {folder}")
+        transcoded = self._transcode_audio(folder, session_dir)
+        if screenshot_store.import_session(folder):
+            session_catalog.record_file(os.path.join(session_dir, 'screenshots', MANIFEST_FILE))
+        screenshot_store.optimize_session(folder)
+        packed = self._pack_files(folder, session_dir)
+        if not (transcoded and packed):
+            app_logger.warning(f"SessionArchiver: Archiving of {folder} is incomplete, retrying on the next pass")
+            return False
+        session_catalog.update(folder, archived=1)
+        return True
+
+    def _has_work(self, folder):
+        """Returns True if a session has files left to archive."""
+        session_dir = os.path.join(self.data_directory, folder)
+        if os.path.exists(os.path.join(session_dir, 'audio.wav')) and self._transcribed(folder):
+            return True
+        if any(os.path.exists(os.path.join(session_dir, name)) for name in PACKED_FILES):
+            return True
+        screenshots = screenshot_store.list_screenshots(folder)
+        return any(not path.startswith(screenshot_store.directory) for path in screenshots)
+
+    @staticmethod
+    def _transcribed(folder):
+        """Returns True if a session has a transcription."""
+        session = session_catalog.get(folder)
+        return bool(session and session['has_transcription'])
+
+    @staticmethod
+    def _recording():
+        """Returns True if a session is being recorded in this process."""
+        return bool(RecorderManager.recording_sessions())
+
+    def _transcode_audio(self, folder, session_dir):
+        """Transcodes audio.wav to the archived audio format and deletes it; returns False on failure."""
+        wav_path = os.path.join(session_dir, 'audio.wav')
+        if not os.path.exists(wav_path):
+            return True
+        if not self._transcribed(folder):
+            # Kept as WAV, so it can still be transcribed in bounded memory; transcoded on a later pass
+            return True
+        duration = session_catalog.audio_duration(wav_path)
+        audio_format = settings_watcher.get('archive_audio_format', 'flac')
+        if audio_format not in AUDIO_FORMATS:
+            audio_format = 'flac'
+        output_path = os.path.join(session_dir, f'audio.{audio_format}')
+        temp_path = os.path.join(session_dir, f'audio.tmp.{audio_format}')
+        command = ["ffmpeg", "-y", "-loglevel", "error", "-i", wav_path, *AUDIO_FORMATS[audio_format], temp_path]
+        try:
+            subprocess.run(command, check=True, **self._low_priority())
+            os.replace(temp_path, output_path)
+            os.remove(wav_path)
+        except (subprocess.CalledProcessError, OSError) as e:
+            app_logger.error(f"SessionArchiver: Could not transcode {wav_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+        session_catalog.record_file(wav_path)
+        session_catalog.record_file(output_path)
+        if duration is not None:
+            session_catalog.update(folder, audio_path=output_path, duration=duration)
+        else:
+            session_catalog.update(folder, audio_path=output_path)
+        return True
+
+    def _pack_files(self, folder, session_dir):
+        """Packs the small files of a session into its archive, keeping the files it already holds; returns False on failure."""
+        loose = [name for name in PACKED_FILES if os.path.exists(os.path.join(session_dir, name))]
+        if not loose:
+            return True
+        # The index reads the files, so bring it up to date while they are still in the folder
+        for name in loose:
+            search_index.index_file(os.path.join(session_dir, name))
+
+        archive_path = os.path.join(session_dir, ARCHIVE_FILE)
+        fd, temp_path = tempfile.mkstemp(dir=session_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_LZMA) as archive:
+                if os.path.exists(archive_path):
+                    with zipfile.ZipFile(archive_path) as previous:
+                        for member in previous.infolist():
+                            if member.filename not in loose:
+                                archive.writestr(member, previous.read(member), zipfile.ZIP_LZMA)
+                for name in loose:
+                    archive.write(os.path.join(session_dir, name), name)
+            os.replace(temp_path, archive_path)
+        except (OSError, zipfile.BadZipFile) as e:
+            app_logger.error(f"SessionArchiver: Could not pack the files of {folder}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        for name in loose:
+            path = os.path.join(session_dir, name)
+            os.remove(path)
+            session_catalog.record_file(path)
+        session_catalog.record_file(archive_path)
+        session_archive.invalidate(folder)
+        app_logger.info(f"SessionArchiver: Packed {len(loose)} files of {folder}")
+        return True
+
+    @staticmethod
+    def _low_priority():
+        """Returns the subprocess arguments starting a process at idle priority."""
+        if sys.platform == 'win32':
+            return {'creationflags': subprocess.IDLE_PRIORITY_CLASS}
+        return {'preexec_fn': lambda: os.nice(19)}
+
+    @staticmethod
+    def _lower_thread_priority():
+        """Lowers the CPU (and, on Windows, I/O) priority of the calling thread, where supported."""
+        try:
+            if sys.platform == 'win32':
+                import ctypes
+                THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+                kernel32 = ctypes.windll.kernel32
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+            elif hasattr(os, 'setpriority') and sys.platform.startswith('linux'):
+                # On Linux, priorities are per thread
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (OSError, AttributeError) as e:
+            app_logger.warning(f"SessionArchiver: Could not lower the worker priority: {e}")
+
+    def _worker(self):
+        """
+        Worker thread loop: archives the sessions that are due, then waits for the next pass.
+        """
+        self._lower_thread_priority()
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                app_logger.error(f"SessionArchiver: Archiving pass failed: {e}")
+            self._stop_event.wait(self.interval)
+
+
+# Shared archiver of the old sessions
+session_archiver = SessionArchiver()
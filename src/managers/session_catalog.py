@@ -0,0 +1,363 @@
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+import wave
+from datetime import datetime
+
+from src.config import DATA_DIRECTORY, SESSION_CATALOG_FILE
+from src.managers.screenshot_store import screenshot_store
+from src.utils.logger import app_logger
+
+NOTE_TYPES = ('short', 'medium', 'long')
+
+# Column name -> SQLite type of the sessions table (besides the folder primary key)
+COLUMNS = {
+    'ws_name': 'TEXT',
+    'created_at': 'REAL',
+    'audio_path': 'TEXT',
+    'video_path': 'TEXT',
+    'screenshots_dir': 'TEXT',
+    'screenshot_count': 'INTEGER',
+    'cover_path': 'TEXT',
+    'transcription_path': 'TEXT',
+    'note_short_path': 'TEXT',
+    'note_medium_path': 'TEXT',
+    'note_long_path': 'TEXT',
+    'assistant_name': 'TEXT',
+    'has_transcription': 'INTEGER',
+    'has_notes': 'INTEGER',
+    'is_recording': 'INTEGER',
+    'scanned': 'INTEGER',
+    'compressed': 'INTEGER',
+    'archived': 'INTEGER',
+    'duration': 'REAL',
+    'size_bytes': 'INTEGER',
+    'updated_at': 'REAL',
+}
+
+
+class SessionCatalog:
+    """
+    SQLite catalog of the recorded sessions, one row per session folder.
+
+    Rows hold the session's paths, status flags, duration, size and cover screenshot. They are kept
+    up to date by the stages that produce the files (recorder, transcription, options store), so
+    listing the sessions is one indexed query instead of a walk of the data directory. `sync` only
+    lists the data directory to add the folders the catalog does not know yet (e.g. sessions recorded
+    before the catalog existed), to scan the rows that were never scanned and to drop the deleted ones.
+
+    No recording can be running when the catalog is opened, so ``is_recording`` flags left by a crash
+    are cleared then, and those sessions are scanned by the next `sync`.
+
+    ``size_bytes`` is a running tally: the catalog remembers the size of every file of a session and
+    writers report the files they create, replace or delete with `record_file`, so the size of the data
+    directory is known without walking it.
+
+    Attributes:
+        path (str): The path of the SQLite database.
+        data_directory (str): The directory containing the session folders.
+
+    Methods:
+        get(folder): Returns the row of a session.
+        list_sessions(): Returns the rows of all sessions, newest first.
+        update(folder, **fields): Inserts or updates fields of a session.
+        update_from_options(folder, options): Updates a session from its options.json content.
+        remove(folder): Removes a session.
+        record_file(path): Updates the size tally of the session containing a file.
+        total_size(): Returns the total size of the sessions.
+        scan_session(folder): Recomputes a session's row from its files.
+        sync(): Adds the unknown session folders, scans the unscanned ones and removes the deleted ones.
+        folder_of(path): Returns the session folder containing a path.
+    """
+
+    def __init__(self, path=SESSION_CATALOG_FILE, data_directory=DATA_DIRECTORY):
+        self.path = path
+        self.data_directory = data_directory
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            columns = ', '.join(f'{name} {kind}' for name, kind in COLUMNS.items())
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS sessions (folder TEXT PRIMARY KEY, {columns})')
+            # Add the columns introduced after the catalog was created
+            existing = {row[1] for row in self._connection.execute('PRAGMA table_info(sessions)')}
+            for name, kind in COLUMNS.items():
+                if name not in existing:
+                    self._connection.execute(f'ALTER TABLE sessions ADD COLUMN {name} {kind}')
+            if existing and 'scanned' not in existing:
+                self._connection.execute(
+                    'UPDATE sessions SET scanned = 1 WHERE cover_path IS NOT NULL OR ws_name IS NOT NULL')
+            self._connection.execute('UPDATE sessions SET is_recording = 0, scanned = 0 WHERE is_recording = 1')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, folder TEXT, size INTEGER)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS files_folder ON files (folder)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at DESC)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS sessions_ws_name ON sessions (ws_name)')
+
+    def get(self, folder):
+        """
+        Returns the row of a session.
+
+        Args:
+            folder (str): The session folder name.
+
+        Returns:
+            dict or None: The session's fields, or None if the session is not cataloged.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT * FROM sessions WHERE folder = ?', (folder,)).fetchone()
+        return dict(row) if row else None
+
+    def list_sessions(self):
+        """
+        Returns the rows of all sessions.
+
+        Returns:
+            list: The sessions' fields as dictionaries, newest first.
+        """
+        with self._lock:
+            rows = self._connection.execute('SELECT * FROM sessions ORDER BY created_at DESC, folder DESC').fetchall()
+        return [dict(row) for row in rows]
+
+    def update(self, folder, **fields):
+        """
+        Inserts a session or updates some of its fields.
+
+        Args:
+            folder (str): The session folder name.
+            **fields: Column values, see COLUMNS.
+        """
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown session catalog columns: {sorted(unknown)}")
+        fields['updated_at'] = time.time()
+        names = list(fields)
+        assignments = ', '.join(f'{name} = excluded.{name}' for name in names)
+        sql = (f"INSERT INTO sessions (folder, {', '.join(names)}) VALUES (?{', ?' * len(names)}) "
+               f"ON CONFLICT(folder) DO UPDATE SET {assignments}")
+        try:
+            with self._lock:
+                self._connection.execute(sql, [folder] + [fields[name] for name in names])
+        except sqlite3.Error as e:
+            app_logger.error(f"SessionCatalog: Could not update {folder}: {e}")
+
+    def update_from_options(self, folder, options):
+        """
+        Updates a session from the content of its options.json.
+
+        Args:
+            folder (str): The session folder name.
+            options (dict): The workspace options.
+        """
+        note_paths = {f'note_{note_type}_path': options.get(f'note_{note_type}_path') or None
+                      for note_type in NOTE_TYPES}
+        self.update(folder,
+                    ws_name=options.get('ws_name') or None,
+                    transcription_path=options.get('transcription_path') or None,
+                    assistant_name=options.get('assistant_name') or None,
+                    has_transcription=int(bool(options.get('transcription'))),
+                    has_notes=int(any(note_paths.values())),
+                    **note_paths)
+
+    def remove(self, folder):
+        """
+        Removes a session from the catalog.
+
+        Args:
+            folder (str): The session folder name.
+        """
+        with self._lock:
+            self._connection.execute('DELETE FROM sessions WHERE folder = ?', (folder,))
+            self._connection.execute('DELETE FROM files WHERE folder = ?', (folder,))
+
+    def record_file(self, path):
+        """
+        Updates the size tally of the session containing a file that was written, replaced or deleted.
+
+        Args:
+            path (str): The path of the file, inside a session folder.
+        """
+        folder = self.folder_of(path)
+        if folder is None:
+            return
+        path = os.path.abspath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.execute('BEGIN')
+                    row = self._connection.execute('SELECT size FROM files WHERE path = ?', (path,)).fetchone()
+                    delta = (size or 0) - (row[0] if row else 0)
+                    if size is None:
+                        self._connection.execute('DELETE FROM files WHERE path = ?', (path,))
+                    else:
+                        self._connection.execute('INSERT OR REPLACE INTO files (path, folder, size) VALUES (?, ?, ?)',
+                                                 (path, folder, size))
+                    self._connection.execute('INSERT OR IGNORE INTO sessions (folder, created_at) VALUES (?, ?)',
+                                             (folder, self.folder_created(folder)))
+                    self._connection.execute(
+                        'UPDATE sessions SET size_bytes = COALESCE(size_bytes, 0) + ?, updated_at = ? WHERE folder = ?',
+                        (delta, time.time(), folder))
+            except sqlite3.Error as e:
+                app_logger.error(f"SessionCatalog: Could not record {path}: {e}")
+
+    def total_size(self):
+        """
+        Returns the total size of the sessions from their size tallies.
+
+        Returns:
+            int: The size in bytes.
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM sessions').fetchone()[0]
+
+    def scan_session(self, folder):
+        """
+        Recomputes a session's row from the files in its folder.
+
+        Only used for sessions the catalog does not know or never scanned, and when a recording ends;
+        the other updates come from the stages writing the files.
+
+        Args:
+            folder (str): The session folder name.
+        """
+        session_path = os.path.join(self.data_directory, folder)
+        options = {}
+        options_path = os.path.join(session_path, 'options.json')
+        if os.path.exists(options_path):
+            try:
+                with open(options_path, 'r', encoding='utf-8') as f:
+                    options = json.load(f)
+            except (OSError, ValueError) as e:
+                app_logger.warning(f"SessionCatalog: Could not read options of {folder}: {e}")
+
+        screenshots_dir = os.path.join(session_path, 'screenshots')
+        screenshots = screenshot_store.list_screenshots(folder)
+
+        # Archived sessions keep their audio as FLAC or Opus
+        audio_path = next((path for path in (os.path.join(session_path, f'audio.{extension}')
+                                             for extension in ('wav', 'flac', 'opus')) if os.path.exists(path)),
+                          os.path.join(session_path, 'audio.wav'))
+        video_path = os.path.join(session_path, 'video.mp4')
+        transcription_path = os.path.join(session_path, 'transcription.txt')
+        options.setdefault('ws_name', None)
+        if not options.get('transcription_path') and os.path.exists(transcription_path):
+            options['transcription_path'] = transcription_path
+            options['transcription'] = True
+        for note_type in NOTE_TYPES:
+            note_path = os.path.join(session_path, f'note_{note_type}.txt')
+            if not options.get(f'note_{note_type}_path') and os.path.exists(note_path):
+                options[f'note_{note_type}_path'] = note_path
+
+        self.update_from_options(folder, options)
+        self.update(folder,
+                    created_at=self.folder_created(folder),
+                    audio_path=audio_path if os.path.exists(audio_path) else None,
+                    video_path=video_path if os.path.exists(video_path) else None,
+                    screenshots_dir=screenshots_dir if screenshots else None,
+                    screenshot_count=len(screenshots),
+                    # The middle screenshot is a stable cover that is rarely a title slide
+                    cover_path=screenshots[len(screenshots) // 2] if screenshots else None,
+                    duration=self.audio_duration(audio_path),
+                    size_bytes=self._tally_files(folder),
+                    scanned=1)
+
+    def sync(self):
+        """
+        Adds the session folders the catalog does not know, scans the ones it never scanned (e.g. rows
+        created by `record_file`, or recordings interrupted by a crash) and removes the deleted ones.
+
+        Returns:
+            bool: True if the catalog changed.
+        """
+        try:
+            folders = {entry.name for entry in os.scandir(self.data_directory) if entry.is_dir() and not entry.name.startswith('.')}
+        except OSError as e:
+            app_logger.error(f"SessionCatalog: Could not list {self.data_directory}: {e}")
+            return False
+        with self._lock:
+            known = {row[0] for row in self._connection.execute('SELECT folder FROM sessions')}
+            unscanned = {row[0] for row in self._connection.execute(
+                'SELECT folder FROM sessions WHERE NOT COALESCE(scanned, 0) AND NOT COALESCE(is_recording, 0)')}
+
+        to_scan = (folders - known) | (unscanned & folders)
+        for folder in to_scan:
+            self.scan_session(folder)
+        for folder in known - folders:
+            self.remove(folder)
+        return bool(to_scan or known - folders)
+
+    def folder_of(self, path):
+        """
+        Returns the session folder containing a path.
+
+        Args:
+            path (str): A path of a session folder or of a file inside it.
+
+        Returns:
+            str or None: The session folder name, or None if the path is not in the data directory.
+        """
+        try:
+            relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.data_directory))
+        except ValueError:  # On another drive
+            return None
+        folder = relative.split(os.sep)[0]
+        return None if folder in ('', '.', '..') else folder
+
+    def _tally_files(self, folder):
+        """
+        Records the size of every file of a session, replacing its previous tally.
+
+        Returns:
+            int: The total size in bytes.
+        """
+        sizes = []
+        for root, _, files in os.walk(os.path.join(self.data_directory, folder)):
+            for name in files:
+                path = os.path.abspath(os.path.join(root, name))
+                try:
+                    sizes.append((path, folder, os.path.getsize(path)))
+                except OSError:
+                    pass
+        with self._lock:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.execute('DELETE FROM files WHERE folder = ?', (folder,))
+                self._connection.executemany('INSERT OR REPLACE INTO files (path, folder, size) VALUES (?, ?, ?)', sizes)
+        return sum(size for _, _, size in sizes)
+
+    @staticmethod
+    def folder_created(folder):
+        """Returns the creation time of a session from its folder name (or now if it is not a timestamp)."""
+        try:
+            return datetime.strptime(folder, "%Y-%m-%d_%H-%M-%S").timestamp()
+        except ValueError:
+            return time.time()
+
+    @staticmethod
+    def audio_duration(audio_path):
+        """Returns the duration of an audio file (WAV, or FLAC/Opus through ffprobe) in seconds, or None."""
+        if not audio_path.lower().endswith('.wav'):
+            command = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path]
+            try:
+                return float(subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip())
+            except (subprocess.CalledProcessError, OSError, ValueError):
+                return None
+        try:
+            with wave.open(audio_path, 'rb') as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        except (wave.Error, OSError, EOFError):
+            return None
+
+
+# Shared catalog of the sessions in the data directory
+session_catalog = SessionCatalog()
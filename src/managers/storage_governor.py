@@ -0,0 +1,246 @@
+import os
+import shutil
+import subprocess
+import threading
+
+from src.config import DATA_DIRECTORY
+from src.managers.screenshot_store import screenshot_store
+from src.managers.search_index import search_index
+from src.managers.session_catalog import session_catalog
+from src.services.settings_watcher import settings_watcher
+from src.utils.logger import app_logger
+
+# Eviction steps from the least to the most destructive; the 'storage_policy' setting names the last
+# step the governor may take ('none' only warns). Deleting data is opt-in.
+POLICIES = ('drop_raw_audio', 'compress', 'delete_oldest')
+DEFAULT_POLICY = 'none'
+
+# Recording rate assumed when no finished session with a known duration exists (bytes per second)
+DEFAULT_BYTES_PER_SECOND = 1024 * 1024
+# How long a new recording is expected to last when checking the budget before it starts (seconds)
+EXPECTED_RECORDING_SECONDS = 3600
+
+
+class StorageGovernor:
+    """
+    Keeps the data directory under the ``max_data_size_gb`` budget.
+
+    Usage comes from the session catalog's size tallies, which the writers keep up to date, and from the
+    size of the shared screenshot store, so checking the budget takes two queries. When the budget is
+    exceeded, `enforce` frees space from the oldest finished sessions with the steps allowed by the
+    ``storage_policy`` setting, in order:
+
+    - ``drop_raw_audio``: deletes audio.wav once it was merged into video.mp4 and transcribed; the WAV is
+      the transcription input, so sessions without a transcription keep it.
+    - ``compress``: re-encodes video.mp4 with H.264, which is several times smaller than the recorded MPEG-4.
+    - ``delete_oldest``: deletes whole sessions.
+
+    Attributes:
+        data_directory (str): The directory containing the session folders.
+
+    Methods:
+        budget(): Returns the size budget in bytes.
+        usage(): Returns the size of the sessions in bytes.
+        enforce(exclude=()): Frees space until the sessions fit in the budget.
+        enforce_async(exclude=()): Runs `enforce` in a background thread.
+        recording_headroom(): Returns the estimated recording time left before a new recording would exceed the budget.
+        recording_time_left(session_dir, elapsed): Returns the estimated time left for a running recording.
+    """
+
+    def __init__(self, data_directory=DATA_DIRECTORY):
+        self.data_directory = data_directory
+        self._lock = threading.Lock()
+
+    def budget(self):
+        """
+        Returns the size budget of the data directory.
+
+        Returns:
+            int: The budget in bytes.
+        """
+        return int(float(settings_watcher.get('max_data_size_gb', 5)) * 1024 ** 3)
+
+    def usage(self):
+        """
+        Returns the size of the sessions from the catalog's tallies, including their stored screenshots.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return session_catalog.total_size() + screenshot_store.total_size()
+
+    def enforce(self, exclude=()):
+        """
+        Frees space from the oldest finished sessions until the sessions fit in the budget.
+
+        Args:
+            exclude (iterable): Session folders that must not be touched (e.g. the one being recorded).
+
+        Returns:
+            int: The number of bytes freed.
+        """
+        with self._lock:
+            screenshot_store.collect_garbage()
+            budget = self.budget()
+            usage = self.usage()
+            if usage <= budget:
+                return 0
+
+            policy = settings_watcher.get('storage_policy', DEFAULT_POLICY)
+            steps = POLICIES[:POLICIES.index(policy) + 1] if policy in POLICIES else ()
+            app_logger.warning(f"StorageGovernor: {usage / 1024 ** 3:.2f} GB used of {budget / 1024 ** 3:.2f} GB, "
+                               f"applying {list(steps) or 'no policy'}")
+
+            excluded = set(exclude)
+            sessions = [session for session in reversed(session_catalog.list_sessions())
+                        if session['folder'] not in excluded and not session['is_recording']]
+            freed = 0
+            for step in steps:
+                for session in sessions:
+                    if usage - freed <= budget:
+                        break
+                    freed += getattr(self, f'_{step}')(session)
+                if usage - freed <= budget:
+                    break
+
+            if usage - freed > budget:
+                app_logger.warning(f"StorageGovernor: Still {(usage - freed - budget) / 1024 ** 2:.0f} MB over budget")
+            return freed
+
+    def enforce_async(self, exclude=()):
+        """
+        Runs `enforce` in a background thread.
+
+        Args:
+            exclude (iterable): Session folders that must not be touched.
+        """
+        threading.Thread(target=self.enforce, args=(tuple(exclude),), daemon=True).start()
+
+    def recording_headroom(self):
+        """
+        Estimates how long a new recording can last before the sessions exceed the budget.
+
+        Space the eviction policy could free is not counted, so the estimate is conservative.
+
+        Returns:
+            float: The estimated recording time left in seconds (0 if the budget is already exceeded).
+        """
+        return max(self.budget() - self.usage(), 0) / self._bytes_per_second()
+
+    def recording_time_left(self, session_dir, elapsed):
+        """
+        Estimates how long a running recording can continue before the sessions exceed the budget.
+
+        The recording's own rate is measured from the sizes of its audio and video files.
+
+        Args:
+            session_dir (str): The directory of the running recording.
+            elapsed (float): The time recorded so far in seconds.
+
+        Returns:
+            float: The estimated recording time left in seconds (0 if the budget is exceeded).
+        """
+        recorded = 0
+        for name in ('audio.wav', 'video.mp4'):
+            try:
+                recorded += os.path.getsize(os.path.join(session_dir, name))
+            except OSError:
+                pass
+        rate = recorded / elapsed if elapsed > 0 and recorded else self._bytes_per_second()
+        # The running session's tally only holds its screenshot manifest until the recording ends
+        headroom = self.budget() - self.usage() - recorded
+        return max(headroom, 0) / rate
+
+    @staticmethod
+    def _bytes_per_second():
+        """Returns the average recording rate of the finished sessions with a known duration."""
+        sessions = [session for session in session_catalog.list_sessions()
+                    if session['duration'] and session['size_bytes'] and not session['is_recording']]
+        if not sessions:
+            return DEFAULT_BYTES_PER_SECOND
+        return sum(session['size_bytes'] for session in sessions) / sum(session['duration'] for session in sessions)
+
+    def _drop_raw_audio(self, session):
+        """Deletes audio.wav of a transcribed session whose audio was merged into video.mp4."""
+        if not session['has_transcription']:
+            return 0
+        session_dir = os.path.join(self.data_directory, session['folder'])
+        audio_path = os.path.join(session_dir, 'audio.wav')
+        video_path = os.path.join(session_dir, 'video.mp4')
+        if not os.path.exists(audio_path) or not self._has_audio_stream(video_path):
+            return 0
+        size = os.path.getsize(audio_path)
+        try:
+            os.remove(audio_path)
+        except OSError as e:
+            app_logger.error(f"StorageGovernor: Could not delete {audio_path}: {e}")
+            return 0
+        session_catalog.record_file(audio_path)
+        session_catalog.update(session['folder'], audio_path=None)
+        app_logger.info(f"StorageGovernor: Dropped raw audio of {session['folder']} ({size / 1024 ** 2:.0f} MB)")
+        return size
+
+    def _compress(self, session):
+        """Re-encodes video.mp4 of a session with H.264."""
+        if session['compressed']:
+            return 0
+        video_path = os.path.join(self.data_directory, session['folder'], 'video.mp4')
+        if not os.path.exists(video_path):
+            return 0
+        temp_path = os.path.join(self.data_directory, session['folder'], 'video.compressed.mp4')
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-i", video_path,
+            "-c:v", "libx264", "-preset", "veryslow", "-crf", "30",
+            "-c:a", "copy",
+            temp_path
+        ]
+        size = os.path.getsize(video_path)
+        try:
+            subprocess.run(command, check=True)
+            compressed_size = os.path.getsize(temp_path)
+            if compressed_size < size:
+                os.replace(temp_path, video_path)
+            else:
+                os.remove(temp_path)
+        except (subprocess.CalledProcessError, OSError) as e:
+            app_logger.error(f"StorageGovernor: Could not compress {video_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return 0
+        session_catalog.record_file(video_path)
+        session_catalog.update(session['folder'], compressed=1)
+        freed = max(size - compressed_size, 0)
+        app_logger.info(f"StorageGovernor: Compressed video of {session['folder']} ({freed / 1024 ** 2:.0f} MB freed)")
+        return freed
+
+    def _delete_oldest(self, session):
+        """Deletes a whole session and the screenshots only it references."""
+        session_dir = os.path.join(self.data_directory, session['folder'])
+        size = session['size_bytes'] or 0
+        try:
+            shutil.rmtree(session_dir)
+        except OSError as e:
+            app_logger.error(f"StorageGovernor: Could not delete {session_dir}: {e}")
+            return 0
+        size += screenshot_store.release_session(session['folder'])
+        session_catalog.remove(session['folder'])
+        search_index.remove_session(session['folder'])
+        app_logger.warning(f"StorageGovernor: Deleted session {session['folder']} ({size / 1024 ** 2:.0f} MB)")
+        return size
+
+    @staticmethod
+    def _has_audio_stream(video_path):
+        """Returns True if the video file has an audio stream, i.e. the recording was merged."""
+        if not os.path.exists(video_path):
+            return False
+        command = ["ffprobe", "-v", "error", "-select_streams", "a", "-show_entries", "stream=index",
+                   "-of", "csv=p=0", video_path]
+        try:
+            return bool(subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip())
+        except (subprocess.CalledProcessError, OSError):
+            return False
+
+
+# Shared governor of the data directory size
+storage_governor = StorageGovernor()
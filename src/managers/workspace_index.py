@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+
+from src.config import DATA_DIRECTORY
+from src.managers.options_store import options_store
+from src.utils.logger import app_logger
+
+DEFAULT_OPTIONS = {
+    "ws_name": "", "transcription": False, "transcription_path": "",
+    "can_generate_notes": False, "note_short_path": "", "note_medium_path": "",
+    "note_long_path": "", "thread_id": "", "thread_ids": {}, "assistant_name": ""
+}
+
+
+class WorkspaceIndex:
+    """
+    Incremental index of the workspaces (session folders) in the data directory, keyed by workspace name.
+
+    Each `refresh` lists the data directory only when its modification time changed, and re-reads
+    a workspace's options.json only when the file's modification time or size changed, so an idle
+    data directory costs one stat per workspace instead of a read and parse of every options file.
+
+    Attributes:
+        data_directory (str): The directory containing the workspaces.
+
+    Methods:
+        refresh(): Brings the index up to date and returns the changes as deltas.
+        get(ws_name): Returns the options of a workspace.
+        names(): Returns the names of the indexed workspaces.
+    """
+    ADDED = 'added'
+    UPDATED = 'updated'
+    REMOVED = 'removed'
+
+    def __init__(self, data_directory=DATA_DIRECTORY):
+        self.data_directory = data_directory
+        self._lock = threading.Lock()
+        self._options = {}
+        self._signatures = {}
+        self._names = set()
+        self._directory_mtime = None
+
+    def get(self, ws_name):
+        """
+        Returns the options of a workspace.
+
+        Args:
+            ws_name (str): The name of the workspace.
+
+        Returns:
+            dict or None: The workspace options, or None if the workspace is not indexed.
+        """
+        with self._lock:
+            return self._options.get(ws_name)
+
+    def names(self):
+        """
+        Returns the names of the indexed workspaces.
+
+        Returns:
+            list: The workspace names.
+        """
+        with self._lock:
+            return list(self._options)
+
+    def refresh(self):
+        """
+        Brings the index up to date with the data directory.
+
+        Returns:
+            list: (kind, ws_name, options) deltas, where kind is ADDED, UPDATED or REMOVED
+                and options is None for removed workspaces.
+        """
+        deltas = []
+        directory_mtime = os.stat(self.data_directory).st_mtime_ns
+        if directory_mtime != self._directory_mtime:
+            self._names = {entry.name for entry in os.scandir(self.data_directory)
+                           if entry.is_dir() and not entry.name.startswith('.')}
+            self._directory_mtime = directory_mtime
+
+        for ws_name in self._names:
+            try:
+                delta = self._refresh_workspace(ws_name)
+                if delta:
+                    deltas.append(delta)
+            except Exception as e:
+                app_logger.error(f"WorkspaceIndex: Could not scan {ws_name}: {e}")
+
+        with self._lock:
+            removed = [ws_name for ws_name in self._options if ws_name not in self._names]
+            for ws_name in removed:
+                del self._options[ws_name]
+                self._signatures.pop(ws_name, None)
+        deltas.extend((self.REMOVED, ws_name, None) for ws_name in removed)
+        return deltas
+
+    def _refresh_workspace(self, ws_name):
+        """
+        Re-reads a workspace's options.json if it changed since the last refresh.
+
+        Args:
+            ws_name (str): The name of the workspace.
+
+        Returns:
+            tuple or None: The delta for the workspace, or None if nothing changed.
+        """
+        option_path = os.path.join(self.data_directory, ws_name, 'options.json')
+        ws_json = dict(DEFAULT_OPTIONS, ws_name=ws_name)
+
+        try:
+            stat = os.stat(option_path)
+        except FileNotFoundError:
+            # Created through the options store, so it cannot overwrite options being written concurrently
+            if options_store.create(ws_name, ws_json):
+                app_logger.info(f'WorkspaceIndex: Options file in {ws_name} meeting not found. Created one.')
+            stat = os.stat(option_path)
+            with open(option_path, 'r') as f:
+                ws_json.update(json.load(f))
+        else:
+            if self._signatures.get(ws_name) == (stat.st_mtime_ns, stat.st_size):
+                return None
+            with open(option_path, 'r') as f:
+                ws_json.update(json.load(f))
+
+        with self._lock:
+            self._signatures[ws_name] = (stat.st_mtime_ns, stat.st_size)
+            previous = self._options.get(ws_name)
+            if previous == ws_json:
+                return None
+            self._options[ws_name] = ws_json
+        return (self.ADDED if previous is None else self.UPDATED), ws_name, ws_json
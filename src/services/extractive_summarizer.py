@@ -0,0 +1,140 @@
+import re
+
+import numpy as np
+
+# Number of sentences of the notes per length
+NOTE_SENTENCES = {'short': 5, 'medium': 12, 'long': 25}
+
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+WORD = re.compile(r'\w+', re.UNICODE)
+
+
+class ExtractiveSummarizer:
+    """
+    Offline summarizer picking the most central sentences of a transcription with TextRank.
+
+    Sentences are turned into L2-normalized TF-IDF vectors held in a CSR matrix X. Their cosine
+    similarity graph is X·Xᵀ without its diagonal, and the TextRank power iteration only needs
+    products with that graph, computed as two sparse matrix-vector products (X·(Xᵀ·v)). The
+    similarity matrix is never built, so a 2-hour meeting is summarized in milliseconds.
+
+    Attributes:
+        damping (float): The TextRank damping factor.
+        iterations (int): The maximum number of power iterations.
+        min_word_length (int): Words shorter than this are ignored.
+    """
+
+    def __init__(self, damping=0.85, iterations=50, min_word_length=3):
+        self.damping = damping
+        self.iterations = iterations
+        self.min_word_length = min_word_length
+
+    def summarize(self, transcription, lengths=NOTE_SENTENCES):
+        """
+        Summarizes a transcription for several lengths at once.
+
+        Args:
+            transcription (str): The transcription text.
+            lengths (dict): The number of sentences of every note type, e.g. {'short': 5}.
+
+        Returns:
+            dict: The notes (Markdown bullet lists, sentences in their original order) keyed by note type.
+        """
+        sentences = self.split_sentences(transcription)
+        scores = self.score_sentences(sentences)
+        ranking = np.argsort(-scores, kind='stable')
+
+        notes = {}
+        for note_type, count in lengths.items():
+            selected = np.sort(ranking[:count])
+            notes[note_type] = '\n'.join(f'- {sentences[i]}' for i in selected)
+        return notes
+
+    @staticmethod
+    def split_sentences(text):
+        """
+        Splits a transcription (one segment per line) into sentences.
+
+        Args:
+            text (str): The transcription text.
+
+        Returns:
+            list: The sentences.
+        """
+        joined = ' '.join(line.strip() for line in text.splitlines() if line.strip())
+        return [sentence for sentence in SENTENCE_END.split(joined) if WORD.search(sentence)]
+
+    def score_sentences(self, sentences):
+        """
+        Scores sentences with TextRank over their TF-IDF cosine similarity.
+
+        Args:
+            sentences (list): The sentences.
+
+        Returns:
+            numpy.ndarray: The score of every sentence.
+        """
+        n = len(sentences)
+        if n < 3:
+            return np.ones(n)
+
+        data, indices, indptr = self._tfidf(sentences)
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        vocabulary_size = int(indices.max()) + 1 if indices.size else 0
+        non_empty = (np.diff(indptr) > 0).astype(float)
+
+        def similarity_dot(v):
+            # (X·Xᵀ - I)·v; the diagonal of X·Xᵀ is 1 for the non-empty (normalized) rows
+            xt_v = np.bincount(indices, weights=data * v[rows], minlength=vocabulary_size)
+            x_xt_v = np.bincount(rows, weights=data * xt_v[indices], minlength=n)
+            return x_xt_v - v * non_empty
+
+        degree = similarity_dot(np.ones(n))
+        connected = degree > 1e-12
+        inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=connected)
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(self.iterations):
+            # Sentences without neighbours spread their score uniformly
+            dangling = scores[~connected].sum() / n
+            updated = (1 - self.damping) / n + self.damping * (similarity_dot(scores * inverse_degree) + dangling)
+            if np.abs(updated - scores).sum() < 1e-6:
+                scores = updated
+                break
+            scores = updated
+        return scores
+
+    def _tfidf(self, sentences):
+        """
+        Builds the L2-normalized TF-IDF matrix of the sentences in CSR form.
+
+        Args:
+            sentences (list): The sentences.
+
+        Returns:
+            tuple: The (data, indices, indptr) arrays of the CSR matrix.
+        """
+        vocabulary = {}
+        indices = []
+        indptr = [0]
+        for sentence in sentences:
+            words = [w for w in WORD.findall(sentence.lower()) if len(w) >= self.min_word_length]
+            indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in words)
+            indptr.append(len(indices))
+
+        indices = np.asarray(indices, dtype=np.int64)
+        indptr = np.asarray(indptr, dtype=np.int64)
+        rows = np.repeat(np.arange(len(sentences)), np.diff(indptr))
+
+        # Merge repeated words of a sentence into (row, word, count) entries
+        keys, counts = np.unique(rows * len(vocabulary) + indices, return_counts=True)
+        rows, indices = np.divmod(keys, max(len(vocabulary), 1))
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(sentences)))))
+
+        document_frequency = np.bincount(indices, minlength=len(vocabulary))
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+        data = (1 + np.log(counts)) * idf[indices]
+
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(sentences)))
+        data /= norms[rows]
+        return data, indices, indptr
@@ -0,0 +1,327 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from openai import APIConnectionError, APIStatusError, RateLimitError
+
+from src.utils.logger import app_logger
+
+# Budgets shared by every OpenAI request of the application
+MAX_CONCURRENT_REQUESTS = 4
+REQUESTS_PER_MINUTE = 60
+TOKENS_PER_MINUTE = 60000
+
+# Retries of rate-limited (429), server (5xx) and connection errors
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Number of finished requests kept for `metrics`
+METRICS_HISTORY = 1000
+
+
+def is_retryable(error):
+    """
+    Tells whether a failed request should be retried.
+
+    :param error: The exception raised by the request.
+    :returns: True for rate limits (429), server errors (5xx) and connection errors or timeouts.
+    :rtype: bool
+    """
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error):
+    """
+    Returns the delay requested by the server's Retry-After header, if any.
+    """
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class _RateBucket:
+    """
+    A token bucket refilled continuously with ``per_minute`` units per minute.
+
+    Only used from the scheduler's event loop, so it needs no locking.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    async def acquire(self, amount):
+        amount = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+            self.updated = now
+            if self.level >= amount:
+                self.level -= amount
+                return
+            await asyncio.sleep((amount - self.level) * 60 / self.capacity)
+
+
+class _Request:
+    """
+    A request waiting in, or running through, the scheduler.
+    """
+
+    def __init__(self, fn, args, kwargs, priority, tokens, name):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.tokens = tokens
+        self.name = name
+        self.future = Future()
+        self.attempts = 0
+        self.submitted = time.monotonic()
+        self.started = None
+
+
+class LLMScheduler:
+    """
+    Schedules blocking OpenAI requests from every workspace under shared budgets.
+
+    Requests are queued by priority (lower first, then in submission order) and dispatched by an
+    asyncio event loop running in a background thread. A request is only started when a concurrency
+    slot is free and the requests-per-minute and tokens-per-minute buckets allow it. The blocking call
+    itself runs in a thread pool. Rate-limited, server and connection errors are retried with
+    exponential backoff and full jitter, honouring the server's Retry-After header.
+
+    Attributes
+    ----------
+    max_concurrency : int
+        The maximum number of requests running at the same time.
+    requests_per_minute : int
+        The request budget.
+    tokens_per_minute : int
+        The token budget.
+    max_retries : int
+        The number of retries of a request before its error is reported.
+
+    Methods
+    -------
+    submit(fn, *args, priority=0, tokens=0, name=None, **kwargs)
+        Queues a request and returns a concurrent.futures.Future of its result.
+    metrics()
+        Returns the metrics of the last finished requests.
+    shutdown()
+        Stops the event loop and the thread pool.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS, requests_per_minute=REQUESTS_PER_MINUTE,
+                 tokens_per_minute=TOKENS_PER_MINUTE, max_retries=MAX_RETRIES):
+        """
+        Initializes the LLMScheduler. The event loop is started by the first `submit`.
+
+        :param max_concurrency: The maximum number of requests running at the same time.
+        :type max_concurrency: int
+        :param requests_per_minute: The request budget.
+        :type requests_per_minute: int
+        :param tokens_per_minute: The token budget.
+        :type tokens_per_minute: int
+        :param max_retries: The number of retries of a request before its error is reported.
+        :type max_retries: int
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._metrics = deque(maxlen=METRICS_HISTORY)
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._tasks = set()
+
+    def submit(self, fn, *args, priority=0, tokens=0, name=None, **kwargs):
+        """
+        Queues a request. Can be called from any thread.
+
+        :param fn: The blocking function performing the request.
+        :type fn: callable
+        :param args: Positional arguments of the function.
+        :param priority: The priority of the request; lower values run first.
+        :type priority: float
+        :param tokens: The estimated number of tokens (prompt and completion) of the request.
+        :type tokens: int
+        :param name: The name of the request used in logs and metrics.
+        :type name: str
+        :param kwargs: Keyword arguments of the function.
+        :returns: A future resolved with the result of the function, or its error once the retries are exhausted.
+        :rtype: concurrent.futures.Future
+        """
+        request = _Request(fn, args, kwargs, priority, tokens, name or getattr(fn, '__name__', 'request'))
+        self._start()
+        self._loop.call_soon_threadsafe(self._enqueue, request)
+        return request.future
+
+    def metrics(self):
+        """
+        Returns the metrics of the last finished requests.
+
+        :returns: One dictionary per request with its name, priority, tokens, attempts, status,
+            time spent waiting in the queue, duration of the last attempt and total time (in seconds).
+        :rtype: list of dict
+        """
+        with self._lock:
+            return list(self._metrics)
+
+    def shutdown(self):
+        """
+        Stops the event loop and the thread pool. Queued requests, including the ones waiting for a retry, are cancelled.
+        """
+        with self._lock:
+            loop, thread, executor = self._loop, self._thread, self._executor
+            self._loop = self._thread = self._executor = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        executor.shutdown(wait=False, cancel_futures=True)
+        app_logger.info("LLMScheduler: Shut down")
+
+    def _start(self):
+        """
+        Starts the event loop thread if it is not running.
+        """
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='llm')
+            self._queue = asyncio.PriorityQueue()
+            self._retries = {}
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._requests = _RateBucket(self.requests_per_minute)
+            self._tokens = _RateBucket(self.tokens_per_minute)
+            self._thread = threading.Thread(target=self._run_loop, args=(self._loop,), daemon=True)
+            self._thread.start()
+
+    def _run_loop(self, loop):
+        """
+        Event loop thread.
+        """
+        asyncio.set_event_loop(loop)
+        self._spawn(self._dispatch())
+        loop.run_forever()
+
+        # Shut down: stop the running tasks and fail the requests still waiting in the queue or for a retry
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        waiting = []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait()[2])
+        for request, handle in self._retries.items():
+            handle.cancel()
+            waiting.append(request)
+        self._retries.clear()
+        for request in waiting:
+            if not request.future.done() and not request.future.cancel():
+                request.future.set_exception(RuntimeError("LLM scheduler shut down"))
+        loop.close()
+
+    def _spawn(self, coroutine):
+        """
+        Starts a task, keeping a reference to it until it finishes.
+        """
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _enqueue(self, request):
+        self._queue.put_nowait((request.priority, next(self._counter), request))
+
+    def _retry(self, request):
+        """
+        Queues a request again once its retry delay has passed.
+        """
+        self._retries.pop(request, None)
+        self._enqueue(request)
+
+    async def _dispatch(self):
+        """
+        Starts the queued requests, in priority order, as the slots and budgets allow.
+        """
+        while True:
+            _, _, request = await self._queue.get()
+            if request.attempts == 0 and not request.future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            try:
+                await self._slots.acquire()
+                await self._requests.acquire(1)
+                await self._tokens.acquire(request.tokens)
+            except asyncio.CancelledError:
+                request.future.set_exception(RuntimeError("LLM scheduler shut down"))
+                raise
+            self._spawn(self._execute(request))
+
+    async def _execute(self, request):
+        """
+        Runs one attempt of a request and either resolves its future or schedules a retry.
+        """
+        request.attempts += 1
+        attempt_started = time.monotonic()
+        if request.started is None:
+            request.started = attempt_started
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: request.fn(*request.args, **request.kwargs))
+        except asyncio.CancelledError:
+            request.future.set_exception(RuntimeError("LLM scheduler shut down"))
+            raise
+        except Exception as e:
+            if is_retryable(e) and request.attempts <= self.max_retries:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (request.attempts - 1)))
+                delay = max(delay, _retry_after(e) or 0)
+                app_logger.warning(f"LLMScheduler: {request.name} failed (attempt {request.attempts}), "
+                                   f"retrying in {delay:.1f}s: {e}")
+                self._retries[request] = asyncio.get_running_loop().call_later(delay, self._retry, request)
+            else:
+                app_logger.error(f"LLMScheduler: {request.name} failed after {request.attempts} attempt(s): {e}")
+                self._record(request, attempt_started, 'failed')
+                request.future.set_exception(e)
+        else:
+            self._record(request, attempt_started, 'completed')
+            request.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _record(self, request, attempt_started, status):
+        """
+        Records the metrics of a finished request.
+        """
+        finished = time.monotonic()
+        metrics = {
+            'name': request.name,
+            'priority': request.priority,
+            'tokens': request.tokens,
+            'attempts': request.attempts,
+            'status': status,
+            'queued': round(request.started - request.submitted, 3),
+            'duration': round(finished - attempt_started, 3),
+            'total': round(finished - request.submitted, 3),
+        }
+        with self._lock:
+            self._metrics.append(metrics)
+        app_logger.info(f"LLMScheduler: {request.name} {status} in {metrics['total']:.1f}s "
+                        f"(queued {metrics['queued']:.1f}s, {request.attempts} attempt(s))")
+
+
+# Shared scheduler for the OpenAI requests of every workspace
+llm_scheduler = LLMScheduler()
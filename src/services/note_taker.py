@@ -1,18 +1,73 @@
-from openai import OpenAI, OpenAIError
+from openai import OpenAI, OpenAIError, NotFoundError
+import hashlib
+import json
 import time
 import uuid
 from src.utils.logger import app_logger
-import multiprocessing
+from src.utils.disk_cache import make_key
+import threading
 import os
-from src.config import DATA_DIRECTORY
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.text_chunker import chunk_text, count_tokens
+from src.config import DATA_DIRECTORY, CACHE_DIRECTORY
+
+ASSISTANT_CACHE_FILE = os.path.join(CACHE_DIRECTORY, 'assistants.json')
+
+# Polling of runs when streaming is not available (seconds)
+POLL_INITIAL_INTERVAL = 0.25
+POLL_MAX_INTERVAL = 4.0
+POLL_BACKOFF_FACTOR = 1.5
+RUN_TIMEOUT = 300
+# Run statuses that block new runs on the thread, and statuses after which a run does not change
+ACTIVE_RUN_STATUSES = ['queued', 'in_progress', 'cancelling']
+FINAL_RUN_STATUSES = ['completed', 'failed', 'cancelled', 'expired', 'incomplete', 'requires_action']
+
+# Map-reduce of transcriptions that do not fit in the model's context (tokens)
+TRANSCRIPTION_TOKEN_BUDGET = 12000
+CHUNK_TOKENS = 3000
+CHUNK_SUMMARY_TOKENS = 600
+MAX_PARALLEL_CHUNKS = 4
+NOTES_PROMPT = 'Create {notes_length} summarization of meeting'
+CHUNK_SUMMARY_MSG = ('You summarize a part of a meeting transcription. Keep every decision, action item, '
+                     'name, number and topic, in the order they appear. Respond only with the summary.')
+
+_clients = {}
+_clients_lock = threading.Lock()
+_assistant_cache_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """
+    Returns the shared OpenAI client for an API key.
+
+    The client keeps a pool of open HTTP connections, so reusing it across NoteTaker instances
+    and worker threads avoids a new TLS handshake for every request. The SDK's own retries are
+    turned off, since `llm_scheduler` retries rate-limited and failed requests itself.
+
+    Args:
+        api_key (str): The OpenAI API key.
+
+    Returns:
+        OpenAI: The shared client.
+    """
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = OpenAI(api_key=api_key, max_retries=0)
+        return _clients[api_key]
+
 
 class NoteTaker:
     """
     A class for managing note-taking using OpenAI's API.
+
+    Clients are shared per API key (see `get_client`) and assistant IDs are cached on disk,
+    keyed by API key, assistant name, model and instructions, so creating a NoteTaker is cheap.
     
     Attributes:
         _client (OpenAI): The OpenAI client for API interactions.
         format (str): The format for generated notes (MD, HTML, LaTeX, or TXT).
+        model (str): The model of the assistant, set by `create_assistant`.
+        instructions (str): The instructions of the assistant, set by `create_assistant`.
         _format_msg (str): Instruction for the assistant on formatting.
     """
     
@@ -24,9 +79,12 @@ class NoteTaker:
             api_key (str): The OpenAI API key.
             format (str): Desired format for the notes ('MD', 'HTML', 'LATEX', 'TXT').
         """
-        self._client = OpenAI(api_key=api_key)
+        self._client = get_client(api_key)
         self.format = format.upper() if format.upper() in ['MD', 'HTML', 'LATEX', 'TXT'] else 'MD'
         self._format_msg = f' Respond only with {self.format} formatting'
+        self.model = None
+        self.instructions = None
+        self.assistant_name = None
         
     def update_api_key(self, api_key):
         """
@@ -35,7 +93,7 @@ class NoteTaker:
         Args:
             api_key (str): The new API key.
         """
-        self._client = OpenAI(api_key=api_key)
+        self._client = get_client(api_key)
         app_logger.info(msg=f"NoteTaker: OpenAI API key updated")
         
     def update_format(self, format):
@@ -50,6 +108,10 @@ class NoteTaker:
     def create_assistant(self, assistant_name: str = 'Note taker', assistant_msg: str = None, model: str = 'gpt-3.5-turbo'):
         """
         Creates an assistant for note-taking if it does not already exist.
+
+        The assistant ID is looked up in the on-disk cache first; the assistants are only listed
+        (and possibly created) on a cache miss. A cached ID of an assistant deleted remotely is
+        replaced when a run fails with NotFound (see `notes_job`).
         
         Args:
             assistant_name (str): The name of the assistant.
@@ -59,19 +121,129 @@ class NoteTaker:
         Returns:
             str: The assistant ID.
         """
+        self.model = model
+        self.instructions = assistant_msg
+        self.assistant_name = assistant_name
+        cache_key = self._assistant_cache_key(assistant_name, assistant_msg, model)
+        assistant_id = self._load_assistant_cache().get(cache_key)
+        if assistant_id:
+            return assistant_id
+
         assistants = self._client.beta.assistants.list()
         for ass in assistants:
             if ass.name == assistant_name:
                 app_logger.info(f"NoteTaker: Assistant {ass.name} exists")
-                return ass.id
-        
-        assistant = self._client.beta.assistants.create(
-            model=model,
-            name=assistant_name,
-            instructions=assistant_msg
-        )
-        app_logger.info(f"NoteTaker: Created Assistant {assistant.id}")
-        return assistant.id
+                assistant_id = ass.id
+                break
+        else:
+            assistant = self._client.beta.assistants.create(
+                model=model,
+                name=assistant_name,
+                instructions=assistant_msg
+            )
+            app_logger.info(f"NoteTaker: Created Assistant {assistant.id}")
+            assistant_id = assistant.id
+
+        self._save_assistant_id(cache_key, assistant_id)
+        return assistant_id
+
+    def notes_cache_key(self, transcription, notes_length):
+        """
+        Builds the key of generated notes in the notes cache.
+
+        The key covers everything that shapes the notes: the transcription, the prompts (including the
+        assistant's instructions and the chunk summary prompt used for long transcriptions), the length,
+        the model and the format. Call it after `create_assistant`.
+
+        Args:
+            transcription (str): The transcription text.
+            notes_length (str): The length of the notes ('SHORT', 'MEDIUM', 'LONG').
+
+        Returns:
+            str: The cache key.
+        """
+        prompts = '\n'.join([self._format_msg, self.instructions or '', NOTES_PROMPT, CHUNK_SUMMARY_MSG])
+        return make_key('notes', hashlib.sha256(transcription.encode()).hexdigest(),
+                        hashlib.sha256(prompts.encode()).hexdigest(), notes_length, self.model, self.format)
+
+    @staticmethod
+    def _load_assistant_cache():
+        """
+        Loads the cached assistant IDs.
+
+        Returns:
+            dict: Assistant IDs keyed by the cache key built in `create_assistant`.
+        """
+        try:
+            with open(ASSISTANT_CACHE_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _recover_assistant(self, assistant_id):
+        """
+        Replaces the assistant after a run failed with NotFound, if the assistant itself is gone.
+
+        Args:
+            assistant_id (str): The ID of the assistant used by the failed run.
+
+        Returns:
+            str or None: The ID of the looked up or recreated assistant, or None if the assistant
+                still exists (i.e. something else, such as the thread, was not found).
+        """
+        try:
+            self._client.beta.assistants.retrieve(assistant_id)
+            return None
+        except NotFoundError:
+            app_logger.warning(f"NoteTaker: Assistant {assistant_id} no longer exists, dropping it from the cache")
+        # modify_notes jobs may run without create_assistant, i.e. with the default assistant
+        assistant_name = self.assistant_name or 'Note taker'
+        model = self.model or 'gpt-3.5-turbo'
+        self._forget_assistant_id(self._assistant_cache_key(assistant_name, self.instructions, model), assistant_id)
+        return self.create_assistant(assistant_name, self.instructions, model)
+
+    def _assistant_cache_key(self, assistant_name, assistant_msg, model):
+        """Returns the key of an assistant ID in the on-disk cache."""
+        return make_key(hashlib.sha256(self._client.api_key.encode()).hexdigest(), assistant_name, model,
+                        hashlib.sha256((assistant_msg or '').encode()).hexdigest())
+
+    @staticmethod
+    def _forget_assistant_id(cache_key, assistant_id):
+        """
+        Removes an assistant ID from the on-disk cache, unless the entry was already replaced.
+
+        Args:
+            cache_key (str): The cache key built in `create_assistant`.
+            assistant_id (str): The stale assistant ID.
+        """
+        with _assistant_cache_lock:
+            cache = NoteTaker._load_assistant_cache()
+            if cache.get(cache_key) != assistant_id:
+                return
+            del cache[cache_key]
+            try:
+                with open(ASSISTANT_CACHE_FILE, 'w') as f:
+                    json.dump(cache, f, indent=4)
+            except OSError as e:
+                app_logger.warning(f"NoteTaker: Could not update the assistant cache: {e}")
+
+    @staticmethod
+    def _save_assistant_id(cache_key, assistant_id):
+        """
+        Stores an assistant ID in the on-disk cache.
+
+        Args:
+            cache_key (str): The cache key built in `create_assistant`.
+            assistant_id (str): The assistant ID.
+        """
+        with _assistant_cache_lock:
+            cache = NoteTaker._load_assistant_cache()
+            cache[cache_key] = assistant_id
+            try:
+                with open(ASSISTANT_CACHE_FILE, 'w') as f:
+                    json.dump(cache, f, indent=4)
+            except OSError as e:
+                app_logger.warning(f"NoteTaker: Could not cache assistant ID: {e}")
     
     def create_thread(self):
         """
@@ -86,9 +258,70 @@ class NoteTaker:
         app_logger.info(f'NoteTaker: Created Thread {thread.id}')
         return thread.id
     
-    def generate_notes(self, assistant_id, thread_id, transcription, notes_length='SHORT', callback=None):
+    def condense_transcription(self, transcription, model='gpt-3.5-turbo', max_tokens=TRANSCRIPTION_TOKEN_BUDGET,
+                               scheduler=None, priority=0):
         """
-        Generates notes asynchronously in a separate process.
+        Shrinks a transcription that does not fit in the token budget.
+
+        The transcription is split into chunks that are summarized concurrently (at most
+        MAX_PARALLEL_CHUNKS requests at a time, or under the budgets of the given LLM scheduler).
+        While the joined summaries still exceed the budget, they are chunked and summarized again,
+        so the latency grows with the depth of the reduction rather than with the length of the meeting.
+
+        Args:
+            transcription (str): The transcription text.
+            model (str): OpenAI model used for the chunk summaries.
+            max_tokens (int): The token budget of the returned text.
+            scheduler (LLMScheduler, optional): Scheduler running the chunk summaries.
+            priority (float): Priority of the chunk summaries in the scheduler.
+
+        Returns:
+            str: The transcription itself if it fits in the budget, otherwise the condensed summaries.
+        """
+        text = transcription
+        level = 0
+        while count_tokens(text, model) > max_tokens:
+            chunks = chunk_text(text, CHUNK_TOKENS, model)
+            if len(chunks) < 2:
+                break
+            level += 1
+            app_logger.info(f"NoteTaker: Condensing {len(chunks)} chunks (level {level})")
+            if scheduler is None:
+                with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CHUNKS) as executor:
+                    summaries = list(executor.map(lambda chunk: self._summarize_chunk(chunk, model), chunks))
+            else:
+                futures = [scheduler.submit(self._summarize_chunk, chunk, model, priority=priority,
+                                            tokens=count_tokens(chunk, model) + CHUNK_SUMMARY_TOKENS,
+                                            name=f'chunk {i + 1}/{len(chunks)}')
+                           for i, chunk in enumerate(chunks)]
+                summaries = [future.result() for future in futures]
+            text = '\n\n'.join(summaries)
+        return text
+
+    def _summarize_chunk(self, chunk, model):
+        """
+        Summarizes a chunk of a transcription with a single chat completion.
+
+        Args:
+            chunk (str): The chunk text.
+            model (str): OpenAI model to use.
+
+        Returns:
+            str: The summary of the chunk.
+        """
+        response = self._client.chat.completions.create(
+            model=model,
+            messages=[{"role": "system", "content": CHUNK_SUMMARY_MSG},
+                      {"role": "user", "content": chunk}],
+            max_tokens=CHUNK_SUMMARY_TOKENS,
+            temperature=0
+        )
+        return response.choices[0].message.content.strip()
+
+    def generate_notes(self, assistant_id, thread_id, transcription, notes_length='SHORT', callback=None,
+                       on_partial=None):
+        """
+        Generates notes asynchronously in a separate thread.
         
         Args:
             assistant_id (str): The ID of the assistant.
@@ -96,59 +329,72 @@ class NoteTaker:
             transcription (str): The transcription text to summarize.
             notes_length (str): The desired length of notes ('SHORT', 'MEDIUM', 'LONG').
             callback (function, optional): Function to process results.
+            on_partial (function, optional): Function receiving the notes produced so far while the run streams.
         
         Returns:
-            multiprocessing.Process: The process handling note generation.
+            threading.Thread: The thread handling note generation.
         """
-        api_key = self._client.api_key
-        process = multiprocessing.Process(
-            target=self._generate_notes_worker,
-            args=(api_key, assistant_id, thread_id, transcription, notes_length, callback)
-        )
-        process.start()
-        return process
+        job = self.notes_job(assistant_id, thread_id, transcription, notes_length, on_partial)
+        thread = threading.Thread(target=self._notes_worker, args=(job, callback))
+        thread.start()
+        return thread
     
-    def modify_notes(self, assistant_id, thread_id, notes_length='SHORT', callback=None):
-        api_key = self._client.api_key
-        process = multiprocessing.Process(
-            target=self._modify_notes_worker,
-            args=(api_key, assistant_id, thread_id, notes_length, callback)
-        )
-        process.start()
-        return process
+    def modify_notes(self, assistant_id, thread_id, notes_length='SHORT', callback=None, on_partial=None):
+        job = self.notes_job(assistant_id, thread_id, None, notes_length, on_partial)
+        thread = threading.Thread(target=self._notes_worker, args=(job, callback))
+        thread.start()
+        return thread
 
-    @staticmethod
-    def _generate_notes_worker(api_key, assistant_id, thread_id, transcription, notes_length, callback):
+    def notes_job(self, assistant_id, thread_id, transcription=None, notes_length='SHORT', on_partial=None):
         """
-        Worker function to generate notes in a separate process.
+        Builds a blocking function that requests notes and returns them.
+
+        The messages are only posted to the thread once, so the function can be called again after
+        a failure, e.g. when it is retried by the LLM scheduler. If the run fails because the assistant
+        was deleted remotely, the assistant is replaced and the run is started once more.
+
+        Args:
+            assistant_id (str): The ID of the assistant.
+            thread_id (str): The ID of the thread.
+            transcription (str, optional): The transcription text to post, or None to reuse the one in the thread.
+            notes_length (str): The desired length of notes ('SHORT', 'MEDIUM', 'LONG').
+            on_partial (function, optional): Function receiving the notes produced so far while the run streams.
+
+        Returns:
+            function: The job, returning the notes.
         """
         if notes_length not in ['SHORT', 'MEDIUM', 'LONG']:
             notes_length = 'SHORT'
-        
+
+        client = self._client
+        messages = [transcription] if transcription is not None else []
+        messages.append(NOTES_PROMPT.format(notes_length=notes_length))
+
+        assistant_ids = [assistant_id]
+
+        def job():
+            while messages:
+                client.beta.threads.messages.create(thread_id=thread_id, role='user', content=messages[0])
+                messages.pop(0)
+            try:
+                return NoteTaker._run(client, assistant_ids[0], thread_id, on_partial)
+            except NotFoundError:
+                replacement = self._recover_assistant(assistant_ids[0])
+                if replacement is None:
+                    raise
+                assistant_ids[0] = replacement
+                return NoteTaker._run(client, replacement, thread_id, on_partial)
+        return job
+
+    @staticmethod
+    def _notes_worker(job, callback):
+        """
+        Worker function running a notes job in a separate thread.
+        """
         try:
-            client = OpenAI(api_key=api_key)
-            client.beta.threads.messages.create(thread_id=thread_id, role='user', content=transcription)
-            client.beta.threads.messages.create(thread_id=thread_id, role='user', content=f'Create {notes_length} summarization of meeting')
-            run = client.beta.threads.runs.create(assistant_id=assistant_id, thread_id=thread_id)
-            
-            while True:
-                run_status = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
-                if run_status.status == 'completed':
-                    break
-                elif run_status.status in ['failed', 'cancelled']:
-                    app_logger.error(f"Run failed with status: {run_status.status}")
-                    if callback:
-                        callback(None)
-                    return
-                time.sleep(1)
-            
-            messages = client.beta.threads.messages.list(thread_id=thread_id)
-            for message in messages.data:
-                if callback:
-                    callback(f'{message.content[0].text.value}')
-                    return
+            notes = job()
             if callback:
-                callback(None)
+                callback(notes)
         except OpenAIError as e:
             app_logger.error(f"OpenAI API error: {e}")
             if callback:
@@ -159,38 +405,74 @@ class NoteTaker:
                 callback(None)
 
     @staticmethod
-    def _modify_notes_worker(api_key, assistant_id, thread_id, notes_length, callback):
-        if notes_length not in ['SHORT', 'MEDIUM', 'LONG']:
-            notes_length = 'SHORT'
-        
+    def _run(client, assistant_id, thread_id, on_partial=None, timeout=RUN_TIMEOUT):
+        """
+        Runs the assistant on a thread and returns the text of its reply.
+
+        The run is streamed so text arrives as it is produced. If streaming fails, the run is
+        polled instead, with exponentially growing intervals and an overall timeout. A run the
+        server created before the stream failed is polled rather than started again.
+
+        Args:
+            client (OpenAI): The OpenAI client.
+            assistant_id (str): The ID of the assistant.
+            thread_id (str): The ID of the thread.
+            on_partial (function, optional): Function receiving the reply produced so far.
+            timeout (float): Maximum time (in seconds) to wait for the run.
+
+        Returns:
+            str: The assistant's reply.
+
+        Raises:
+            RuntimeError: If the run ends in a status other than 'completed'.
+            TimeoutError: If the run does not finish within the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        started_at = int(time.time())
+        stream = None
+        parts = []
         try:
-            client = OpenAI(api_key=api_key)
-            client.beta.threads.messages.create(thread_id=thread_id, role='user', content=f'Create {notes_length} summarization of meeting')
-            run = client.beta.threads.runs.create(assistant_id=assistant_id, thread_id=thread_id)
-            
-            while True:
-                run_status = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
-                if run_status.status == 'completed':
-                    break
-                elif run_status.status in ['failed', 'cancelled']:
-                    app_logger.error(f"Run failed with status: {run_status.status}")
-                    if callback:
-                        callback(None)
-                    return
-                time.sleep(1)
-            
-            messages = client.beta.threads.messages.list(thread_id=thread_id)
-            for message in messages.data:
-                if callback:
-                    callback(f'{message.content[0].text.value}')
-                    return
-            if callback:
-                callback(None)
+            with client.beta.threads.runs.stream(thread_id=thread_id, assistant_id=assistant_id,
+                                                 timeout=timeout) as stream:
+                for delta in stream.text_deltas:
+                    parts.append(delta)
+                    if on_partial:
+                        on_partial(''.join(parts))
+            run = stream.current_run
+            if run is not None and run.status == 'completed' and parts:
+                return ''.join(parts)
         except OpenAIError as e:
-            app_logger.error(f"OpenAI API error: {e}")
-            if callback:
-                callback(None)
-        except Exception as e:
-            app_logger.error(f"Unexpected error: {e}")
-            if callback:
-                callback(None)
+            app_logger.warning(f"NoteTaker: Streaming run failed, falling back to polling: {e}")
+            run = stream.current_run if stream is not None else None
+
+        if run is None:
+            # The server may have started the run before the stream failed; a new run would be refused
+            latest = next(iter(client.beta.threads.runs.list(thread_id=thread_id, limit=1).data), None)
+            if latest is not None and (latest.status in ACTIVE_RUN_STATUSES or latest.created_at >= started_at):
+                run = latest
+            else:
+                run = client.beta.threads.runs.create(assistant_id=assistant_id, thread_id=thread_id)
+
+        interval = POLL_INITIAL_INTERVAL
+        while run.status not in FINAL_RUN_STATUSES:
+            if time.monotonic() + interval > deadline:
+                client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+                raise TimeoutError(f"Run {run.id} did not finish within {timeout}s")
+            time.sleep(interval)
+            interval = min(interval * POLL_BACKOFF_FACTOR, POLL_MAX_INTERVAL)
+            run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+
+        if run.status != 'completed':
+            app_logger.error(f"Run failed with status: {run.status}")
+            if run.status == 'requires_action':
+                # The assistant has no tools to call; the run would block the thread until it expires
+                client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+            raise RuntimeError(f"Run {run.id} ended with status: {run.status}")
+
+        messages = client.beta.threads.messages.list(thread_id=thread_id, order='desc', limit=1)
+        for message in messages.data:
+            notes = f'{message.content[0].text.value}'
+            if on_partial:
+                on_partial(notes)
+            return notes
+        raise RuntimeError(f"Run {run.id} completed without a reply")
@@ -8,6 +8,8 @@ from reportlab.lib.units import mm
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from src.config import DATA_DIRECTORY
+from src.managers.session_archive import session_archive
+from src.managers.session_catalog import session_catalog
 from src.utils.logger import app_logger
 
 
@@ -49,19 +51,22 @@ class PDFGenerator:
 
         font_normal, font_bold = PDFGenerator._setup_fonts()
 
-        # Load workspace options
-        try:
-            with open(options_path, 'r', encoding='utf-8') as f:
-                options = json.load(f)
-        except Exception as e:
-            app_logger.error(f"PDFGenerator: Failed to load options for {ws_name}: {e}")
-            return False
+        # Load workspace options from the session catalog, or from options.json if it is not cataloged
+        options = session_catalog.get(folder_name)
+        if options is None:
+            try:
+                with open(options_path, 'r', encoding='utf-8') as f:
+                    options = json.load(f)
+            except Exception as e:
+                app_logger.error(f"PDFGenerator: Failed to load options for {ws_name}: {e}")
+                return False
 
-        assistant_name = options.get('assistant_name', 'N/A')
+        assistant_name = options.get('assistant_name') or 'N/A'
+        # Notes of archived sessions are extracted from the session archive
         note_paths = {
-            'short': options.get('note_short_path', ''),
-            'medium': options.get('note_medium_path', ''),
-            'long': options.get('note_long_path', '')
+            'short': session_archive.resolve(options.get('note_short_path')) or '',
+            'medium': session_archive.resolve(options.get('note_medium_path')) or '',
+            'long': session_archive.resolve(options.get('note_long_path')) or ''
         }
 
         doc = SimpleDocTemplate(
@@ -7,6 +7,8 @@ import imagehash
 from mss import mss
 from pygetwindow import getWindowsWithTitle
 
+from src.managers.screenshot_store import screenshot_store, MANIFEST_FILE
+from src.managers.session_catalog import session_catalog
 from src.utils.logger import app_logger
 
 
@@ -14,12 +16,15 @@ class ScreenshotTaker:
     """
     A class for periodically taking screenshots of a specific application window.
 
-    Screenshots are saved to a directory in a timestamped format.
+    Screenshots are saved to the shared screenshot store under a timestamped name and listed in the
+    session's screenshot manifest.
 
     Attributes
     ----------
     session_dir : str
-        The directory where screenshots will be saved.
+        The session's screenshots directory, holding its screenshot manifest.
+    folder : str
+        The session folder name the screenshots are stored under.
     window_title : str
         The title of the application window to capture screenshots from.
     interval : int
@@ -47,6 +52,7 @@ class ScreenshotTaker:
         :type window_title: str
         """
         self.window_rect = None
+        self.folder = os.path.basename(os.path.normpath(session_dir))
         self.session_dir = os.path.join(session_dir, "screenshots")
         os.makedirs(self.session_dir, exist_ok=True)
         self.window_title = window_title
@@ -79,7 +85,7 @@ class ScreenshotTaker:
         Starts capturing screenshots of the specified application window.
 
         Captures screenshots at regular intervals defined by the `interval` attribute and saves them
-        as PNG files in the session directory. Additionally, it filters out nearly identical screenshots
+        in the screenshot store, where captures identical to an already stored one are not written again. Additionally, it filters out nearly identical screenshots
         using perceptual hashing. If the similarity with the previous screenshot is 90% or higher, the new
         screenshot is skipped.
 
@@ -94,7 +100,6 @@ class ScreenshotTaker:
             with mss() as sct:
                 while self.is_running:
                     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                    screenshot_path = os.path.join(self.session_dir, f"screenshot_{timestamp}.png")
                     screenshot = sct.grab(self.window_rect)
 
                     image = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
@@ -109,7 +114,8 @@ class ScreenshotTaker:
                             time.sleep(self.interval)
                             continue
 
-                    image.save(screenshot_path)
+                    screenshot_store.add(self.folder, f"screenshot_{timestamp}.png", image, phash=current_hash)
+                    session_catalog.record_file(os.path.join(self.session_dir, MANIFEST_FILE))
                     last_hash = current_hash
 
                     time.sleep(self.interval)
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+
+from src.config import SETTINGS_FILE
+from src.utils.logger import app_logger
+
+
+class SettingsWatcher:
+    """
+    Watches the settings file and publishes changes to subscribers.
+
+    The parsed settings are cached in memory. A background thread only stats the file (modification
+    time and size) and re-reads it when one of them changed, then notifies the subscribers whose keys
+    changed with a ``{key: new_value}`` dictionary.
+
+    Attributes
+    ----------
+    path : str
+        The path to the watched settings file.
+    interval : float
+        The time (in seconds) between two checks of the file.
+
+    Methods
+    -------
+    get(key, default=None)
+        Returns the cached value of a setting.
+    subscribe(callback, keys=None)
+        Registers a callback for changes of the given keys (or of any key).
+    unsubscribe(callback)
+        Removes a callback.
+    check()
+        Re-reads the file if it changed and notifies the subscribers.
+    stop()
+        Stops the watcher thread.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, interval=0.5):
+        """
+        Initializes the SettingsWatcher and loads the current settings.
+
+        :param path: The path to the settings file.
+        :type path: str
+        :param interval: The time (in seconds) between two checks of the file.
+        :type interval: float
+        """
+        self.path = path
+        self.interval = interval
+        self._settings = {}
+        self._signature = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._reload()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value of a setting.
+
+        :param key: The setting name.
+        :type key: str
+        :param default: The value returned if the setting is missing.
+        """
+        with self._lock:
+            return self._settings.get(key, default)
+
+    def subscribe(self, callback, keys=None):
+        """
+        Registers a callback for setting changes and starts the watcher thread if needed.
+
+        :param callback: Function called with a ``{key: new_value}`` dictionary of the changed settings.
+        :type callback: callable
+        :param keys: The settings the callback is interested in, or None for all of them.
+        :type keys: list of str or None
+        """
+        with self._lock:
+            self._subscribers.append((callback, set(keys) if keys else None))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, callback):
+        """
+        Removes a callback registered with `subscribe`.
+
+        :param callback: The callback to remove.
+        :type callback: callable
+        """
+        with self._lock:
+            self._subscribers = [(cb, keys) for cb, keys in self._subscribers if cb != callback]
+
+    def check(self):
+        """
+        Re-reads the settings file if its modification time or size changed and notifies the subscribers.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        if (stat.st_mtime_ns, stat.st_size) == self._signature:
+            return
+
+        changed = self._reload()
+        if not changed:
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, keys in subscribers:
+            relevant = {key: value for key, value in changed.items() if keys is None or key in keys}
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    app_logger.error(f"SettingsWatcher: Subscriber failed to handle {list(relevant)}: {e}")
+
+    def stop(self):
+        """
+        Stops the watcher thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _reload(self):
+        """
+        Reads and parses the settings file, replacing the cached settings.
+
+        :returns: The settings whose value changed, as a ``{key: new_value}`` dictionary.
+        :rtype: dict
+        """
+        try:
+            stat = os.stat(self.path)
+            with open(self.path, 'r') as f:
+                new_settings = json.load(f)
+        except (OSError, ValueError) as e:
+            # The file may be caught halfway through a write; keep the old values and retry on the next check.
+            app_logger.warning(f"SettingsWatcher: Could not read {self.path}: {e}")
+            return {}
+
+        with self._lock:
+            changed = {key: value for key, value in new_settings.items() if self._settings.get(key) != value}
+            self._settings = new_settings
+            self._signature = (stat.st_mtime_ns, stat.st_size)
+        return changed
+
+    def _watch(self):
+        """
+        Watcher thread loop.
+        """
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+
+# Shared watcher for the application settings
+settings_watcher = SettingsWatcher()
@@ -1,8 +1,56 @@
+import json
+import threading
+import time
+import wave
+
 import torch
 import whisper
 import os
+from src.utils.disk_cache import DiskCache, hash_file, make_key
 from src.utils.logger import app_logger
-from src.config import settings
+from src.utils.transcript import normalize_segments, save_segments, to_srt, to_vtt
+from src.utils.wav_reader import WavWindowReader, UnsupportedWavEncoding
+from src.services.settings_watcher import settings_watcher
+from src.managers.session_catalog import session_catalog
+from src.managers.search_index import search_index
+from src.config import CACHE_DIRECTORY, TRANSCRIPTION_STATS_FILE
+
+# Named speed profiles trading accuracy for throughput.
+#   quantize: dynamic int8 quantization of the linear layers (CPU only)
+#   thread_ratio: fraction of the logical CPUs used for intra-op parallelism (CPU only)
+#   the remaining keys are passed to ``whisper.transcribe`` as decode options
+TRANSCRIPTION_PROFILES = {
+    "fast": {
+        "quantize": True,
+        "thread_ratio": 1.0,
+        "beam_size": None,
+        "best_of": None,
+        "temperature": 0.0,
+        "condition_on_previous_text": False,
+    },
+    "balanced": {
+        "quantize": True,
+        "thread_ratio": 0.5,
+        "beam_size": None,
+        "best_of": 2,
+        "temperature": (0.0, 0.4, 0.8),
+        "condition_on_previous_text": True,
+    },
+    "accurate": {
+        "quantize": False,
+        "thread_ratio": 0.5,
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "condition_on_previous_text": True,
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+# WAV recordings are transcribed in windows of this length, so memory use does not grow with the meeting length.
+WINDOW_SECONDS = 180
+# Segments ending this close to a window's end may be cut off; they are transcribed again in the next window.
+WINDOW_MARGIN_SECONDS = 5
 
 
 class SpeechToText:
@@ -10,45 +58,179 @@ class SpeechToText:
     A class for transcribing audio files to text using the Whisper model.
 
     The class initializes a Whisper model for transcription and provides methods for
-    transcribing audio and saving the transcription.
+    transcribing audio and saving the transcription. Results are cached on disk, keyed by
+    the audio content and the transcription settings, so unchanged audio is never decoded twice.
 
     Attributes
     ----------
     model : whisper.Model
         The Whisper model instance used for transcription.
+    model_size : str
+        The size of the loaded Whisper model.
     transcription_language : str
         The language used for transcriptions, as specified in settings.
+    profile : str
+        The name of the speed profile in use (see `TRANSCRIPTION_PROFILES`).
+    quantized : bool
+        Whether the model's linear layers were quantized to int8.
+    decode_options : dict
+        Extra options passed to ``whisper.transcribe``; they are part of the cache key.
+    real_time_factors : dict
+        The last real-time factor (processing time / audio duration) achieved per profile.
+    cache : DiskCache or None
+        The transcription cache, or None if caching is disabled.
 
     Methods
     -------
     transcribe_audio(audio_path)
         Transcribes the given audio file to text.
+    transcribe_segments(audio_path)
+        Transcribes the given audio file to timestamped segments.
+    transcribe_batch(audio_paths)
+        Transcribes several audio files, skipping the ones already in the cache.
     save_transcription(transcription, output_path)
         Saves the transcribed text to a file.
+    save_segments(segments, output_dir)
+        Saves timestamped segments as JSON, SRT and VTT files.
     """
 
-    def __init__(self):
+    def __init__(self, use_cache=True, profile=None, model_size=None, record_stats=True):
         """
         Initializes the SpeechToText class by loading the Whisper model.
 
-        The model size and transcription language are fetched from the application settings.
+        The model size, transcription language and speed profile are fetched from the application settings.
+        Unless a profile or model size is given explicitly, later changes of these settings are applied
+        as soon as the settings watcher publishes them.
+
+        :param use_cache: Whether transcription results are read from and stored in the disk cache.
+        :type use_cache: bool
+        :param profile: The speed profile to use instead of the one from settings.
+        :type profile: str or None
+        :param model_size: The Whisper model size to use instead of the one from settings.
+        :type model_size: str or None
+        :param record_stats: Whether achieved real-time factors are saved for the settings view.
+        :type record_stats: bool
+
+        :raises RuntimeError: If the Whisper model fails to load.
+        """
+        self.record_stats = record_stats
+        self.transcription_language = settings_watcher.get('transcription_language', 'pl')
+        self.real_time_factors = {}
+        self.cache = None
+        self._content_hashes = {}
+        self._lock = threading.Lock()
+        self._pending_settings = {}
+        self._settings_lock = threading.Lock()
+        if use_cache:
+            cache_size_mb = settings_watcher.get('transcription_cache_size_mb', 256)
+            self.cache = DiskCache(os.path.join(CACHE_DIRECTORY, 'transcriptions'), cache_size_mb * 1024 * 1024)
+
+        self._load_model(model_size or settings_watcher.get('model_size', 'small'),
+                         profile or settings_watcher.get('transcription_profile', DEFAULT_PROFILE))
+
+        if profile is None and model_size is None:
+            settings_watcher.subscribe(self.cb_settings_changed,
+                                       keys=['model_size', 'transcription_language', 'transcription_profile'])
+
+    def _load_model(self, model_size, profile):
+        """
+        Loads the Whisper model and applies the speed profile.
+
+        :param model_size: The Whisper model size.
+        :type model_size: str
+        :param profile: The speed profile name.
+        :type profile: str
 
         :raises RuntimeError: If the Whisper model fails to load.
         """
-        model_size = settings.get('model_size', 'small')
-        transcription_language = settings.get('transcription_language', 'pl')
+        if profile not in TRANSCRIPTION_PROFILES:
+            app_logger.warning(f"Unknown transcription profile '{profile}', using '{DEFAULT_PROFILE}'")
+            profile = DEFAULT_PROFILE
+        profile_options = dict(TRANSCRIPTION_PROFILES[profile])
+        self.model_size = model_size
+        self.profile = profile
+        self.quantized = False
 
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
         try:
             app_logger.info(f"Loading Whisper model: {model_size} on device: {device}")
             self.model = whisper.load_model(model_size, device=device)
-            self.transcription_language = transcription_language
-            app_logger.info(f"Whisper model loaded successfully with language: {transcription_language}")
+            if device == "cpu":
+                self._tune_cpu(profile_options)
+            app_logger.info(f"Whisper model loaded successfully with language: {self.transcription_language}")
         except Exception as e:
             app_logger.error(f"Failed to load Whisper model: {e}")
             raise RuntimeError(f"Error loading Whisper model: {e}")
 
+        profile_options.pop("quantize")
+        profile_options.pop("thread_ratio")
+        self.decode_options = {key: value for key, value in profile_options.items() if value is not None}
+        self.decode_options["fp16"] = device == "cuda"
+
+    def cb_settings_changed(self, changed):
+        """
+        Callback of the settings watcher applying transcription setting changes.
+
+        The changes are applied at once when no transcription is running. Otherwise they are kept and
+        applied by the transcribing thread once it has finished, so the watcher thread never waits for
+        a transcription.
+
+        :param changed: The changed settings.
+        :type changed: dict
+        """
+        with self._settings_lock:
+            self._pending_settings.update(changed)
+        self._apply_pending_settings(blocking=False)
+        if self._pending_settings:
+            app_logger.info("Transcription settings will change after the running transcription.")
+
+    def _apply_pending_settings(self, blocking=True):
+        """
+        Applies the setting changes received while a transcription was running.
+
+        :param blocking: Whether to wait for a running transcription instead of leaving the changes pending.
+        :type blocking: bool
+        """
+        if not self._pending_settings or not self._lock.acquire(blocking=blocking):
+            return
+        try:
+            with self._settings_lock:
+                changed, self._pending_settings = self._pending_settings, {}
+            if 'transcription_language' in changed:
+                self.transcription_language = changed['transcription_language']
+                app_logger.info(f"Transcription language changed to: {self.transcription_language}")
+            if 'model_size' in changed or 'transcription_profile' in changed:
+                self._load_model(changed.get('model_size', self.model_size),
+                                 changed.get('transcription_profile', self.profile))
+        except RuntimeError as e:
+            app_logger.error(f"Could not apply transcription settings: {e}")
+        finally:
+            self._lock.release()
+
+    def _tune_cpu(self, profile_options):
+        """
+        Applies the CPU part of a speed profile: the intra-op thread count and int8 quantization.
+
+        Whisper's own ``Linear`` subclass only casts weights to the input dtype, so its modules are
+        turned back into plain ``torch.nn.Linear`` for ``quantize_dynamic`` to pick them up.
+
+        :param profile_options: The options of the selected profile.
+        :type profile_options: dict
+        """
+        num_threads = max(1, int((os.cpu_count() or 1) * profile_options["thread_ratio"]))
+        torch.set_num_threads(num_threads)
+
+        if profile_options["quantize"]:
+            for module in self.model.modules():
+                if isinstance(module, torch.nn.Linear):
+                    module.__class__ = torch.nn.Linear
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.quantized = True
+
+        app_logger.info(f"Whisper CPU profile '{self.profile}': {num_threads} threads, "
+                        f"int8 quantization {'on' if self.quantized else 'off'}")
+
     def transcribe_audio(self, audio_path):
         """
         Transcribes the given audio file to text.
@@ -62,24 +244,215 @@ class SpeechToText:
         :raises ValueError: If the audio file format is not supported.
         :raises RuntimeError: If an error occurs during transcription.
         """
+        return self._transcribe(audio_path).get("text", "")
+
+    def transcribe_segments(self, audio_path):
+        """
+        Transcribes the given audio file to timestamped segments.
+
+        :param audio_path: The path to the audio file to transcribe.
+        :type audio_path: str
+        :returns: A list of ``(start, end, text)`` tuples, with times in seconds.
+        :rtype: list of tuple
+
+        :raises FileNotFoundError: If the specified audio file does not exist.
+        :raises ValueError: If the audio file format is not supported.
+        :raises RuntimeError: If an error occurs during transcription.
+        """
+        return normalize_segments(self._transcribe(audio_path).get("segments", []))
+
+    def transcribe_batch(self, audio_paths):
+        """
+        Transcribes several audio files, serving unchanged ones from the cache.
+
+        Files that fail to transcribe are logged and left out of the result.
+
+        :param audio_paths: The paths to the audio files to transcribe.
+        :type audio_paths: list of str
+        :returns: A mapping of audio path to its list of ``(start, end, text)`` segments.
+        :rtype: dict
+        """
+        results = {}
+        cached = 0
+        for audio_path in audio_paths:
+            try:
+                if self.is_cached(audio_path):
+                    cached += 1
+                results[audio_path] = self.transcribe_segments(audio_path)
+            except (FileNotFoundError, ValueError, RuntimeError) as e:
+                app_logger.error(f"Skipping {audio_path}: {e}")
+        app_logger.info(f"Batch transcription finished: {len(results)} files, {cached} served from cache.")
+        return results
+
+    def is_cached(self, audio_path):
+        """
+        Checks whether the transcription of the given audio file is already cached.
+
+        :param audio_path: The path to the audio file.
+        :type audio_path: str
+        :rtype: bool
+        """
+        return self.cache is not None and os.path.isfile(audio_path) and self._cache_key(audio_path) in self.cache
+
+    def _cache_key(self, audio_path):
+        """
+        Builds the cache key from the audio content and everything that affects the transcription.
+
+        :param audio_path: The path to the audio file.
+        :type audio_path: str
+        :rtype: str
+        """
+        stat = os.stat(audio_path)
+        file_id = (os.path.abspath(audio_path), stat.st_size, stat.st_mtime_ns)
+        if file_id not in self._content_hashes:
+            self._content_hashes[file_id] = hash_file(audio_path)
+        return make_key(self._content_hashes[file_id], whisper.__version__, self.model_size,
+                        self.transcription_language, self.quantized, self.decode_options)
+
+    def _transcribe(self, audio_path):
+        """
+        Runs Whisper on the given audio file and returns its raw result.
+
+        :param audio_path: The path to the audio file to transcribe.
+        :type audio_path: str
+        :returns: The Whisper result with the ``text`` and ``segments`` keys.
+        :rtype: dict
+        """
         if not os.path.isfile(audio_path):
             app_logger.error(f"Audio file not found: {audio_path}")
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-        if not audio_path.lower().endswith(('.wav', '.mp3', '.m4a', '.flac')):
+        if not audio_path.lower().endswith(('.wav', '.mp3', '.m4a', '.flac', '.opus')):
             app_logger.error(f"Unsupported audio format: {audio_path}")
-            raise ValueError("Unsupported audio format. Supported formats: WAV, MP3, M4A, FLAC.")
+            raise ValueError("Unsupported audio format. Supported formats: WAV, MP3, M4A, FLAC, OPUS.")
+
+        self._apply_pending_settings()
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(audio_path)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                app_logger.info(f"Transcription for {audio_path} served from cache.")
+                return cached
 
         try:
             app_logger.info(f"Starting transcription for: {audio_path} in language: {self.transcription_language}")
-            result = self.model.transcribe(audio_path, language=self.transcription_language)
-            transcription = result.get("text", "")
+            started = time.perf_counter()
+            with self._lock:
+                if audio_path.lower().endswith('.wav'):
+                    result = self._transcribe_windowed(audio_path)
+                else:
+                    result = self.model.transcribe(audio_path, language=self.transcription_language,
+                                                   **self.decode_options)
+            elapsed = time.perf_counter() - started
             app_logger.info("Transcription completed successfully.")
-            return transcription
         except Exception as e:
             app_logger.error(f"Error during transcription: {e}")
             raise RuntimeError(f"Error during transcription: {e}")
 
+        result = {
+            "text": result.get("text", ""),
+            "segments": [list(segment) for segment in normalize_segments(result.get("segments", []))],
+        }
+        duration = self._audio_duration(audio_path, result["segments"])
+        if duration > 0:
+            self.real_time_factors[self.profile] = elapsed / duration
+            app_logger.info(f"Transcription profile '{self.profile}' ran at real-time factor "
+                            f"{self.real_time_factors[self.profile]:.3f} ({elapsed:.1f}s for {duration:.1f}s of audio)")
+            if self.record_stats:
+                self._save_real_time_factor(self.real_time_factors[self.profile])
+        if cache_key is not None:
+            try:
+                self.cache.set(cache_key, result)
+            except OSError as e:
+                app_logger.warning(f"Could not cache transcription for {audio_path}: {e}")
+        self._apply_pending_settings(blocking=False)
+        return result
+
+    def _transcribe_windowed(self, audio_path):
+        """
+        Transcribes a WAV file window by window from a memory-mapped reader.
+
+        Each window starts where the last complete segment of the previous one ended, so no words
+        are lost at window boundaries, and the tail of the previous window's text is passed as the
+        prompt when the profile conditions on previous text. WAV encodings the reader cannot map
+        (e.g. 8- or 24-bit PCM) are transcribed whole through Whisper's ffmpeg loader instead.
+
+        :param audio_path: The path to the WAV file.
+        :type audio_path: str
+        :returns: A result with the ``text`` and ``segments`` keys, with times relative to the file start.
+        :rtype: dict
+        """
+        try:
+            reader = WavWindowReader(audio_path)
+        except UnsupportedWavEncoding as e:
+            app_logger.info(f"{e}; transcribing the whole file instead.")
+            return self.model.transcribe(audio_path, language=self.transcription_language, **self.decode_options)
+
+        segments = []
+        with reader:
+            start = 0.0
+            while start < reader.duration:
+                end = min(start + WINDOW_SECONDS, reader.duration)
+                prompt = None
+                if segments and self.decode_options.get("condition_on_previous_text", True):
+                    prompt = " ".join(segment[2] for segment in segments[-3:])
+                result = self.model.transcribe(reader.read(start, end), language=self.transcription_language,
+                                               initial_prompt=prompt, **self.decode_options)
+                window_segments = [(segment["start"] + start, segment["end"] + start, segment["text"])
+                                   for segment in result.get("segments", [])]
+
+                next_start = end
+                if end < reader.duration:
+                    complete = [segment for segment in window_segments if segment[1] <= end - WINDOW_MARGIN_SECONDS]
+                    if complete and complete[-1][1] > start:
+                        window_segments, next_start = complete, complete[-1][1]
+
+                segments.extend(normalize_segments(window_segments))
+                app_logger.info(f"Transcribed {audio_path} up to {next_start:.0f}s of {reader.duration:.0f}s")
+                start = next_start
+
+        return {"text": " ".join(segment[2] for segment in segments), "segments": segments}
+
+    def _save_real_time_factor(self, real_time_factor):
+        """
+        Records the achieved real-time factor per profile and model size, so the settings view can show it.
+
+        :param real_time_factor: Processing time divided by audio duration.
+        :type real_time_factor: float
+        """
+        try:
+            stats = {}
+            if os.path.exists(TRANSCRIPTION_STATS_FILE):
+                with open(TRANSCRIPTION_STATS_FILE, 'r', encoding='utf-8') as file:
+                    stats = json.load(file)
+            stats.setdefault(self.profile, {})[self.model_size] = round(real_time_factor, 4)
+            with open(TRANSCRIPTION_STATS_FILE, 'w', encoding='utf-8') as file:
+                json.dump(stats, file, indent=4)
+        except (OSError, ValueError) as e:
+            app_logger.warning(f"Could not save transcription stats: {e}")
+
+    @staticmethod
+    def _audio_duration(audio_path, segments):
+        """
+        Returns the duration of the audio in seconds.
+
+        WAV durations are read from the header; for other formats the end of the last segment is used.
+
+        :param audio_path: The path to the audio file.
+        :type audio_path: str
+        :param segments: The transcribed segments.
+        :type segments: list
+        :rtype: float
+        """
+        if audio_path.lower().endswith('.wav'):
+            try:
+                with wave.open(audio_path, 'rb') as wav:
+                    return wav.getnframes() / float(wav.getframerate())
+            except (wave.Error, OSError):
+                pass
+        return segments[-1][1] if segments else 0.0
+
     def save_transcription(self, transcription, output_path):
         """
         Saves the transcription to a specified file.
@@ -98,3 +471,41 @@ class SpeechToText:
         except Exception as e:
             app_logger.error(f"Failed to save transcription: {e}")
             raise RuntimeError(f"Error saving transcription: {e}")
+
+    def save_segments(self, segments, output_dir):
+        """
+        Saves timestamped segments next to the transcription.
+
+        Writes ``transcription.json`` (compact ``[start, end, text]`` rows), ``transcription.srt``,
+        ``transcription.vtt`` and a ``transcription.txt`` with one segment per line, so character
+        offsets in the text can be mapped back to segments by :class:`TranscriptIndex`.
+
+        :param segments: The segments returned by `transcribe_segments`.
+        :type segments: list of tuple
+        :param output_dir: The session directory where the files will be saved.
+        :type output_dir: str
+
+        :raises RuntimeError: If an error occurs while saving the segments.
+        """
+        segments = normalize_segments(segments)
+        try:
+            save_segments(segments, os.path.join(output_dir, 'transcription.json'),
+                          language=self.transcription_language)
+            with open(os.path.join(output_dir, 'transcription.srt'), 'w', encoding='utf-8') as file:
+                file.write(to_srt(segments))
+            with open(os.path.join(output_dir, 'transcription.vtt'), 'w', encoding='utf-8') as file:
+                file.write(to_vtt(segments))
+            app_logger.info(f"Transcription segments saved to {output_dir}")
+        except Exception as e:
+            app_logger.error(f"Failed to save transcription segments: {e}")
+            raise RuntimeError(f"Error saving transcription segments: {e}")
+
+        transcription_path = os.path.join(output_dir, 'transcription.txt')
+        self.save_transcription("\n".join(text for _, _, text in segments), transcription_path)
+
+        folder = session_catalog.folder_of(output_dir)
+        if folder:
+            for extension in ('txt', 'json', 'srt', 'vtt'):
+                session_catalog.record_file(os.path.join(output_dir, f'transcription.{extension}'))
+            session_catalog.update(folder, transcription_path=transcription_path, has_transcription=1)
+            search_index.index_file(transcription_path)
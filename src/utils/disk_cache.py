@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from src.utils.logger import app_logger
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """
+    Computes the SHA-256 digest of a file's content, reading it in fixed-size chunks.
+
+    :param path: The path of the file to hash.
+    :type path: str
+    :param chunk_size: The number of bytes read at a time.
+    :type chunk_size: int
+    :returns: The hexadecimal digest.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """
+    Builds a cache key from JSON-serializable parts.
+
+    :param parts: The values identifying a cached result (content hashes, model names, options...).
+    :returns: The hexadecimal SHA-256 digest of the parts.
+    :rtype: str
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    A size-bounded, least-recently-used cache of JSON values stored as files on disk.
+
+    Every entry is a ``<key>.json`` file. Its modification time is refreshed on every hit, so the
+    entries with the oldest modification time are evicted first once the cache grows over ``max_bytes``.
+    Entry sizes are tracked in memory, so the directory is only listed once, when the cache is created.
+
+    Attributes
+    ----------
+    directory : str
+        The directory where the entries are stored.
+    max_bytes : int
+        The maximum total size of the entries.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        Initializes the DiskCache and indexes the existing entries.
+
+        :param directory: The directory where the entries are stored.
+        :type directory: str
+        :param max_bytes: The maximum total size of the entries.
+        :type max_bytes: int
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {}
+        os.makedirs(directory, exist_ok=True)
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith('.json'):
+                stat = entry.stat()
+                self._entries[entry.name[:-5]] = (stat.st_mtime, stat.st_size)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for the key and marks it as recently used.
+
+        :param key: The cache key.
+        :type key: str
+        :param default: The value returned on a miss.
+        :returns: The cached value or ``default``.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                value = json.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return default
+        except (OSError, ValueError) as e:
+            app_logger.warning(f"DiskCache: Dropping unreadable entry {key}: {e}")
+            self.delete(key)
+            return default
+
+        with self._lock:
+            self._entries[key] = (os.path.getmtime(path), os.path.getsize(path))
+        return value
+
+    def set(self, key, value):
+        """
+        Stores a value atomically and evicts the least recently used entries if the cache is full.
+
+        :param key: The cache key.
+        :type key: str
+        :param value: The JSON-serializable value.
+        """
+        path = self._path(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(value, file, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._entries[key] = (os.path.getmtime(path), os.path.getsize(path))
+        self._evict()
+
+    def delete(self, key):
+        """
+        Removes an entry from the cache.
+
+        :param key: The cache key.
+        :type key: str
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits in ``max_bytes``."""
+        with self._lock:
+            total = sum(size for _, size in self._entries.values())
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+            for key in victims:
+                del self._entries[key]
+
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except OSError as e:
+                app_logger.warning(f"DiskCache: Could not evict {key}: {e}")
+        app_logger.info(f"DiskCache: Evicted {len(victims)} entries from {self.directory}")
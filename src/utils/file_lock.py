@@ -0,0 +1,70 @@
+try:
+    import msvcrt
+except ImportError:  # Not on Windows
+    msvcrt = None
+    import fcntl
+
+
+class FileLock:
+    """
+    An exclusive lock held on a lock file, serializing writers across processes.
+
+    Uses ``msvcrt.locking`` on Windows and ``fcntl.flock`` elsewhere. The lock file is created if
+    needed and left in place. Use it as a context manager::
+
+        with FileLock(os.path.join(ws_path, '.options.lock')):
+            ...
+
+    Attributes
+    ----------
+    path : str
+        The path of the lock file.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the lock file.
+        :type path: str
+        """
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """
+        Blocks until the lock is acquired.
+        """
+        self._file = open(self.path, 'a+b')
+        if msvcrt is not None:
+            self._file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK retries for about 10 seconds before giving up
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+    def release(self):
+        """
+        Releases the lock.
+        """
+        if self._file is None:
+            return
+        try:
+            if msvcrt is not None:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -0,0 +1,90 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken ships with openai-whisper, but keep a rough estimate if it is missing
+    tiktoken = None
+
+# Average number of characters per token used when tiktoken is not available
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    """
+    Returns the tiktoken encoding of a model, or None if tiktoken is not available.
+
+    :param model: The OpenAI model name.
+    :type model: str
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')
+
+
+def count_tokens(text, model='gpt-3.5-turbo'):
+    """
+    Counts the tokens of a text for a model.
+
+    :param text: The text to measure.
+    :type text: str
+    :param model: The OpenAI model name.
+    :type model: str
+    :returns: The number of tokens (estimated from the length if tiktoken is not available).
+    :rtype: int
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_line(line, max_tokens, model):
+    """
+    Splits a single line that is longer than ``max_tokens`` into pieces of at most ``max_tokens``.
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        size = max_tokens * CHARS_PER_TOKEN
+        return [line[i:i + size] for i in range(0, len(line), size)]
+    tokens = encoding.encode(line, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def chunk_text(text, max_tokens, model='gpt-3.5-turbo'):
+    """
+    Splits a text into chunks of at most ``max_tokens`` tokens.
+
+    Chunks are cut on line boundaries (a transcription holds one segment per line), so sentences are
+    only split when a single line is longer than a chunk.
+
+    :param text: The text to split.
+    :type text: str
+    :param max_tokens: The maximum number of tokens of a chunk.
+    :type max_tokens: int
+    :param model: The OpenAI model name.
+    :type model: str
+    :returns: The chunks, in order.
+    :rtype: list of str
+    """
+    chunks = []
+    lines = []
+    size = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        line_tokens = count_tokens(line, model) + 1  # + the newline joining the lines
+        pieces = [line] if line_tokens <= max_tokens else _split_line(line, max_tokens - 1, model)
+        for piece in pieces:
+            piece_tokens = line_tokens if len(pieces) == 1 else count_tokens(piece, model) + 1
+            if lines and size + piece_tokens > max_tokens:
+                chunks.append('\n'.join(lines))
+                lines, size = [], 0
+            lines.append(piece)
+            size += piece_tokens
+    if lines:
+        chunks.append('\n'.join(lines))
+    return chunks
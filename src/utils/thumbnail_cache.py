@@ -0,0 +1,202 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from src.config import CACHE_DIRECTORY
+from src.utils.disk_cache import make_key
+from src.utils.logger import app_logger
+
+THUMBNAIL_WIDTH = 200
+THUMBNAIL_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class ThumbnailCache:
+    """
+    A persistent, size-bounded cache of small JPEG thumbnails of images.
+
+    A thumbnail is keyed by the absolute path, modification time and size of its source, so it is made
+    once per source version and an edited source simply gets a new one. Thumbnails are made by a small
+    pool of background threads; `get` never decodes the source. Like :class:`DiskCache`, the least
+    recently used thumbnails are deleted first once the cache grows over ``max_bytes``.
+
+    Attributes
+    ----------
+    directory : str
+        The directory where the thumbnails are stored.
+    max_bytes : int
+        The maximum total size of the thumbnails.
+    width : int
+        The width of the thumbnails in pixels; the height keeps the source's aspect ratio.
+    """
+
+    def __init__(self, directory, max_bytes, width=THUMBNAIL_WIDTH, workers=2):
+        """
+        Initializes the ThumbnailCache and indexes the existing thumbnails.
+
+        :param directory: The directory where the thumbnails are stored.
+        :type directory: str
+        :param max_bytes: The maximum total size of the thumbnails.
+        :type max_bytes: int
+        :param width: The width of the thumbnails in pixels.
+        :type width: int
+        :param workers: The number of threads making thumbnails.
+        :type workers: int
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.width = width
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+        os.makedirs(directory, exist_ok=True)
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith('.jpg'):
+                stat = entry.stat()
+                self._entries[entry.name[:-4]] = (stat.st_mtime, stat.st_size)
+
+    def key(self, source):
+        """
+        Returns the cache key of a source image.
+
+        :param source: The path of the source image.
+        :type source: str
+        :returns: The key, or None if the source does not exist.
+        :rtype: str or None
+        """
+        if not source:
+            return None
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return make_key(os.path.abspath(source), stat.st_mtime_ns, stat.st_size, self.width)
+
+    def get(self, source):
+        """
+        Returns the thumbnail of a source image if it was already made, and marks it as recently used.
+
+        :param source: The path of the source image.
+        :type source: str
+        :returns: The path of the thumbnail, or None.
+        :rtype: str or None
+        """
+        key = self.key(source)
+        with self._lock:
+            if key is None or key not in self._entries:
+                return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        with self._lock:
+            self._entries[key] = (os.path.getmtime(path), self._entries[key][1])
+        return path
+
+    def request(self, source, callback=None):
+        """
+        Makes the thumbnail of a source image in the background, unless it already exists.
+
+        :param source: The path of the source image.
+        :type source: str
+        :param callback: Function called with ``(source, thumbnail_path)`` from a worker thread once the
+            thumbnail exists; ``thumbnail_path`` is None if it could not be made.
+        :type callback: callable or None
+        """
+        key = self.key(source)
+        if key is None:
+            return
+        with self._lock:
+            if key in self._pending:
+                if callback:
+                    self._pending[key].append(callback)
+                return
+            self._pending[key] = [callback] if callback else []
+        self._executor.submit(self._make, source, key)
+
+    def make(self, source):
+        """
+        Returns the thumbnail of a source image, making it in the calling thread if needed.
+
+        Meant for callers that already run in a background thread.
+
+        :param source: The path of the source image.
+        :type source: str
+        :returns: The path of the thumbnail, or None if it could not be made.
+        :rtype: str or None
+        """
+        path = self.get(source)
+        if path:
+            return path
+        key = self.key(source)
+        return self._build(source, key) if key else None
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.jpg")
+
+    def _build(self, source, key):
+        """Makes and stores a thumbnail atomically and returns its path, or None on failure."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                # The temporary file is wrapped first, so it is closed even if the source cannot be opened
+                with os.fdopen(fd, 'wb') as file, Image.open(source) as image:
+                    # Lets JPEG sources decode at a reduced scale
+                    image.draft('RGB', (self.width, self.width * 4))
+                    image.thumbnail((self.width, self.width * 4), Image.LANCZOS)
+                    image.convert('RGB').save(file, format='JPEG', quality=85, optimize=True)
+                os.replace(temp_path, path)
+            except Exception as e:
+                app_logger.warning(f"ThumbnailCache: Could not make a thumbnail of {source}: {e}")
+                return None
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        with self._lock:
+            self._entries[key] = (os.path.getmtime(path), os.path.getsize(path))
+        self._evict(keep=key)
+        return path
+
+    def _make(self, source, key):
+        """Worker: makes a thumbnail and notifies the callbacks."""
+        path = self._build(source, key)
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+        for callback in callbacks:
+            try:
+                callback(source, path)
+            except Exception as e:
+                app_logger.error(f"ThumbnailCache: Callback failed for {source}: {e}")
+
+    def _evict(self, keep):
+        """Removes the least recently used thumbnails except ``keep`` until the cache fits in ``max_bytes``."""
+        with self._lock:
+            total = sum(size for _, size in self._entries.values())
+            victims = []
+            for key, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                victims.append(key)
+                total -= size
+            for key in victims:
+                del self._entries[key]
+
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except OSError as e:
+                app_logger.warning(f"ThumbnailCache: Could not evict {key}: {e}")
+
+
+# Shared cache of the session cover thumbnails
+thumbnail_cache = ThumbnailCache(os.path.join(CACHE_DIRECTORY, 'thumbnails'), THUMBNAIL_CACHE_BYTES)
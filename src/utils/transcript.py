@@ -0,0 +1,168 @@
+import json
+from bisect import bisect_right
+
+
+def normalize_segments(segments):
+    """
+    Converts Whisper segments to compact ``(start, end, text)`` tuples.
+
+    :param segments: Segments as returned by ``whisper.transcribe`` (dicts) or already compact tuples.
+    :type segments: list
+    :returns: A list of ``(start, end, text)`` tuples with rounded times and stripped text.
+    :rtype: list of tuple
+    """
+    normalized = []
+    for segment in segments:
+        if isinstance(segment, dict):
+            start, end, text = segment["start"], segment["end"], segment["text"]
+        else:
+            start, end, text = segment
+        text = text.strip()
+        if text:
+            normalized.append((round(float(start), 2), round(float(end), 2), text))
+    return normalized
+
+
+def save_segments(segments, output_path, **metadata):
+    """
+    Saves segments as compact JSON (``{"segments": [[start, end, text], ...]}``).
+
+    :param segments: The segments to save.
+    :type segments: list
+    :param output_path: The path of the JSON file.
+    :type output_path: str
+    :param metadata: Additional top-level keys stored alongside the segments.
+    """
+    data = dict(metadata)
+    data["segments"] = [list(segment) for segment in normalize_segments(segments)]
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_segments(input_path):
+    """
+    Loads segments saved with :func:`save_segments`.
+
+    :param input_path: The path of the JSON file.
+    :type input_path: str
+    :returns: A list of ``(start, end, text)`` tuples.
+    :rtype: list of tuple
+    """
+    with open(input_path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    return [tuple(segment) for segment in data.get("segments", [])]
+
+
+def format_timestamp(seconds, decimal_marker='.'):
+    """
+    Formats seconds as ``HH:MM:SS.mmm`` (``HH:MM:SS,mmm`` for SRT).
+
+    :param seconds: The time in seconds.
+    :type seconds: float
+    :param decimal_marker: The separator between seconds and milliseconds.
+    :type decimal_marker: str
+    :rtype: str
+    """
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{decimal_marker}{milliseconds:03}"
+
+
+def to_srt(segments):
+    """
+    Renders segments as SubRip (SRT) subtitles.
+
+    :param segments: The segments to render.
+    :type segments: list
+    :rtype: str
+    """
+    blocks = []
+    for i, (start, end, text) in enumerate(normalize_segments(segments), start=1):
+        blocks.append(f"{i}\n{format_timestamp(start, ',')} --> {format_timestamp(end, ',')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def to_vtt(segments):
+    """
+    Renders segments as WebVTT subtitles.
+
+    :param segments: The segments to render.
+    :type segments: list
+    :rtype: str
+    """
+    blocks = ["WEBVTT\n"]
+    for start, end, text in normalize_segments(segments):
+        blocks.append(f"{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n")
+    return "\n".join(blocks)
+
+
+class TranscriptIndex:
+    """
+    A time index over transcript segments.
+
+    The transcript text is built with one segment per line, and the start offset of every line is kept
+    in a sorted list, so both a character offset (e.g. a search hit in a ``QTextEdit``) and a playback
+    time can be mapped to a segment with a binary search.
+
+    Attributes
+    ----------
+    segments : list of tuple
+        The ``(start, end, text)`` segments, ordered by start time.
+    text : str
+        The transcript text, one segment per line.
+    """
+
+    def __init__(self, segments):
+        """
+        Initializes the TranscriptIndex.
+
+        :param segments: The segments to index.
+        :type segments: list
+        """
+        self.segments = sorted(normalize_segments(segments), key=lambda segment: segment[0])
+        self._starts = [segment[0] for segment in self.segments]
+        self._offsets = []
+        offset = 0
+        for _, _, text in self.segments:
+            self._offsets.append(offset)
+            offset += len(text) + 1
+        self.text = "\n".join(segment[2] for segment in self.segments)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def segment_at_offset(self, offset):
+        """
+        Returns the index of the segment containing the given character offset of :attr:`text`.
+
+        :param offset: The character offset.
+        :type offset: int
+        :rtype: int or None
+        """
+        if not self.segments:
+            return None
+        return max(bisect_right(self._offsets, offset) - 1, 0)
+
+    def segment_at_time(self, seconds):
+        """
+        Returns the index of the segment being spoken at the given time.
+
+        :param seconds: The playback position in seconds.
+        :type seconds: float
+        :rtype: int or None
+        """
+        if not self.segments:
+            return None
+        return max(bisect_right(self._starts, seconds) - 1, 0)
+
+    def start_of(self, index):
+        """
+        Returns the start time (in seconds) of the segment with the given index.
+
+        :param index: The segment index.
+        :type index: int
+        :rtype: float
+        """
+        return self.segments[index][0]
@@ -0,0 +1,175 @@
+import os
+import struct
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class UnsupportedWavEncoding(ValueError):
+    """Raised for a valid WAV file whose sample encoding the reader cannot map."""
+
+
+class WavWindowReader:
+    """
+    Reads windows of a WAV file as 16 kHz mono float32 audio, the input format of Whisper.
+
+    The sample data is memory-mapped instead of loaded, so only the requested window is ever
+    decoded and resampled; memory use depends on the window length, not on the recording length.
+    Files whose header was not finalized (e.g. a recording that is still running) are read up to
+    the end of the file.
+
+    Attributes
+    ----------
+    path : str
+        The path to the WAV file.
+    sample_rate : int
+        The sample rate of the file.
+    channels : int
+        The number of channels of the file.
+    target_rate : int
+        The sample rate of the returned windows.
+    duration : float
+        The duration of the audio in seconds.
+    """
+
+    def __init__(self, path, target_rate=16000):
+        """
+        Initializes the WavWindowReader by parsing the RIFF header and mapping the sample data.
+
+        :param path: The path to the WAV file.
+        :type path: str
+        :param target_rate: The sample rate of the returned windows.
+        :type target_rate: int
+
+        :raises UnsupportedWavEncoding: If the file is not a 16-bit PCM or 32-bit float WAV file.
+        :raises ValueError: If the file is not a valid WAV file.
+        """
+        self.path = path
+        self.target_rate = target_rate
+        audio_format, self.channels, self.sample_rate, bits, data_offset, data_size = self._parse_header(path)
+
+        if audio_format == WAVE_FORMAT_PCM and bits == 16:
+            dtype, self._scale = np.dtype('<i2'), 1.0 / 32768.0
+        elif audio_format == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+            dtype, self._scale = np.dtype('<f4'), 1.0
+        else:
+            raise UnsupportedWavEncoding(f"Unsupported WAV encoding (format {audio_format}, {bits} bits): {path}")
+
+        frame_size = dtype.itemsize * self.channels
+        frames = data_size // frame_size
+        self._samples = np.memmap(path, dtype=dtype, mode='r', offset=data_offset, shape=(frames, self.channels)) \
+            if frames else np.zeros((0, self.channels), dtype=dtype)
+        self.duration = frames / float(self.sample_rate)
+
+    @staticmethod
+    def _parse_header(path):
+        """
+        Walks the RIFF chunks and returns the format description and the location of the sample data.
+
+        :param path: The path to the WAV file.
+        :type path: str
+        :returns: ``(audio_format, channels, sample_rate, bits_per_sample, data_offset, data_size)``
+        :rtype: tuple
+
+        :raises ValueError: If the file is not a valid WAV file.
+        """
+        file_size = os.path.getsize(path)
+        fmt = None
+        with open(path, 'rb') as f:
+            riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave_id != b'WAVE':
+                raise ValueError(f"Not a WAV file: {path}")
+
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"No data chunk found in {path}")
+                chunk_id, chunk_size = struct.unpack('<4sI', header)
+
+                if chunk_id == b'fmt ':
+                    chunk = f.read(chunk_size)
+                    audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', chunk[:16])
+                    if audio_format == WAVE_FORMAT_EXTENSIBLE and len(chunk) >= 26:
+                        audio_format = struct.unpack('<H', chunk[24:26])[0]
+                    fmt = (audio_format, channels, sample_rate, bits)
+                    f.seek(chunk_size % 2, os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    if fmt is None:
+                        raise ValueError(f"Data chunk before fmt chunk in {path}")
+                    data_offset = f.tell()
+                    available = file_size - data_offset
+                    data_size = available if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, available)
+                    return fmt + (data_offset, data_size)
+                else:
+                    f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    def read(self, start, end, padding=1.0):
+        """
+        Returns the audio between two times as 16 kHz mono float32 samples.
+
+        The window is resampled in the frequency domain with ``padding`` seconds of context on each
+        side, which are trimmed afterwards so the window edges do not ring.
+
+        :param start: The start of the window in seconds.
+        :type start: float
+        :param end: The end of the window in seconds.
+        :type end: float
+        :param padding: Seconds of context used for resampling on both sides of the window.
+        :type padding: float
+        :rtype: numpy.ndarray
+        """
+        total_frames = self._samples.shape[0]
+        first = max(int(start * self.sample_rate), 0)
+        last = min(int(end * self.sample_rate), total_frames)
+        if last <= first:
+            return np.zeros(0, dtype=np.float32)
+
+        pad = int(padding * self.sample_rate)
+        padded_first, padded_last = max(first - pad, 0), min(last + pad, total_frames)
+        window = self._samples[padded_first:padded_last].astype(np.float32).mean(axis=1) * self._scale
+
+        if self.sample_rate != self.target_rate:
+            window = self._resample(window, self.sample_rate, self.target_rate)
+
+        ratio = self.target_rate / float(self.sample_rate)
+        trim_start = int(round((first - padded_first) * ratio))
+        length = int(round((last - first) * ratio))
+        return np.ascontiguousarray(window[trim_start:trim_start + length], dtype=np.float32)
+
+    @staticmethod
+    def _resample(samples, source_rate, target_rate):
+        """
+        Band-limited resampling by truncating or zero-padding the spectrum.
+
+        :param samples: The mono samples.
+        :type samples: numpy.ndarray
+        :param source_rate: The sample rate of ``samples``.
+        :type source_rate: int
+        :param target_rate: The sample rate of the result.
+        :type target_rate: int
+        :rtype: numpy.ndarray
+        """
+        target_length = int(round(len(samples) * target_rate / float(source_rate)))
+        if target_length == 0:
+            return np.zeros(0, dtype=np.float32)
+        spectrum = np.fft.rfft(samples)
+        bins = target_length // 2 + 1
+        if bins <= len(spectrum):
+            spectrum = spectrum[:bins]
+        else:
+            spectrum = np.pad(spectrum, (0, bins - len(spectrum)))
+        resampled = np.fft.irfft(spectrum, target_length) * (target_length / float(len(samples)))
+        return resampled.astype(np.float32)
+
+    def close(self):
+        """Releases the memory map so the file can be moved or deleted."""
+        self._samples = np.zeros((0, self.channels), dtype=self._samples.dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()